@@ -1,25 +1,43 @@
-from fastapi import FastAPI, Depends, Request
-from fastapi.responses import JSONResponse
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Request, Query, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse, Response, PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import List
 
 from backend.db.database import get_db
-from backend.db.schemas import TaskOut
-from backend.db.repository import get_tasks_for_user
+from backend.db.schemas import TaskOut, TaskPage, UploadCreate
 from backend.db import models
 
 from backend.auth.auth_routes import router as auth_router
 from backend.auth.auth_dependencies import get_current_user
 
 from backend.core.task_manager import TaskManager
-from pydantic import BaseModel
+from backend.core.worker_pool import SolverPool
+from backend.core.db_bridge import DBBridge
+from backend.core.progress_stream import ProgressBroker
+from backend.core.ingest import MatrixDecoder
+from backend.core.uploads import UploadStore
+from backend.core.solution_cache import SolutionCache
+from backend.core.factorizations import FactorizationStore
+from backend.core.metrics import Metrics
+from backend.core.tracing import Tracer
+from backend.core.task_ids import TaskIds
+from backend.core.maintenance import Maintenance
+from backend.core.responses import ArrayJSONResponse
 
-class GaussInput(BaseModel):
-    matrix: List[List[float]]
-    rhs: List[float]
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    SolverPool.start()
+    ProgressBroker.start()
+    Maintenance.start()
+    yield
+    Maintenance.shutdown()
+    SolverPool.shutdown()
+    DBBridge.shutdown()
+    Tracer.shutdown()
 
-app = FastAPI(title="API1")
+app = FastAPI(title="API1", lifespan=lifespan)
 
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 
@@ -34,35 +52,215 @@ async def db_test(db: AsyncSession = Depends(get_db)):
 
 @app.post("/gauss/solve")
 async def solve(
-    data: GaussInput,
+    request: Request,
+    engine: str | None = None,
+    tol: float | None = None,
+    max_iter: int | None = None,
+    preconditioner: str | None = None,
     db: AsyncSession = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
 
-    n = len(data.matrix)    
-    print(f"[API1] Received solve request: matrix {n}×{n}, user_id={user.id}")
-    
+    if MatrixDecoder.is_raw(request):
+        # Raw float64 пишеться на диск потоково і не буферизується в пам'яті API
+        n = MatrixDecoder.size_from(request.headers.get("x-matrix-size"))
+        engine = MatrixDecoder.check_engine(engine)
+        options = MatrixDecoder.check_options(engine, tol, max_iter, preconditioner)
+        Tracer.event("api.solve_request", level="debug", n=n, engine=engine, user=user.id, streamed=True)
+
+        upload = await UploadStore.receive(request, user.id, n)
+        try:
+            return await TaskManager.start_gauss_task_from_upload(user.id, upload, db, engine, options)
+        except Exception:
+            UploadStore.delete(upload["upload_id"])
+            raise
+
+    # JSON (GaussInput), .npy або multipart — див. MatrixDecoder
+    matrix, rhs, engine = await MatrixDecoder.decode(request, engine)
+    options = MatrixDecoder.check_options(engine, tol, max_iter, preconditioner)
+
+    Tracer.event("api.solve_request", level="debug", n=len(matrix), engine=engine, user=user.id)
+
     result = await TaskManager.start_gauss_task(
         user_id=user.id,
-        matrix=data.matrix,
-        vector=data.rhs,
-        db=db
+        matrix=matrix,
+        vector=rhs,
+        db=db,
+        engine=engine,
+        options=options
     )
     
     return result
 
+@app.post("/gauss/sparse/solve")
+async def solve_sparse(
+    request: Request,
+    engine: str | None = None,
+    tol: float | None = None,
+    max_iter: int | None = None,
+    preconditioner: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+
+    # CSR/COO у JSON або multipart з Matrix Market / .npz — див. MatrixDecoder.decode_sparse
+    engine = MatrixDecoder.check_sparse_engine(engine)
+    options = MatrixDecoder.check_options(engine, tol, max_iter, preconditioner)
+    system = await MatrixDecoder.decode_sparse(request)
+
+    Tracer.event(
+        "api.sparse_solve_request", level="debug",
+        n=len(system["rhs"]), nnz=len(system["data"]), engine=engine or "splu", user=user.id
+    )
+
+    return await TaskManager.start_sparse_task(user.id, system, db, engine, options)
+
+@app.post("/gauss/uploads")
+async def create_upload(data: UploadCreate, user: models.User = Depends(get_current_user)):
+
+    # Великі системи вантажаться частинами: PUT /gauss/uploads/{id}?offset=... у форматі raw float64
+    Tracer.event("api.upload_created", level="debug", n=data.n, user=user.id)
+    return UploadStore.create(user.id, data.n)
+
+@app.get("/gauss/uploads/{upload_id}")
+async def get_upload(upload_id: str, user: models.User = Depends(get_current_user)):
+    return UploadStore.describe(UploadStore.get(upload_id, user.id))
+
+@app.put("/gauss/uploads/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = 0,
+    user: models.User = Depends(get_current_user),
+):
+    return await UploadStore.write_stream(upload_id, user.id, offset, request)
+
+@app.post("/gauss/uploads/{upload_id}/solve")
+async def solve_upload(
+    upload_id: str,
+    engine: str | None = None,
+    tol: float | None = None,
+    max_iter: int | None = None,
+    preconditioner: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+
+    engine = MatrixDecoder.check_engine(engine)
+    options = MatrixDecoder.check_options(engine, tol, max_iter, preconditioner)
+    upload = UploadStore.claim(upload_id, user.id)
+
+    Tracer.event("api.upload_solve_request", level="debug", upload=upload_id, n=upload["n"], engine=engine, user=user.id)
+    return await TaskManager.start_gauss_task_from_upload(user.id, upload, db, engine, options)
+
+@app.post("/gauss/factorize")
+async def factorize(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+
+    # LU-факторизація зберігається як дескриптор (= task_id) для наступних /gauss/factorizations/{handle}/solve
+    handle = TaskIds.new()
+
+    if MatrixDecoder.is_raw(request):
+        n = MatrixDecoder.size_from(request.headers.get("x-matrix-size"))
+        await FactorizationStore.receive(handle, user.id, n, request)
+    else:
+        matrix = await MatrixDecoder.decode_matrix(request)
+        n = len(matrix)
+        await asyncio.to_thread(FactorizationStore.create, handle, user.id, matrix)
+
+    Tracer.event("api.factorize_request", level="debug", n=n, user=user.id)
+    return await TaskManager.start_factorization(handle, user.id, n, db)
+
+@app.get("/gauss/factorizations/{handle}")
+async def get_factorization(handle: str, user: models.User = Depends(get_current_user)):
+    return FactorizationStore.describe(FactorizationStore.get(handle, user.id))
+
+@app.delete("/gauss/factorizations/{handle}")
+async def delete_factorization(handle: str, user: models.User = Depends(get_current_user)):
+    FactorizationStore.get(handle, user.id)
+    FactorizationStore.delete(handle)
+    return {"handle": handle, "status": "deleted"}
+
+@app.post("/gauss/factorizations/{handle}/solve")
+async def solve_with_factorization(
+    handle: str,
+    request: Request,
+    format: str = Query("json", pattern="^(json|binary)$"),
+    user: models.User = Depends(get_current_user),
+):
+
+    meta = FactorizationStore.get(handle, user.id)
+    rhs = await MatrixDecoder.decode_rhs(request, meta["n"])
+    solutions = await TaskManager.solve_with_factorization(handle, user.id, rhs)
+
+    if format == "binary":
+        # k розв'язків поспіль, кожен — n little-endian float64
+        return Response(
+            content=solutions.tobytes(),
+            media_type="application/octet-stream",
+            headers={"X-Solution-Size": str(meta["n"]), "X-Solution-Count": str(len(solutions))}
+        )
+
+    return ArrayJSONResponse({
+        "handle": handle,
+        "n": meta["n"],
+        "count": len(solutions),
+        "solutions": solutions
+    })
+
+@app.get("/cache/stats")
+def cache_stats():
+    return SolutionCache.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(Metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/tasks/status/{task_id}")
 async def get_task_status(task_id: str, db: AsyncSession = Depends(get_db)):
 
-    print(f"[API] Getting status for task {task_id}")
     result = await TaskManager.get_task_status_from_db(task_id, db)
-    print(f"[API] Status result: {result}")
+    Tracer.event("api.task_status", level="debug", task=task_id, status=result.get("status"))
     return result
 
+@app.get("/tasks/stream/{task_id}")
+async def stream_task_status(task_id: str, db: AsyncSession = Depends(get_db)):
+
+    initial = None
+    if not ProgressBroker.has(task_id):
+        initial = await TaskManager.get_task_status_from_db(task_id, db)
+
+    return StreamingResponse(
+        ProgressBroker.sse(task_id, initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/tasks/result/{task_id}")
-async def get_task_result(task_id: str, db: AsyncSession = Depends(get_db)):
+async def get_task_result(
+    task_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=0),
+    format: str = Query("json", pattern="^(json|binary)$"),
+    db: AsyncSession = Depends(get_db)
+):
+
+    if format == "binary":
+        # Сирий float64 little-endian; розмір і зсув — у заголовках
+        stored = await TaskManager.get_solution(task_id, db, offset, limit)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Розв'язок не знайдено")
+        n, solution = stored
+        return Response(
+            content=solution.tobytes(),
+            media_type="application/octet-stream",
+            headers={"X-Solution-Size": str(n), "X-Solution-Offset": str(offset)}
+        )
 
-    result = await TaskManager.get_task_result_from_db(task_id, db)
+    result = await TaskManager.get_task_result_from_db(task_id, db, offset, limit)
     
     if result is None:
         return {
@@ -71,25 +269,57 @@ async def get_task_result(task_id: str, db: AsyncSession = Depends(get_db)):
             "message": "Задача не знайдена або ще не завершена"
         }
     
-    return result
+    # solution — масив NumPy, серіалізується без перетворення на список
+    return ArrayJSONResponse(result)
+
+@app.get("/tasks/input/{task_id}")
+async def get_task_input(
+    task_id: str,
+    db: AsyncSession = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
+
+    # Щільні системи — у raw-форматі, що приймає /gauss/solve; розріджені — .npz з CSR
+    stored = await TaskManager.get_task_input(task_id, user.id, db)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Вхідні дані задачі не знайдено")
+    content, media_type, headers = stored
+    return Response(content=content, media_type=media_type, headers=headers)
 
 @app.post("/tasks/cancel/{task_id}")
 async def cancel_task(task_id: str, db: AsyncSession = Depends(get_db)):
 
     return await TaskManager.cancel_task_in_db(task_id, db)
 
-@app.get("/tasks/user/me", response_model=list[TaskOut])
+@app.get("/tasks/user/me", response_model=TaskPage)
 async def get_my_tasks(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
     user: models.User = Depends(get_current_user)
 ):
 
-    return await get_tasks_for_user(db, user.id)
+    return await TaskManager.get_history(user.id, db, limit, cursor)
+
+@app.get("/tasks/user/{user_id}", response_model=TaskPage)
+async def get_user_tasks(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db)
+):
+
+    return await TaskManager.get_history(user_id, db, limit, cursor)
 
-@app.get("/tasks/user/{user_id}", response_model=list[TaskOut])
-async def get_user_tasks(user_id: int, db: AsyncSession = Depends(get_db)):
+@app.get("/tasks/history/{history_id}", response_model=TaskOut)
+async def get_history_entry(
+    history_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
 
-    return await get_tasks_for_user(db, user_id)
+    # Повний запис (зведення вхідних даних і результату) — лише для однієї задачі
+    return await TaskManager.get_history_entry(history_id, user.id, db)
 
 @app.middleware("http")
 async def limit_upload_size(request: Request, call_next):
@@ -1,3 +1,8 @@
+import os
+
 SECRET_KEY = "my_secret_key1234567890"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+
+# Потоки для pbkdf2: хешування паролів не блокує цикл подій і не займає всі ядра
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
@@ -6,6 +6,7 @@ from jose import jwt, JWTError
 from backend.auth.auth_config import SECRET_KEY, ALGORITHM
 from backend.db.database import get_db
 from backend.db.repository import get_user_by_id
+from backend.auth.user_cache import UserCache
 from sqlalchemy.ext.asyncio import AsyncSession
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -27,6 +28,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
             detail="Invalid or expired token",
         )
 
+    user = UserCache.get(user_id)
+    if user is not None:
+        return user
+
     user = await get_user_by_id(db, user_id)
 
     if user is None:
@@ -35,4 +40,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
             detail="User not found",
         )
 
+    # Від'єднаний від сесії запиту об'єкт можна спільно віддавати наступним запитам
+    db.expunge(user)
+    UserCache.put(user_id, user)
     return user
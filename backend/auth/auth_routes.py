@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from backend.db.database import get_db
 from backend.db.repository import get_user_by_email, create_user
-from backend.auth.auth_utils import verify_password, create_access_token
+from backend.auth.auth_utils import verify_password_async, hash_password_async, create_access_token
 from backend.auth.auth_schemas import TokenResponse, RegisterUserRequest
 
 router = APIRouter()
@@ -20,7 +20,7 @@ async def login_json(data: LoginJSON, db: AsyncSession = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=400, detail="Невірний email або пароль")
 
-    if not verify_password(data.password, user.password):
+    if not await verify_password_async(data.password, user.password):
         raise HTTPException(status_code=400, detail="Невірний email або пароль")
 
     access_token = create_access_token({"user_id": user.id})
@@ -40,7 +40,8 @@ async def register_user(
             detail="Користувач з таким email вже існує"
         )
 
-    new_user = await create_user(db, data)
+    password_hash = await hash_password_async(data.password)
+    new_user = await create_user(db, data, password_hash)
 
     return {
         "status": "success",
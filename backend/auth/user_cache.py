@@ -0,0 +1,55 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 30.0))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+
+
+class UserCache:
+
+    # LRU з TTL автентифікованих користувачів за user_id: get_current_user не ходить у БД
+    # на кожен запит (опитування /tasks/status). Зберігаються від'єднані від сесії об'єкти
+    # User — лише для читання. Шляхів, що змінюють чи видаляють користувача, поки немає
+    # (лише реєстрація нового), тож застарілість обмежує тільки USER_CACHE_TTL: видалений
+    # у БД користувач ще до USER_CACHE_TTL секунд проходить автентифікацію. Такий код, коли
+    # з'явиться, має викликати invalidate; інші репліки побачать зміну через USER_CACHE_TTL.
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(user_id: int):
+
+        with UserCache._lock:
+            entry = UserCache._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del UserCache._entries[user_id]
+                return None
+            UserCache._entries.move_to_end(user_id)
+            return user
+
+    @staticmethod
+    def put(user_id: int, user):
+
+        if USER_CACHE_TTL <= 0:
+            return
+        with UserCache._lock:
+            UserCache._entries[user_id] = (user, time.monotonic() + USER_CACHE_TTL)
+            UserCache._entries.move_to_end(user_id)
+            while len(UserCache._entries) > USER_CACHE_SIZE:
+                UserCache._entries.popitem(last=False)
+
+    @staticmethod
+    def invalidate(user_id: int):
+        with UserCache._lock:
+            UserCache._entries.pop(user_id, None)
+
+    @staticmethod
+    def clear():
+        with UserCache._lock:
+            UserCache._entries.clear()
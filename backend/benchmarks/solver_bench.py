@@ -0,0 +1,354 @@
+import argparse
+import contextlib
+import json
+import multiprocessing as mp
+import os
+import platform
+import queue
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+
+BENCH_SIZES = (10, 50, 100, 500, 1000, 2000, 5000)
+BENCH_ENGINES = ("gauss", "blocked_lu", "mixed_lu", "cg", "gmres", "bicgstab")
+BENCH_STRUCTURES = ("dominant", "spd", "laplace")
+BENCH_DTYPES = ("float64", "float32")
+BENCH_REPEAT = int(os.getenv("BENCH_REPEAT", 3))
+BENCH_CASE_TIMEOUT = float(os.getenv("BENCH_CASE_TIMEOUT", 900))
+BENCH_SEED = 20240501
+
+# Регресія — медіана часу гірша за базову більш ніж на threshold і більш ніж на BENCH_MIN_DELTA секунд
+BENCH_THRESHOLD = 0.10
+BENCH_MIN_DELTA = 0.005
+# Точність вважаємо погіршеною, якщо зворотна похибка зросла в стільки разів і перевищує поріг
+BENCH_ERROR_FACTOR = 100
+BENCH_ERROR_FLOOR = 1e-12
+
+# CG — лише для симетричних додатно визначених матриць
+SYMMETRIC_STRUCTURES = ("spd", "laplace")
+MATVECS_PER_ITERATION = {"cg": 1, "gmres": 1, "bicgstab": 2}
+
+
+class SolverBench:
+
+    # Мікробенчмарк ядра розв'язувачів без API, пулу і БД: кожен випадок (engine, структура,
+    # dtype, n) — окремий spawn-процес, тож пікова RSS (ru_maxrss) належить лише йому,
+    # а завислий випадок можна вбити за BENCH_CASE_TIMEOUT. Прогрес і скасування
+    # підмінено заглушками — розв'язувач рахує те саме, що у воркері, але не ходить у БД.
+    # Сервіс завжди отримує float64; float32 вимірює лише ядро блочного LU (основа mixed_lu),
+    # для решти рушіїв цей dtype пропускається.
+
+    @staticmethod
+    def cases(sizes, engines, structures, dtypes) -> list:
+
+        result = []
+        for n in sizes:
+            for structure in structures:
+                for engine in engines:
+                    if engine == "cg" and structure not in SYMMETRIC_STRUCTURES:
+                        continue
+                    for dtype in dtypes:
+                        if dtype != "float64" and engine != "blocked_lu":
+                            continue
+                        result.append({"engine": engine, "structure": structure, "dtype": dtype, "n": n})
+        return result
+
+    @staticmethod
+    def system(structure: str, n: int, seed: int = BENCH_SEED):
+
+        # (A, b, x) з відомим розв'язком x; однаковий seed — однакові системи в різних запусках
+        rng = np.random.default_rng(seed + n)
+
+        if structure == "dominant":
+            A = rng.random((n, n)) + n * np.eye(n)
+        elif structure == "spd":
+            M = rng.standard_normal((n, n))
+            A = M @ M.T / n + np.eye(n)
+        elif structure == "laplace":
+            # Одновимірний оператор Лапласа: обумовленість ~ n², для Krylov — найважчий випадок
+            A = 2.0 * np.eye(n) - np.eye(n, k=1) - np.eye(n, k=-1)
+        else:
+            raise ValueError(f"Невідома структура матриці '{structure}'")
+
+        x = rng.uniform(-1.0, 1.0, n)
+        return A, A @ x, x
+
+    @staticmethod
+    def offline():
+
+        # Заглушки для всього, що в розв'язувачі торкається БД
+        from backend.core.progress import ProgressTracker
+        from backend.core.cancelation import CancelationManager
+
+        ProgressTracker.start = staticmethod(lambda task_id, user_id=None: None)
+        ProgressTracker.update = staticmethod(lambda task_id, value, matrix_size=100, eta=None: None)
+        ProgressTracker.finish = staticmethod(lambda task_id: None)
+        CancelationManager.is_cancelled = staticmethod(lambda task_id: False)
+
+    @staticmethod
+    def flops(case: dict, stats: dict) -> float:
+
+        from backend.core.work_model import WorkModel
+
+        n = case["n"]
+        if case["engine"] in MATVECS_PER_ITERATION:
+            iterations = (stats or {}).get("iterations", 0)
+            return iterations * MATVECS_PER_ITERATION[case["engine"]] * 2.0 * n * n
+        # Номінальна кількість для прямих методів (як у LINPACK), незалежно від точності
+        return WorkModel.solve_flops(n)
+
+    @staticmethod
+    def _solve(case: dict, A: np.ndarray, b: np.ndarray):
+
+        # Повертає (розв'язок, stats) або кидає RuntimeError, якщо розв'язувач не впорався
+        from backend.core.engines import SOLVER_ENGINES
+        from backend.core.lu_solver import BlockedLUSolver
+
+        if case["dtype"] != "float64":
+            LU = A.astype(case["dtype"])
+            perm = BlockedLUSolver.factorize(LU)
+            return BlockedLUSolver.lu_solve(LU, perm, b.astype(case["dtype"])).astype(np.float64), None
+
+        options = {}
+        if case["engine"] in MATVECS_PER_ITERATION:
+            options["method"] = case["engine"]
+
+        result = SOLVER_ENGINES[case["engine"]].solve_system(
+            task_id="bench", user_id=0, matrix=A, vector=b, **options
+        )
+        if result["status"] != "completed":
+            raise RuntimeError(result.get("error") or result["status"])
+        return np.array(result["solution"], dtype=np.float64), result.get("stats")
+
+    @staticmethod
+    def _run_case(case: dict, repeat: int, out):
+
+        # Виконується в дочірньому процесі; результат — у чергу out
+        SolverBench.offline()
+        from backend.core.mixed_precision import MixedPrecisionLUSolver
+
+        try:
+            A, b, x_true = SolverBench.system(case["structure"], case["n"])
+
+            # Прогрів BLAS і імпортів на маленькій системі, щоб не потрапив у перший замір
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                warm_A, warm_b, _ = SolverBench.system(case["structure"], 16)
+                SolverBench._solve(case, warm_A, warm_b)
+
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            times = []
+            for _ in range(repeat):
+                matrix = A.copy()
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    started = time.perf_counter()
+                    x, stats = SolverBench._solve(case, matrix, b.copy())
+                    times.append(time.perf_counter() - started)
+                del matrix
+            rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+            _, backward_error = MixedPrecisionLUSolver.backward_error(
+                A, x, b, float(np.max(np.sum(np.abs(A), axis=1))), float(np.max(np.abs(b)))
+            )
+            forward_error = float(np.max(np.abs(x - x_true)) / np.max(np.abs(x_true)))
+            median = statistics.median(times)
+
+            out.put(dict(
+                case,
+                status="completed",
+                times=times,
+                time_min=min(times),
+                time_median=median,
+                gflops=SolverBench.flops(case, stats) / median / 1e9 if median > 0 else None,
+                # ru_maxrss у Linux — кілобайти
+                peak_rss_mb=rss_after / 1024,
+                solve_rss_mb=max(0, rss_after - rss_before) / 1024,
+                backward_error=backward_error,
+                forward_error=forward_error,
+                stats=stats
+            ))
+
+        except Exception as e:
+            out.put(dict(case, status="error", error=f"{type(e).__name__}: {e}"))
+
+    @staticmethod
+    def run_case(case: dict, repeat: int = BENCH_REPEAT, timeout: float = BENCH_CASE_TIMEOUT) -> dict:
+
+        context = mp.get_context("spawn")
+        out = context.Queue()
+        process = context.Process(target=SolverBench._run_case, args=(case, repeat, out), daemon=True)
+        process.start()
+
+        try:
+            return out.get(timeout=timeout)
+        except queue.Empty:
+            status = "timeout" if process.is_alive() else "crashed"
+            return dict(case, status=status, error=f"exit code {process.exitcode}" if status == "crashed" else None)
+        finally:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    @staticmethod
+    def metadata(repeat: int) -> dict:
+
+        try:
+            import scipy
+            scipy_version = scipy.__version__
+        except ImportError:
+            scipy_version = None
+
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True, text=True, timeout=10
+            ).stdout.strip() or None
+        except Exception:
+            commit = None
+
+        return {
+            "created_at": datetime.utcnow().isoformat(),
+            "commit": commit,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy_version,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+            "seed": BENCH_SEED
+        }
+
+    @staticmethod
+    def run(cases: list, output: str, repeat: int = BENCH_REPEAT, timeout: float = BENCH_CASE_TIMEOUT):
+
+        report = {"meta": SolverBench.metadata(repeat), "results": []}
+        print(f"[SolverBench] {len(cases)} cases, repeat {repeat}, output {output}")
+
+        for index, case in enumerate(cases, start=1):
+            result = SolverBench.run_case(case, repeat, timeout)
+            report["results"].append(result)
+
+            label = f"{case['engine']:>10} {case['structure']:>8} {case['dtype']:>7} n={case['n']:<5}"
+            if result["status"] == "completed":
+                gflops = result["gflops"]
+                print(
+                    f"[SolverBench] {index}/{len(cases)} {label} "
+                    f"median {result['time_median']:.4f}s, "
+                    f"{'-' if gflops is None else f'{gflops:.2f}'} GFLOP/s, "
+                    f"peak RSS {result['peak_rss_mb']:.0f} MB, "
+                    f"backward error {result['backward_error']:.2e}"
+                )
+            else:
+                print(f"[SolverBench] {index}/{len(cases)} {label} {result['status'].upper()}: {result.get('error')}")
+
+            # Пишемо після кожного випадку: перерваний довгий прогін не втрачає результатів
+            with open(output, "w") as f:
+                json.dump(report, f, indent=2)
+
+        return report
+
+    @staticmethod
+    def _key(result: dict) -> tuple:
+        return result["engine"], result["structure"], result["dtype"], result["n"]
+
+    @staticmethod
+    def compare(baseline: dict, current: dict, threshold: float = BENCH_THRESHOLD) -> list:
+
+        # Повертає список регресій; також друкує таблицю змін
+        base = {SolverBench._key(r): r for r in baseline["results"]}
+        regressions = []
+
+        for result in current["results"]:
+            key = SolverBench._key(result)
+            old = base.get(key)
+            label = "{:>10} {:>8} {:>7} n={:<5}".format(*key)
+
+            if old is None:
+                print(f"[SolverBench] {label} new case")
+                continue
+
+            if old["status"] == "completed" and result["status"] != "completed":
+                print(f"[SolverBench] {label} REGRESSION: {old['status']} -> {result['status']}")
+                regressions.append({"case": key, "kind": "status", "baseline": old["status"], "current": result["status"]})
+                continue
+            if result["status"] != "completed" or old["status"] != "completed":
+                print(f"[SolverBench] {label} {old['status']} -> {result['status']}")
+                continue
+
+            ratio = result["time_median"] / old["time_median"] if old["time_median"] > 0 else 1.0
+            slower = (
+                ratio > 1 + threshold
+                and result["time_median"] - old["time_median"] > BENCH_MIN_DELTA
+            )
+            less_accurate = (
+                result["backward_error"] > BENCH_ERROR_FLOOR
+                and result["backward_error"] > old["backward_error"] * BENCH_ERROR_FACTOR
+            )
+
+            mark = "REGRESSION" if slower or less_accurate else ("faster" if ratio < 1 - threshold else "")
+            print(
+                f"[SolverBench] {label} {old['time_median']:.4f}s -> {result['time_median']:.4f}s "
+                f"({(ratio - 1) * 100:+.1f}%), error {old['backward_error']:.1e} -> {result['backward_error']:.1e} {mark}"
+            )
+
+            if slower:
+                regressions.append({"case": key, "kind": "time", "baseline": old["time_median"], "current": result["time_median"]})
+            if less_accurate:
+                regressions.append({"case": key, "kind": "accuracy", "baseline": old["backward_error"], "current": result["backward_error"]})
+
+        missing = set(base) - {SolverBench._key(r) for r in current["results"]}
+        if missing:
+            print(f"[SolverBench] {len(missing)} baseline case(s) not in current run")
+
+        print(f"[SolverBench] {len(regressions)} regression(s)")
+        return regressions
+
+
+def _list(value: str, cast=str) -> tuple:
+    return tuple(cast(item) for item in value.split(",") if item)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Бенчмарк розв'язувачів СЛАР")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="виміряти сітку випадків і записати JSON")
+    run.add_argument("--sizes", type=lambda v: _list(v, int), default=BENCH_SIZES)
+    run.add_argument("--engines", type=_list, default=BENCH_ENGINES)
+    run.add_argument("--structures", type=_list, default=BENCH_STRUCTURES)
+    run.add_argument("--dtypes", type=_list, default=BENCH_DTYPES)
+    run.add_argument("--repeat", type=int, default=BENCH_REPEAT)
+    run.add_argument("--timeout", type=float, default=BENCH_CASE_TIMEOUT)
+    run.add_argument("--output", default=f"solver_bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+
+    compare = commands.add_parser("compare", help="порівняти два прогони; код виходу 1 — є регресії")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=BENCH_THRESHOLD)
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        from backend.core.engines import SOLVER_ENGINES
+        unknown = [engine for engine in args.engines if engine not in SOLVER_ENGINES]
+        if unknown:
+            parser.error(f"невідомі рушії: {', '.join(unknown)}")
+
+        cases = SolverBench.cases(args.sizes, args.engines, args.structures, args.dtypes)
+        SolverBench.run(cases, args.output, args.repeat, args.timeout)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    return 1 if SolverBench.compare(baseline, current, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,55 +1,75 @@
-import asyncio
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from backend.db.database import DATABASE_URL
+import time
+from backend.core.db_bridge import DBBridge
+from backend.core.pg_listener import PgListener
+from backend.core.tracing import Tracer
 from backend.db import repository
+from backend.db.repository import CANCEL_CHANNEL
+
+CANCEL_POLL_INTERVAL = 1.0
+CANCEL_RETENTION = 3600
+
+class TaskCancelledError(Exception):
+    pass
 
 class CancelationManager:
+
+    # Локальний реєстр: перевірка в розв'язувачі — це пошук у словнику, без походу в БД.
+    # Скасування з будь-якої репліки приходять через LISTEN/NOTIFY; поки слухача немає,
+    # is_cancelled опитує БД не частіше ніж раз на CANCEL_POLL_INTERVAL секунд.
+
+    _cancelled = {}
+    _checked = {}
+
     @staticmethod
-    def _get_db_session():
-        engine = create_async_engine(DATABASE_URL, echo=False)
-        async_session_maker = sessionmaker(
-            bind=engine,
-            class_=AsyncSession,
-            expire_on_commit=False
+    def start_listener():
+        PgListener.subscribe(
+            CANCEL_CHANNEL,
+            CancelationManager._on_notify,
+            on_reconnect=CancelationManager._checked.clear
         )
-        return async_session_maker, engine
 
     @staticmethod
-    def _run_async_in_thread(coro):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
+    def _on_notify(payload: str):
+        now = time.time()
+        CancelationManager._cancelled[payload] = now
+
+        # Сповіщення приходять про всі задачі; чужі забуваємо через CANCEL_RETENTION
+        if len(CancelationManager._cancelled) > 1024:
+            for task_id, cancelled_at in list(CancelationManager._cancelled.items()):
+                if now - cancelled_at > CANCEL_RETENTION and task_id not in CancelationManager._checked:
+                    del CancelationManager._cancelled[task_id]
 
     @staticmethod
     def request_cancel(task_id: str):
-        print(f"[CancelationManager] Cancelling task {task_id}")
-        
-        async def _cancel():
-            session_maker, engine = CancelationManager._get_db_session()
-            try:
-                async with session_maker() as db:
-                    await repository.cancel_task_progress(db, task_id)
-            finally:
-                await engine.dispose()
-        
-        CancelationManager._run_async_in_thread(_cancel())
+        Tracer.event("task.cancel_requested", level="debug", task=task_id)
+        CancelationManager._cancelled[task_id] = time.time()
+        DBBridge.run(repository.cancel_task_progress, task_id)
+
+    @staticmethod
+    def abandon(task_id: str):
+        # Зупинити розв'язувач лише в цьому процесі, без запису в БД (напр. JobWorker втратив оренду)
+        CancelationManager._cancelled[task_id] = time.time()
 
     @staticmethod
     def is_cancelled(task_id: str) -> bool:
-        async def _check():
-            session_maker, engine = CancelationManager._get_db_session()
-            try:
-                async with session_maker() as db:
-                    return await repository.is_task_cancelled(db, task_id)
-            finally:
-                await engine.dispose()
-        
-        return CancelationManager._run_async_in_thread(_check())
-    
+
+        if task_id in CancelationManager._cancelled:
+            return True
+
+        # Перша перевірка задачі (і всі перевірки без слухача) — авторитетна, з БД
+        last_checked = CancelationManager._checked.get(task_id)
+        if last_checked is not None and (
+            PgListener.is_listening() or time.time() - last_checked < CANCEL_POLL_INTERVAL
+        ):
+            return False
+
+        cancelled = DBBridge.run(repository.is_task_cancelled, task_id)
+        CancelationManager._checked[task_id] = time.time()
+        if cancelled:
+            CancelationManager._cancelled[task_id] = time.time()
+        return cancelled
+
     @staticmethod
     def clear(task_id: str):
-        pass
\ No newline at end of file
+        CancelationManager._cancelled.pop(task_id, None)
+        CancelationManager._checked.pop(task_id, None)
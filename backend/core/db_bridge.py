@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.db.database import DATABASE_URL
+from backend.core.metrics import Metrics
+
+DB_BRIDGE_POOL_SIZE = 5
+DB_BRIDGE_MAX_OVERFLOW = 10
+DB_BRIDGE_TIMEOUT = 30.0
+
+
+class DBBridge:
+
+    # Один рушій з пулом з'єднань на процес і один фоновий event loop,
+    # у який потоки розв'язувача передають корутини
+
+    _loop = None
+    _thread = None
+    _engine = None
+    _session_maker = None
+    _pid = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _ensure_started():
+
+        if DBBridge._loop is not None and DBBridge._pid == os.getpid():
+            return
+
+        with DBBridge._lock:
+            if DBBridge._loop is not None and DBBridge._pid == os.getpid():
+                return
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=DBBridge._run_loop,
+                args=(loop,),
+                daemon=True,
+                name="DBBridge-loop"
+            )
+            thread.start()
+
+            DBBridge._engine = create_async_engine(
+                DATABASE_URL,
+                echo=False,
+                pool_size=DB_BRIDGE_POOL_SIZE,
+                max_overflow=DB_BRIDGE_MAX_OVERFLOW,
+                pool_pre_ping=True
+            )
+            DBBridge._session_maker = sessionmaker(
+                bind=DBBridge._engine,
+                class_=AsyncSession,
+                expire_on_commit=False
+            )
+            DBBridge._thread = thread
+            DBBridge._pid = os.getpid()
+            DBBridge._loop = loop
+
+            print(f"[DBBridge] Started in process {DBBridge._pid}")
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    @staticmethod
+    def submit(fn, *args, **kwargs) -> Future:
+        # fn(db, *args, **kwargs) виконується у власній сесії на фоновому loop
+        DBBridge._ensure_started()
+
+        async def _call():
+            started = time.perf_counter()
+            try:
+                async with DBBridge._session_maker() as db:
+                    return await fn(db, *args, **kwargs)
+            finally:
+                Metrics.observe("db_roundtrip_seconds", time.perf_counter() - started, operation=fn.__name__)
+
+        return asyncio.run_coroutine_threadsafe(_call(), DBBridge._loop)
+
+    @staticmethod
+    def run(fn, *args, **kwargs):
+        return DBBridge.submit(fn, *args, **kwargs).result(DB_BRIDGE_TIMEOUT)
+
+    @staticmethod
+    def run_coroutine(coro, timeout: float = DB_BRIDGE_TIMEOUT):
+        DBBridge._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, DBBridge._loop).result(timeout)
+
+    @staticmethod
+    async def _cancel_background():
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    @staticmethod
+    def run_coroutine_soon(coro) -> Future:
+        DBBridge._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, DBBridge._loop)
+
+    @staticmethod
+    def shutdown():
+
+        with DBBridge._lock:
+            loop = DBBridge._loop
+            if loop is None or DBBridge._pid != os.getpid():
+                return
+
+            try:
+                asyncio.run_coroutine_threadsafe(DBBridge._cancel_background(), loop).result(DB_BRIDGE_TIMEOUT)
+                asyncio.run_coroutine_threadsafe(DBBridge._engine.dispose(), loop).result(DB_BRIDGE_TIMEOUT)
+            except Exception as e:
+                print(f"[DBBridge] Warning: failed to dispose engine: {e}")
+
+            loop.call_soon_threadsafe(loop.stop)
+            DBBridge._thread.join(DB_BRIDGE_TIMEOUT)
+            loop.close()
+
+            DBBridge._loop = None
+            DBBridge._thread = None
+            DBBridge._engine = None
+            DBBridge._session_maker = None
@@ -0,0 +1,18 @@
+from backend.core.gauss_solver import GaussSolver
+from backend.core.lu_solver import BlockedLUSolver
+from backend.core.mixed_precision import MixedPrecisionLUSolver
+from backend.core.krylov_solver import KrylovSolver, KRYLOV_METHODS, PRECONDITIONERS
+
+SOLVER_ENGINES = {
+    "gauss": GaussSolver,
+    "blocked_lu": BlockedLUSolver,
+    "mixed_lu": MixedPrecisionLUSolver,
+    "cg": KrylovSolver,
+    "gmres": KrylovSolver,
+    "bicgstab": KrylovSolver,
+}
+
+DEFAULT_ENGINE = "gauss"
+
+# Ітераційні методи приймають tol, max_iter та preconditioner; метод передається в options
+ITERATIVE_ENGINES = KRYLOV_METHODS
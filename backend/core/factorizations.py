@@ -0,0 +1,239 @@
+import fcntl
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+import numpy as np
+from fastapi import HTTPException, Request
+from backend.core.tracing import Tracer
+
+FACTOR_DIR = os.getenv("FACTOR_DIR", os.path.join(tempfile.gettempdir(), "webapp_factors"))
+FACTOR_TTL = int(os.getenv("FACTOR_TTL", 3600))
+FACTOR_STORE_BYTES = int(os.getenv("FACTOR_STORE_BYTES", 4 * 1024 * 1024 * 1024))
+ITEM_SIZE = 8
+
+_HANDLE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+class FactorizationStore:
+
+    # LU-факторизації, що живуть між запитами: файл [LU (n×n) | perm (n)] і JSON-метадані поруч.
+    # Дескриптор — task_id задачі факторизації, тож прогрес, SSE і скасування працюють як для solve.
+    # Воркер факторизує файл на місці; розв'язування з дескриптором відображає його лише для читання.
+    # Застарілі (FACTOR_TTL від останнього розв'язування) недоступні й видаляються при першому ж
+    # зверненні або в purge, а коли сумарний розмір перевищує FACTOR_STORE_BYTES — витісняються
+    # найдавніше використані. Перегляд метаданих (GET, describe) строк життя не продовжує.
+
+    @staticmethod
+    def layout(n: int) -> dict:
+        return {
+            "lu": (0, (n, n), "<f8"),
+            "perm": (n * n * ITEM_SIZE, (n,), "<i8"),
+        }
+
+    @staticmethod
+    def _paths(handle: str) -> tuple[str, str]:
+        if not _HANDLE.match(handle):
+            raise HTTPException(status_code=404, detail="Факторизацію не знайдено")
+        base = os.path.join(FACTOR_DIR, handle)
+        return base + ".lu", base + ".json"
+
+    @staticmethod
+    def path(handle: str) -> str:
+        return FactorizationStore._paths(handle)[0]
+
+    @staticmethod
+    @contextmanager
+    def _locked_meta(handle: str, touch: bool = False):
+        _, meta_path = FactorizationStore._paths(handle)
+        try:
+            f = open(meta_path, "r+")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Факторизацію не знайдено")
+
+        with f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            meta = json.load(f)
+            if time.time() - meta.get("last_used", 0) > FACTOR_TTL:
+                Tracer.event("factorization.expired", handle=handle)
+                FactorizationStore.delete(handle)
+                raise HTTPException(status_code=404, detail="Факторизацію не знайдено")
+            yield meta
+            if touch:
+                meta["last_used"] = time.time()
+            f.seek(0)
+            f.truncate()
+            json.dump(meta, f)
+
+    @staticmethod
+    def _allocate(handle: str, user_id: int, n: int) -> str:
+
+        size = (n * n + n) * ITEM_SIZE
+        if size > FACTOR_STORE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Факторизація {n}×{n} не вміщується в сховище ({FACTOR_STORE_BYTES // (1024 * 1024)} MB)"
+            )
+
+        os.makedirs(FACTOR_DIR, exist_ok=True)
+        FactorizationStore.purge(reserve=size)
+
+        data_path, meta_path = FactorizationStore._paths(handle)
+        with open(data_path, "wb") as f:
+            f.truncate(size)
+
+        now = time.time()
+        with open(meta_path, "w") as f:
+            json.dump({
+                "handle": handle,
+                "user_id": user_id,
+                "n": n,
+                "size": size,
+                "status": "pending",
+                "created_at": now,
+                "last_used": now,
+            }, f)
+
+        return data_path
+
+    @staticmethod
+    def create(handle: str, user_id: int, matrix: np.ndarray) -> str:
+
+        n = len(matrix)
+        data_path = FactorizationStore._allocate(handle, user_id, n)
+
+        buffer = np.memmap(data_path, dtype=np.uint8, mode="r+")
+        try:
+            lu = np.ndarray((n, n), dtype="<f8", buffer=buffer)
+            lu[:] = matrix
+            buffer.flush()
+        finally:
+            lu = None
+            del buffer
+
+        return data_path
+
+    @staticmethod
+    async def receive(handle: str, user_id: int, n: int, request: Request) -> str:
+
+        # Raw float64 матриця пишеться у файл потоково, як в UploadStore
+        data_path = FactorizationStore._allocate(handle, user_id, n)
+        expected = n * n * ITEM_SIZE
+
+        buffer = np.memmap(data_path, dtype=np.uint8, mode="r+")
+        received = 0
+        try:
+            async for chunk in request.stream():
+                if not chunk:
+                    continue
+                end = received + len(chunk)
+                if end <= expected:
+                    buffer[received:end] = np.frombuffer(chunk, dtype=np.uint8)
+                received = end
+                if received > expected:
+                    break
+            buffer.flush()
+        finally:
+            del buffer
+
+        if received != expected:
+            FactorizationStore.delete(handle)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Очікувалось {expected} байт для матриці {n}×{n}"
+            )
+
+        return data_path
+
+    @staticmethod
+    def mark(handle: str, status: str):
+        try:
+            with FactorizationStore._locked_meta(handle, touch=True) as meta:
+                meta["status"] = status
+        except HTTPException:
+            pass
+
+    @staticmethod
+    def get(handle: str, user_id: int, touch: bool = False) -> dict:
+        with FactorizationStore._locked_meta(handle, touch) as meta:
+            if meta["user_id"] != user_id:
+                raise HTTPException(status_code=404, detail="Факторизацію не знайдено")
+            return dict(meta)
+
+    @staticmethod
+    def describe(meta: dict) -> dict:
+        return {
+            "handle": meta["handle"],
+            "n": meta["n"],
+            "size": meta["size"],
+            "status": meta["status"],
+            "expires_at": meta["last_used"] + FACTOR_TTL,
+        }
+
+    @staticmethod
+    def open(handle: str, user_id: int) -> tuple[int, np.ndarray, np.ndarray]:
+
+        # Розв'язування — єдине використання, що продовжує строк життя
+        meta = FactorizationStore.get(handle, user_id, touch=True)
+        if meta["status"] != "ready":
+            raise HTTPException(status_code=409, detail=f"Факторизація ще не готова (статус: {meta['status']})")
+
+        data_path, _ = FactorizationStore._paths(handle)
+        try:
+            buffer = np.memmap(data_path, dtype=np.uint8, mode="r")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Факторизацію не знайдено")
+
+        n = meta["n"]
+        layout = FactorizationStore.layout(n)
+        lu = np.ndarray(layout["lu"][1], dtype=layout["lu"][2], buffer=buffer, offset=layout["lu"][0])
+        perm = np.ndarray(layout["perm"][1], dtype=layout["perm"][2], buffer=buffer, offset=layout["perm"][0])
+        return n, lu, perm
+
+    @staticmethod
+    def delete(handle: str):
+        for path in FactorizationStore._paths(handle):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def purge(reserve: int = 0):
+
+        # Спершу прострочені, потім найдавніше використані — поки нова факторизація не вміститься
+        now = time.time()
+        entries = []
+        try:
+            names = os.listdir(FACTOR_DIR)
+        except FileNotFoundError:
+            return
+
+        for name in names:
+            handle, ext = os.path.splitext(name)
+            if ext != ".json" or not _HANDLE.match(handle):
+                continue
+            try:
+                with open(os.path.join(FACTOR_DIR, name)) as f:
+                    meta = json.load(f)
+            except (FileNotFoundError, ValueError):
+                continue
+
+            if now - meta.get("last_used", 0) > FACTOR_TTL:
+                Tracer.event("factorization.expired", handle=handle)
+                FactorizationStore.delete(handle)
+            else:
+                entries.append((meta.get("last_used", 0), handle, meta.get("size", 0), meta.get("status")))
+
+        total = sum(size for _, _, size, _ in entries)
+        for _, handle, size, status in sorted(entries):
+            if total + reserve <= FACTOR_STORE_BYTES:
+                break
+            # Факторизацію, яку зараз рахує воркер, не чіпаємо
+            if status == "pending":
+                continue
+            Tracer.event("factorization.evicted", handle=handle, size=size)
+            FactorizationStore.delete(handle)
+            total -= size
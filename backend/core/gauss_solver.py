@@ -1,134 +1,113 @@
 import numpy as np
 import time
-from backend.core.validation import TaskValidator
 from backend.core.progress import ProgressTracker
-from backend.core.cancelation import CancelationManager
+from backend.core.cancelation import TaskCancelledError
+from backend.core.work_model import WorkModel, CHECKPOINT_INTERVAL
+from backend.core.metrics import Metrics
+from backend.core.tracing import Tracer
 
 class GaussSolver:
 
     @staticmethod
     def solve_system(task_id: str, user_id: int, matrix: list[list[float]], vector: list[float]):
 
-        print(f"[GaussSolver] ===== STARTING task {task_id} =====")
-        print(f"[GaussSolver] Matrix size: {len(matrix)}x{len(matrix)}")
+        # Без print у циклі: фази — спани Tracer, проміжні кроки — події рівня debug
+        Tracer.event("gauss.start", n=len(matrix))
         start_time = time.time()
 
         try:
 
-            print(f"[GaussSolver] Converting to NumPy arrays...")
-            A = np.array(matrix, dtype=float)
-            b = np.array(vector, dtype=float)
-            n = len(A)
-            print(f"[GaussSolver] NumPy conversion done in {time.time() - start_time:.3f}s")
-            
-            print(f"[GaussSolver] Initializing progress tracker...")
-            init_start = time.time()
+            with Tracer.span("convert", level="debug"):
+                A = np.array(matrix, dtype=float)
+                b = np.array(vector, dtype=float)
+                n = len(A)
+
             ProgressTracker.start(task_id, user_id)
-            print(f"[GaussSolver] Progress tracker initialized in {time.time() - init_start:.3f}s")
-            
             ProgressTracker.update(task_id, 5, matrix_size=n)
             
-            check_interval = max(1, n // 20)
-            print(f"[GaussSolver] Check interval: every {check_interval} iterations")
+            # Контрольні точки — за годинником, прогрес — за виконаними флопами
+            total_flops = WorkModel.elimination_flops(n) + WorkModel.substitution_flops(n)
+            report = WorkModel.tracker(task_id, "gauss", n, total_flops, start_time)
+            debug = Tracer.enabled("debug")
             
-            print(f"[GaussSolver] Starting forward elimination...")
             forward_start = time.time()
+            with Tracer.span("forward", engine="gauss", n=n, checkpoint_interval=CHECKPOINT_INTERVAL):
             
-            for i in range(n):
-                if n > 100 and i % (n // 5) == 0:
-                    elapsed = time.time() - forward_start
-                    print(f"[GaussSolver] Forward: {i}/{n} ({i/n*100:.1f}%) - {elapsed:.3f}s elapsed")
-                
-                if i % check_interval == 0:
-
-                    if CancelationManager.is_cancelled(task_id):
-                        print(f"[GaussSolver] Task {task_id} CANCELLED at forward step {i}")
-                        ProgressTracker.update(task_id, 0, matrix_size=n)
-                        return {
-                            "task_id": task_id,
-                            "status": "cancelled",
-                            "solution": None
-                        }
+                for i in range(n):
+                    if debug and n > 100 and i % (n // 5) == 0:
+                        Tracer.event("gauss.forward_step", level="debug", step=i, elapsed=time.time() - forward_start)
                     
-                    TaskValidator.validate_timeout(start_time)
+                    report(WorkModel.elimination_flops(n, i))
                     
-                    progress = 5 + (i / n) * 65
-                    ProgressTracker.update(task_id, progress, matrix_size=n)
-                
-                max_row = i + np.argmax(np.abs(A[i:, i]))
-                if max_row != i:
-                    A[[i, max_row]] = A[[max_row, i]]
-                    b[i], b[max_row] = b[max_row], b[i]
-                
-                pivot = A[i][i]
-                
-                if abs(pivot) < 1e-10:
-                    error_msg = f"Матриця вироджена: нульовий елемент на діагоналі (рядок {i})"
-                    print(f"[GaussSolver] ERROR: {error_msg}")
-                    raise ValueError(error_msg)
-                
-                if i + 1 < n:
-                    factors = A[i+1:, i] / pivot
-                    A[i+1:] -= factors[:, np.newaxis] * A[i]
-                    b[i+1:] -= factors * b[i]
+                    max_row = i + np.argmax(np.abs(A[i:, i]))
+                    if max_row != i:
+                        A[[i, max_row]] = A[[max_row, i]]
+                        b[i], b[max_row] = b[max_row], b[i]
+                    
+                    pivot = A[i][i]
+                    
+                    if abs(pivot) < 1e-10:
+                        raise ValueError(f"Матриця вироджена: нульовий елемент на діагоналі (рядок {i})")
+                    
+                    if i + 1 < n:
+                        factors = A[i+1:, i] / pivot
+                        # Стовпці ліворуч від i в цих рядках уже нульові — оновлюємо лише трикутник праворуч
+                        A[i+1:, i:] -= factors[:, np.newaxis] * A[i, i:]
+                        b[i+1:] -= factors * b[i]
             
             forward_time = time.time() - forward_start
-            print(f"[GaussSolver] Forward elimination done in {forward_time:.3f}s")
             
-            ProgressTracker.update(task_id, 70, matrix_size=n)
+            elimination_flops = WorkModel.elimination_flops(n)
+            report(elimination_flops, force=True)
             
-            print(f"[GaussSolver] Starting back substitution...")
             backward_start = time.time()
+            with Tracer.span("backward", engine="gauss", n=n):
             
-            x = np.zeros(n)
-            for i in range(n - 1, -1, -1):
-                step = n - 1 - i
-                
-                if n > 100 and step % (n // 5) == 0:
-                    elapsed = time.time() - backward_start
-                    print(f"[GaussSolver] Backward: {step}/{n} ({step/n*100:.1f}%) - {elapsed:.3f}s elapsed")
-                
-                if step % check_interval == 0:
-                    if CancelationManager.is_cancelled(task_id):
-                        print(f"[GaussSolver] Task {task_id} CANCELLED at backward step {step}")
-                        return {
-                            "task_id": task_id,
-                            "status": "cancelled",
-                            "solution": None
-                        }
+                x = np.zeros(n)
+                for i in range(n - 1, -1, -1):
+                    step = n - 1 - i
+                    
+                    if debug and n > 100 and step % (n // 5) == 0:
+                        Tracer.event("gauss.backward_step", level="debug", step=step, elapsed=time.time() - backward_start)
                     
-                    TaskValidator.validate_timeout(start_time)
+                    report(elimination_flops + WorkModel.substitution_flops(n, step))
                     
-                    progress = 70 + (step / n) * 30
-                    ProgressTracker.update(task_id, progress, matrix_size=n)
-                
-                x[i] = (b[i] - np.dot(A[i, i+1:], x[i+1:])) / A[i][i]
+                    x[i] = (b[i] - np.dot(A[i, i+1:], x[i+1:])) / A[i][i]
             
             backward_time = time.time() - backward_start
-            print(f"[GaussSolver] Back substitution done in {backward_time:.3f}s")
+            WorkModel.record("gauss", total_flops, forward_time + backward_time)
+            Metrics.observe("solver_forward_seconds", forward_time, engine="gauss", size=Metrics.size_bucket(n))
+            Metrics.observe("solver_backward_seconds", backward_time, engine="gauss", size=Metrics.size_bucket(n))
             
-            print(f"[GaussSolver] Rounding solution...")
-            solution = GaussSolver._round_solution(x)
+            with Tracer.span("round", level="debug"):
+                solution = GaussSolver._round_solution(x)
             
-            print(f"[GaussSolver] Finishing progress tracker...")
             ProgressTracker.finish(task_id)
             
-            total_time = time.time() - start_time
-            print(f"[GaussSolver] ===== COMPLETED task {task_id} =====")
-            print(f"[GaussSolver] Total time: {total_time:.3f}s (forward: {forward_time:.3f}s, backward: {backward_time:.3f}s)")
+            Tracer.event(
+                "gauss.completed",
+                total=time.time() - start_time,
+                forward=forward_time,
+                backward=backward_time
+            )
             
             return {
                 "task_id": task_id,
                 "status": "completed",
                 "solution": solution
             }
+
+        except TaskCancelledError:
+            Tracer.event("gauss.cancelled")
+            ProgressTracker.update(task_id, 0, matrix_size=len(matrix))
+            return {
+                "task_id": task_id,
+                "status": "cancelled",
+                "solution": None
+            }
             
         except Exception as e:
-            print(f"[GaussSolver] ===== ERROR in task {task_id} =====")
-            print(f"[GaussSolver] Error type: {type(e).__name__}")
-            print(f"[GaussSolver] Error message: {e}")
-            import traceback
-            traceback.print_exc()
+            Tracer.event("gauss.error", level="error", type=type(e).__name__, error=str(e))
             
             ProgressTracker.update(task_id, 0, matrix_size=len(matrix))
             return {
@@ -139,17 +118,16 @@ class GaussSolver:
             }
 
     @staticmethod
-    def _round_solution(x: np.ndarray, decimals: int = 10) -> list:
+    def _round_solution(x: np.ndarray, decimals: int = 10) -> np.ndarray:
 
-        result = []
-        
-        for val in x:
-            rounded = round(val, decimals)
-            
-            nearest_int = round(rounded)
-            if abs(rounded - nearest_int) < 1e-9:
-                result.append(float(nearest_int))
-            else:
-                result.append(rounded)
-        
+        # Векторно: округлення, притягування майже цілих до цілого, -0.0 → 0.0.
+        # NaN/inf означає, що розв'язувач зламався, — це помилка задачі, а не значення в JSON
+        x = np.asarray(x, dtype=np.float64)
+        if not np.all(np.isfinite(x)):
+            raise ValueError("Розв'язок містить нескінченні значення або NaN")
+
+        rounded = np.round(x, decimals)
+        nearest = np.rint(rounded)
+        result = np.where(np.abs(rounded - nearest) < 1e-9, nearest, rounded)
+        result += 0.0
         return result
\ No newline at end of file
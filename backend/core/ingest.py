@@ -0,0 +1,415 @@
+import asyncio
+import io
+import numpy as np
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from backend.core.engines import SOLVER_ENGINES, DEFAULT_ENGINE, ITERATIVE_ENGINES, PRECONDITIONERS
+from backend.db.schemas import GaussInput, FactorizeInput, RhsInput, SparseInput
+
+try:
+    import scipy.io
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+NPY_MAGIC = b"\x93NUMPY"
+NPZ_MAGIC = b"PK"
+MM_MAGIC = b"%%MatrixMarket"
+RAW_DTYPE = np.dtype("<f8")
+
+RAW_CONTENT_TYPES = ("application/octet-stream",)
+NPY_CONTENT_TYPES = ("application/x-npy", "application/vnd.numpy")
+
+
+class MatrixDecoder:
+
+    # Бінарні формати декодуються одразу в буфер NumPy, без створення Python float.
+    # raw:  little-endian float64, n*n елементів матриці (по рядках) + n елементів b, n у X-Matrix-Size
+    # .npy: розширена матриця [A | b] форми (n, n+1)
+    # multipart: файли "matrix" та "rhs" (.npy або raw), n у полі "n" чи X-Matrix-Size
+
+    @staticmethod
+    async def decode(request: Request, engine: str = None) -> tuple[np.ndarray, np.ndarray, str]:
+
+        matrix, rhs, engine = await MatrixDecoder._decode_body(request, engine)
+        return matrix, rhs, MatrixDecoder.check_engine(engine)
+
+    @staticmethod
+    def check_engine(engine: str = None) -> str:
+
+        engine = engine or DEFAULT_ENGINE
+        if engine not in SOLVER_ENGINES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Невідомий метод '{engine}'. Доступні: {', '.join(SOLVER_ENGINES)}"
+            )
+        return engine
+
+    @staticmethod
+    def check_sparse_engine(engine: str = None) -> str | None:
+
+        # Розріджені системи: за замовчуванням прямий SuperLU (None), інакше — ітераційний метод
+        if engine in (None, "", "splu"):
+            return None
+        if engine not in ITERATIVE_ENGINES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Невідомий метод '{engine}' для розрідженої системи. Доступні: splu, {', '.join(ITERATIVE_ENGINES)}"
+            )
+        return engine
+
+    @staticmethod
+    def check_options(engine: str, tol: float = None, max_iter: int = None, preconditioner: str = None) -> dict:
+
+        # Параметри ітераційних методів -> kwargs для KrylovSolver.solve_system
+        if engine not in ITERATIVE_ENGINES:
+            if tol is not None or max_iter is not None or preconditioner is not None:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"tol, max_iter та preconditioner підтримують лише методи {', '.join(ITERATIVE_ENGINES)}"
+                )
+            return {}
+
+        if tol is not None and not 0 < tol < 1:
+            raise HTTPException(status_code=400, detail="tol має бути в межах (0, 1)")
+        if max_iter is not None and max_iter < 1:
+            raise HTTPException(status_code=400, detail="max_iter має бути додатним")
+        if preconditioner is not None and preconditioner not in PRECONDITIONERS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Невідомий передобумовлювач '{preconditioner}'. Доступні: {', '.join(PRECONDITIONERS)}"
+            )
+
+        return {"method": engine, "tol": tol, "max_iter": max_iter, "preconditioner": preconditioner}
+
+    @staticmethod
+    def content_type(request: Request) -> str:
+        return request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+
+    @staticmethod
+    def is_raw(request: Request) -> bool:
+        # raw-тіло можна писати на диск потоково, не тримаючи його в пам'яті (див. UploadStore)
+        return MatrixDecoder.content_type(request) in RAW_CONTENT_TYPES
+
+    @staticmethod
+    async def _decode_body(request: Request, engine: str = None):
+
+        content_type = MatrixDecoder.content_type(request)
+
+        if content_type == "application/json":
+            try:
+                data = GaussInput.model_validate_json(await request.body())
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+            try:
+                matrix = await asyncio.to_thread(np.asarray, data.matrix, RAW_DTYPE)
+                rhs = await asyncio.to_thread(np.asarray, data.rhs, RAW_DTYPE)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Рядки матриці мають різну довжину")
+            MatrixDecoder._check_shapes(matrix, rhs)
+            return matrix, rhs, engine or data.engine
+
+        if content_type in RAW_CONTENT_TYPES:
+            n = MatrixDecoder.size_from(request.headers.get("x-matrix-size"))
+            matrix, rhs = MatrixDecoder.from_raw(await request.body(), n)
+            return matrix, rhs, engine
+
+        if content_type in NPY_CONTENT_TYPES:
+            matrix, rhs = MatrixDecoder.from_npy(await request.body())
+            return matrix, rhs, engine
+
+        if content_type == "multipart/form-data":
+            form = await request.form()
+            try:
+                n = form.get("n") or request.headers.get("x-matrix-size")
+                matrix = MatrixDecoder._read_part(form.get("matrix"), "matrix", n, 2)
+                rhs = MatrixDecoder._read_part(form.get("rhs"), "rhs", n, 1)
+            finally:
+                await form.close()
+            MatrixDecoder._check_shapes(matrix, rhs)
+            return matrix, rhs, engine or form.get("engine")
+
+        raise HTTPException(
+            status_code=415,
+            detail=f"Непідтримуваний формат тіла запиту: {content_type}"
+        )
+
+    @staticmethod
+    async def decode_matrix(request: Request) -> np.ndarray:
+
+        # Лише матриця A (для факторизації): JSON {"matrix": ...}, .npy (n, n) або multipart-файл "matrix"
+        content_type = MatrixDecoder.content_type(request)
+
+        if content_type == "application/json":
+            try:
+                data = FactorizeInput.model_validate_json(await request.body())
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+            try:
+                matrix = np.asarray(data.matrix, dtype=RAW_DTYPE)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Рядки матриці мають різну довжину")
+
+        elif content_type in NPY_CONTENT_TYPES:
+            matrix = MatrixDecoder._load_npy(await request.body(), "matrix")
+
+        elif content_type == "multipart/form-data":
+            form = await request.form()
+            try:
+                n = form.get("n") or request.headers.get("x-matrix-size")
+                matrix = MatrixDecoder._read_part(form.get("matrix"), "matrix", n, 2)
+            finally:
+                await form.close()
+
+        else:
+            raise HTTPException(
+                status_code=415,
+                detail=f"Непідтримуваний формат тіла запиту: {content_type}"
+            )
+
+        if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1] or matrix.shape[0] == 0:
+            raise HTTPException(status_code=400, detail=f"Очікувалась квадратна матриця, отримано {matrix.shape}")
+        return matrix
+
+    @staticmethod
+    async def decode_rhs(request: Request, n: int) -> np.ndarray:
+
+        # Одна або кілька правих частин, результат — масив (k, n).
+        # raw: k*n little-endian float64 поспіль; .npy: (n,) або (k, n); JSON: {"rhs": [...] | [[...], ...]}
+        content_type = MatrixDecoder.content_type(request)
+
+        if content_type == "application/json":
+            try:
+                data = RhsInput.model_validate_json(await request.body())
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+            try:
+                rhs = np.asarray(data.rhs, dtype=RAW_DTYPE)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Праві частини мають різну довжину")
+
+        elif content_type in RAW_CONTENT_TYPES:
+            body = await request.body()
+            if not body or len(body) % (n * RAW_DTYPE.itemsize):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Розмір тіла ({len(body)} байт) не кратний {n * RAW_DTYPE.itemsize} байтам (n = {n})"
+                )
+            rhs = np.frombuffer(body, dtype=RAW_DTYPE).reshape(-1, n)
+
+        elif content_type in NPY_CONTENT_TYPES:
+            rhs = MatrixDecoder._load_npy(await request.body(), "rhs")
+
+        else:
+            raise HTTPException(
+                status_code=415,
+                detail=f"Непідтримуваний формат тіла запиту: {content_type}"
+            )
+
+        rhs = np.atleast_2d(rhs)
+        if rhs.ndim != 2 or rhs.shape[1] != n or rhs.shape[0] == 0:
+            raise HTTPException(status_code=400, detail=f"Очікувались вектори довжини {n}, отримано {rhs.shape}")
+        return rhs
+
+    @staticmethod
+    async def decode_sparse(request: Request) -> dict:
+
+        # Розріджена система -> канонічний CSR {"indptr", "indices", "data", "rhs"}.
+        # JSON (SparseInput: CSR або COO-трійки) або multipart: "matrix" — Matrix Market (.mtx)
+        # чи scipy .npz, "rhs" — .npy, raw float64 або .mtx. Файли multipart Starlette тримає
+        # на диску, а .mtx розбирається потоково з файлу, без читання тексту в пам'ять.
+        if scipy is None:
+            raise HTTPException(status_code=501, detail="Розріджені системи потребують SciPy на сервері")
+
+        content_type = MatrixDecoder.content_type(request)
+
+        if content_type == "application/json":
+            try:
+                data = SparseInput.model_validate_json(await request.body())
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+            return await asyncio.to_thread(MatrixDecoder._sparse_from_input, data)
+
+        if content_type == "multipart/form-data":
+            form = await request.form()
+            try:
+                matrix = await asyncio.to_thread(MatrixDecoder._read_sparse_part, form.get("matrix"))
+                rhs = await asyncio.to_thread(MatrixDecoder._read_rhs_part, form.get("rhs"), matrix.shape[0])
+            finally:
+                await form.close()
+            return await asyncio.to_thread(MatrixDecoder._canonical_csr, matrix, rhs)
+
+        raise HTTPException(
+            status_code=415,
+            detail=f"Непідтримуваний формат тіла запиту: {content_type}"
+        )
+
+    @staticmethod
+    def _sparse_from_input(data: SparseInput) -> dict:
+
+        n = MatrixDecoder.size_from(data.n)
+        values = np.asarray(data.data, dtype=RAW_DTYPE)
+
+        try:
+            if data.format == "csr":
+                if data.indptr is None or data.indices is None:
+                    raise HTTPException(status_code=400, detail="Для CSR потрібні indptr та indices")
+                matrix = scipy.sparse.csr_matrix(
+                    (values, np.asarray(data.indices, dtype=np.int64), np.asarray(data.indptr, dtype=np.int64)),
+                    shape=(n, n)
+                )
+            else:
+                if data.rows is None or data.cols is None:
+                    raise HTTPException(status_code=400, detail="Для COO потрібні rows та cols")
+                matrix = scipy.sparse.coo_matrix(
+                    (values, (np.asarray(data.rows, dtype=np.int64), np.asarray(data.cols, dtype=np.int64))),
+                    shape=(n, n)
+                )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Некоректна розріджена матриця: {e}")
+
+        return MatrixDecoder._canonical_csr(matrix, np.asarray(data.rhs, dtype=RAW_DTYPE))
+
+    @staticmethod
+    def _read_sparse_part(part):
+
+        if part is None or isinstance(part, str):
+            raise HTTPException(status_code=400, detail="Відсутній файл 'matrix'")
+
+        head = part.file.read(len(MM_MAGIC))
+        part.file.seek(0)
+
+        try:
+            if head.startswith(NPZ_MAGIC):
+                return scipy.sparse.load_npz(part.file)
+            if head.startswith(MM_MAGIC):
+                matrix = scipy.io.mmread(part.file)
+                if not scipy.sparse.issparse(matrix):
+                    raise HTTPException(status_code=400, detail="Matrix Market 'matrix' має бути у форматі coordinate")
+                return matrix
+        except (ValueError, OSError) as e:
+            raise HTTPException(status_code=400, detail=f"Некоректний файл 'matrix': {e}")
+
+        raise HTTPException(status_code=400, detail="Файл 'matrix' має бути Matrix Market (.mtx) або scipy .npz")
+
+    @staticmethod
+    def _read_rhs_part(part, n: int) -> np.ndarray:
+
+        if part is None or isinstance(part, str):
+            raise HTTPException(status_code=400, detail="Відсутній файл 'rhs'")
+
+        body = part.file.read()
+        if body.startswith(MM_MAGIC):
+            try:
+                rhs = scipy.io.mmread(io.BytesIO(body))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Некоректний файл 'rhs': {e}")
+            if scipy.sparse.issparse(rhs):
+                rhs = rhs.toarray()
+            return np.asarray(rhs, dtype=RAW_DTYPE).reshape(-1)
+        if body.startswith(NPY_MAGIC):
+            return MatrixDecoder._load_npy(body, "rhs").reshape(-1)
+        if len(body) != n * RAW_DTYPE.itemsize:
+            raise HTTPException(status_code=400, detail=f"Розмір 'rhs' ({len(body)} байт) не відповідає n = {n}")
+        return np.frombuffer(body, dtype=RAW_DTYPE)
+
+    @staticmethod
+    def _canonical_csr(matrix, rhs: np.ndarray) -> dict:
+
+        n = matrix.shape[0]
+        if matrix.shape != (n, n) or rhs.shape != (n,):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Невідповідні розміри: матриця {matrix.shape}, вектор {rhs.shape}"
+            )
+
+        # Однакова система завжди дає однакові масиви — це важливо для хешу вмісту
+        try:
+            csr = scipy.sparse.csr_matrix(matrix, dtype=RAW_DTYPE)
+            csr.check_format(full_check=True)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Некоректна розріджена матриця: {e}")
+        csr.sum_duplicates()
+        csr.sort_indices()
+
+        return {
+            "indptr": csr.indptr.astype(np.int64),
+            "indices": csr.indices.astype(np.int64),
+            "data": csr.data,
+            "rhs": np.ascontiguousarray(rhs, dtype=RAW_DTYPE)
+        }
+
+    @staticmethod
+    def size_from(value) -> int:
+        try:
+            n = int(value)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Не вказано розмірність матриці (X-Matrix-Size)")
+        if n < 1:
+            raise HTTPException(status_code=400, detail="Розмірність матриці має бути додатною")
+        return n
+
+    @staticmethod
+    def from_raw(body: bytes, n: int) -> tuple[np.ndarray, np.ndarray]:
+
+        expected = (n * n + n) * RAW_DTYPE.itemsize
+        if len(body) != expected:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Очікувалось {expected} байт для системи {n}×{n}, отримано {len(body)}"
+            )
+
+        values = np.frombuffer(body, dtype=RAW_DTYPE)
+        return values[:n * n].reshape(n, n), values[n * n:]
+
+    @staticmethod
+    def from_npy(body: bytes) -> tuple[np.ndarray, np.ndarray]:
+
+        augmented = MatrixDecoder._load_npy(body, "npy")
+        if augmented.ndim != 2 or augmented.shape[1] != augmented.shape[0] + 1:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Очікувалась розширена матриця [A | b] форми (n, n+1), отримано {augmented.shape}"
+            )
+
+        return augmented[:, :-1], augmented[:, -1]
+
+    @staticmethod
+    def _load_npy(body: bytes, name: str) -> np.ndarray:
+        try:
+            array = np.load(io.BytesIO(body), allow_pickle=False)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Некоректний .npy у '{name}': {e}")
+        return np.asarray(array, dtype=RAW_DTYPE)
+
+    @staticmethod
+    def _read_part(part, name: str, n, ndim: int) -> np.ndarray:
+
+        if part is None or isinstance(part, str):
+            raise HTTPException(status_code=400, detail=f"Відсутній файл '{name}'")
+
+        body = part.file.read()
+        if body.startswith(NPY_MAGIC):
+            array = MatrixDecoder._load_npy(body, name)
+        else:
+            size = MatrixDecoder.size_from(n)
+            shape = (size, size) if ndim == 2 else (size,)
+            if len(body) != int(np.prod(shape)) * RAW_DTYPE.itemsize:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Розмір '{name}' ({len(body)} байт) не відповідає формі {shape}"
+                )
+            array = np.frombuffer(body, dtype=RAW_DTYPE).reshape(shape)
+
+        if array.ndim != ndim:
+            raise HTTPException(status_code=400, detail=f"'{name}' має бути {ndim}-вимірним масивом")
+        return array
+
+    @staticmethod
+    def _check_shapes(matrix: np.ndarray, rhs: np.ndarray):
+        n = matrix.shape[0] if matrix.ndim else 0
+        if n == 0 or matrix.shape != (n, n) or rhs.shape != (n,):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Невідповідні розміри: матриця {matrix.shape}, вектор {rhs.shape}"
+            )
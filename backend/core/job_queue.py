@@ -0,0 +1,97 @@
+import os
+import queue
+import numpy as np
+from backend.core.db_bridge import DBBridge
+from backend.core.matrix_store import MatrixStore
+from backend.core.scheduler import (
+    SolveScheduler, QuotaExceededError,
+    SCHEDULER_USER_JOBS, SCHEDULER_USER_MEMORY, SCHEDULER_MEMORY_BUDGET
+)
+from backend.core.worker_pool import SharedArrays
+from backend.db import repository
+
+# pool — пул процесів у кожній репліці API (SolverPool); queue — стійка черга в Postgres,
+# яку розбирають окремі процеси JobWorker (python -m backend.core.job_worker)
+SOLVER_BACKEND = os.getenv("SOLVER_BACKEND", "pool")
+
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", 1000))
+# Оренда (visibility timeout): задачу без heartbeat довше за цей час забирає інший воркер
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 60))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", JOB_LEASE_SECONDS / 4))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", 5))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 2))
+# Метрики JobWorker не потрапляють у /metrics реплік API: воркер (разом із процесами
+# --processes) віддає їх на власному порту GET /metrics; 0 — вимкнено
+JOB_WORKER_METRICS_PORT = int(os.getenv("JOB_WORKER_METRICS_PORT", 0))
+
+
+class JobQueue:
+
+    # Постановка в стійку чергу solve_jobs — той самий інтерфейс submit/submit_file, що й
+    # у SolverPool. Система архівується в matrix_blobs (за хешем вмісту, повторна не
+    # пишеться), тож воркер може бути на іншій машині, а перезапуск API задач не губить.
+    # on_done не викликається: результат зберігає воркер через TaskManager._finalize_task.
+    # Квоти — як у SolveScheduler: розмір однієї задачі й кількість активних на користувача.
+
+    @staticmethod
+    def submit(task: dict, arrays: dict, on_done=None):
+        # Кидає queue.Full, якщо черга заповнена, і QuotaExceededError, якщо користувач вичерпав квоту
+
+        layout = {name: (0, np.shape(array), np.asarray(array).dtype.str) for name, array in arrays.items()}
+        _, memory = SolveScheduler.estimate(dict(task, layout=layout))
+        limit = min(SCHEDULER_MEMORY_BUDGET, SCHEDULER_USER_MEMORY)
+        if memory > limit:
+            raise QuotaExceededError(
+                413,
+                f"Задача потребує ~{memory // (1024 * 1024)} MB, більше за допустимі "
+                f"{limit // (1024 * 1024)} MB"
+            )
+
+        input_hash = task.get("input_hash") or MatrixStore.input_hash(arrays)
+        input_blob = None
+        if not DBBridge.run(repository.has_matrix_blob, input_hash):
+            codec, data = MatrixStore.archive(arrays)
+            input_blob = {
+                "hash": input_hash,
+                "n": len(arrays["rhs"]),
+                "codec": codec,
+                "size": len(data),
+                "data": data
+            }
+
+        payload = {key: task[key] for key in ("kind", "engine", "options") if task.get(key) is not None}
+        refused = DBBridge.run(
+            repository.enqueue_solve_job,
+            task["task_id"],
+            task["user_id"],
+            input_hash,
+            payload,
+            input_blob,
+            SCHEDULER_USER_JOBS,
+            JOB_QUEUE_SIZE
+        )
+        if refused == "user":
+            raise QuotaExceededError(
+                429,
+                f"Забагато активних задач: не більше {SCHEDULER_USER_JOBS} на користувача"
+            )
+        if refused == "full":
+            raise queue.Full
+
+    @staticmethod
+    def submit_file(task: dict, path: str, layout: dict, on_done=None, cleanup=None, writable: bool = False):
+
+        # Файл завантаження потрібен лише до архівації: воркер читає систему з matrix_blobs
+        if writable:
+            raise ValueError("JobQueue does not support in-place tasks")
+
+        buffer, arrays = SharedArrays.map_file(path, layout)
+        try:
+            JobQueue.submit(task, arrays)
+        finally:
+            arrays = None
+            buffer = None
+
+        if cleanup is not None:
+            cleanup()
@@ -0,0 +1,298 @@
+import argparse
+import multiprocessing as mp
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from backend.core.db_bridge import DBBridge
+from backend.core.cancelation import CancelationManager
+from backend.core.pg_listener import PgListener
+from backend.core.progress_writer import ProgressWriter
+from backend.core.matrix_store import MatrixStore
+from backend.core.metrics import Metrics
+from backend.core.engines import DEFAULT_ENGINE
+from backend.core.task_manager import TaskManager
+from backend.core.tracing import Tracer
+from backend.core.worker_pool import solve_task
+from backend.core.job_queue import (
+    JOB_LEASE_SECONDS, JOB_HEARTBEAT_INTERVAL, JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY, JOB_POLL_INTERVAL,
+    JOB_WORKER_METRICS_PORT
+)
+from backend.db import repository
+from backend.db.repository import JOB_CHANNEL
+
+JOB_FAILED_MESSAGE = "Задачу не вдалося обчислити: вичерпано спроби"
+
+_BLAS_THREAD_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+class JobWorker:
+
+    # Окремий процес-розв'язувач для SOLVER_BACKEND=queue: бере задачі з solve_jobs через
+    # SELECT ... FOR UPDATE SKIP LOCKED, тримає оренду heartbeat-ом і сам зберігає результат.
+    # Воркер, що впав або завис, втрачає оренду — задачу забирає інший (до JOB_MAX_ATTEMPTS).
+    # Кількість воркерів не залежить від кількості реплік API.
+
+    _stop = threading.Event()
+    _wake = threading.Event()
+    _current = None
+
+    @staticmethod
+    def run():
+
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        Tracer.event("job_worker.started", worker_id=worker_id)
+
+        CancelationManager.start_listener()
+        PgListener.subscribe(JOB_CHANNEL, lambda payload: JobWorker._wake.set(), on_reconnect=JobWorker._wake.set)
+        signal.signal(signal.SIGTERM, JobWorker._on_signal)
+        signal.signal(signal.SIGINT, JobWorker._on_signal)
+
+        recovered_at = 0.0
+        restart = False
+        while not JobWorker._stop.is_set():
+            try:
+                # Прострочені оренди перевіряє кожен воркер; рядки блокуються, тож без подвійних повторів
+                if time.time() - recovered_at >= JOB_LEASE_SECONDS / 2:
+                    recovered_at = time.time()
+                    requeued, failed = DBBridge.run(
+                        repository.recover_expired_solve_jobs, JOB_MAX_ATTEMPTS, JOB_FAILED_MESSAGE
+                    )
+                    if requeued or failed:
+                        Tracer.event("job.leases_expired", level="warning", requeued=len(requeued), failed=len(failed))
+
+                JobWorker._wake.clear()
+                job = DBBridge.run(repository.claim_solve_job, worker_id, JOB_LEASE_SECONDS)
+            except Exception as e:
+                Tracer.event("job.claim_failed", level="error", error=str(e))
+                job = None
+
+            if job is None:
+                JobWorker._wake.wait(JOB_POLL_INTERVAL)
+                continue
+
+            restart = JobWorker._process(job, worker_id)
+            Metrics.flush()
+            if restart:
+                Tracer.event("job_worker.restart", level="warning", worker_id=worker_id, task_id=job["task_id"])
+                break
+
+        Tracer.event("job_worker.stopped", worker_id=worker_id)
+        Metrics.flush()
+        ProgressWriter.shutdown()
+        DBBridge.shutdown()
+        Tracer.shutdown()
+
+        if restart:
+            # Звичайне завершення інтерпретатора чекало б на завислий потік
+            os._exit(0)
+
+    @staticmethod
+    def _on_signal(signum, frame):
+        # Поточна задача зупиняється й повертається в чергу без втрати спроби
+        JobWorker._stop.set()
+        JobWorker._wake.set()
+        if JobWorker._current is not None:
+            CancelationManager.abandon(JobWorker._current)
+
+    @staticmethod
+    def _heartbeat(task_id: str, worker_id: str, done: threading.Event, lost: threading.Event):
+        while not done.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                owned = DBBridge.run(repository.heartbeat_solve_job, task_id, worker_id, JOB_LEASE_SECONDS)
+            except Exception as e:
+                # Оренда ще може бути чинною — наступна спроба через інтервал
+                Tracer.event("job.heartbeat_failed", level="warning", error=str(e))
+                continue
+            if not owned:
+                lost.set()
+                CancelationManager.abandon(task_id)
+                return
+
+    @staticmethod
+    def _process(job: dict, worker_id: str) -> bool:
+
+        # Повертає True, якщо процес треба перезапустити (у ньому лишився завислий потік)
+        task_id = job["task_id"]
+        user_id = job["user_id"]
+        task = dict(job["payload"], task_id=task_id, user_id=user_id)
+        kind = task.get("kind", "dense")
+        engine = task.get("engine") or ("splu" if kind == "sparse" else DEFAULT_ENGINE)
+
+        done = threading.Event()
+        lost = threading.Event()
+        JobWorker._current = task_id
+        heartbeat = threading.Thread(
+            target=JobWorker._heartbeat, args=(task_id, worker_id, done, lost), daemon=True
+        )
+        heartbeat.start()
+
+        arrays = None
+        started = time.time()
+        with Tracer.task(task_id, user_id):
+            try:
+                with Tracer.span("solve", engine=engine, kind=kind, attempt=job["attempts"]):
+                    if CancelationManager.is_cancelled(task_id):
+                        result = {"task_id": task_id, "status": "cancelled", "solution": None}
+                    else:
+                        blob = DBBridge.run(repository.get_matrix_blob, job["input_hash"])
+                        if blob is None:
+                            raise RuntimeError(f"matrix blob {job['input_hash']} not found")
+                        arrays = MatrixStore.restore(blob.codec, blob.data, blob.n)
+                        try:
+                            result = solve_task(task, arrays)
+                        except Exception as e:
+                            # Помилка розв'язувача — результат задачі, а не привід для повтору
+                            result = {"task_id": task_id, "status": "error", "error": str(e), "solution": None}
+                        Metrics.observe(
+                            "solver_solve_seconds", time.time() - started,
+                            engine=engine, kind=kind, size=Metrics.size_bucket(len(arrays["rhs"]))
+                        )
+                        Metrics.inc("solver_tasks_total", status=result["status"])
+            except Exception as e:
+                done.set()
+                JobWorker._retry(task_id, worker_id, job["attempts"], str(e))
+                return False
+            finally:
+                done.set()
+                JobWorker._current = None
+                CancelationManager.clear(task_id)
+
+            if lost.is_set():
+                # Задачу вже забрав інший воркер — результат цієї спроби відкидаємо
+                Tracer.event("job.lease_lost", level="warning")
+                return bool(result.get("restart_worker"))
+
+            if JobWorker._stop.is_set() and result.get("status") == "cancelled":
+                try:
+                    user_cancelled = DBBridge.run(repository.is_task_cancelled, task_id)
+                    if not user_cancelled:
+                        DBBridge.run(repository.release_solve_job, task_id, worker_id)
+                        Tracer.event("job.released")
+                        return bool(result.get("restart_worker"))
+                except Exception as e:
+                    # Оренда сама спливе, і задачу забере інший воркер
+                    Tracer.event("job.release_failed", level="warning", error=str(e))
+                    return bool(result.get("restart_worker"))
+
+            TaskManager._finalize_task(task_id, user_id, result, arrays, job["input_hash"])
+            try:
+                DBBridge.run(repository.finish_solve_job, task_id, worker_id)
+            except Exception as e:
+                # Результат уже збережено; після закінчення оренди повтор лише перезапише той самий статус
+                Tracer.event("job.finish_failed", level="warning", error=str(e))
+
+        return bool(result.get("restart_worker"))
+
+    @staticmethod
+    def _retry(task_id: str, worker_id: str, attempts: int, error: str):
+        delay = JOB_RETRY_DELAY * 2 ** max(0, attempts - 1)
+        try:
+            retried = DBBridge.run(
+                repository.retry_solve_job,
+                task_id,
+                worker_id,
+                error,
+                delay,
+                JOB_MAX_ATTEMPTS,
+                JOB_FAILED_MESSAGE
+            )
+        except Exception as e:
+            Tracer.event("job.retry_failed", level="error", error=str(e))
+            return
+        Tracer.event("job.retry" if retried else "job.failed", level="warning", error=error, attempt=attempts)
+
+
+def _process_main(metrics_queue):
+    # Приріст метрик — батьківському процесу, який віддає їх на JOB_WORKER_METRICS_PORT
+    if metrics_queue is not None:
+        Metrics.set_sink(metrics_queue.put)
+    JobWorker.run()
+
+
+def _collect_metrics(metrics_queue):
+    while True:
+        Metrics.merge(metrics_queue.get())
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = Metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve_metrics(port: int):
+    # /metrics API-реплік не бачить окремих воркерів: Prometheus опитує цей порт
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    Tracer.event("job_worker.metrics_listening", port=port)
+
+
+def main(argv=None) -> int:
+
+    parser = argparse.ArgumentParser(description="Воркер стійкої черги розв'язувачів (SOLVER_BACKEND=queue)")
+    parser.add_argument("--processes", type=int, default=1, help="кількість процесів-розв'язувачів")
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        if JOB_WORKER_METRICS_PORT:
+            _serve_metrics(JOB_WORKER_METRICS_PORT)
+        JobWorker.run()
+        return 0
+
+    # Як у SolverPool: ядра діляться між процесами, щоб BLAS не конкурував сам із собою
+    threads = str(max(1, (os.cpu_count() or 1) // args.processes))
+    for name in _BLAS_THREAD_VARS:
+        os.environ.setdefault(name, threads)
+
+    ctx = mp.get_context("spawn")
+    stopping = threading.Event()
+
+    # SimpleQueue пише в канал синхронно: приріст не губиться, коли процес виходить через os._exit
+    metrics_queue = None
+    if JOB_WORKER_METRICS_PORT:
+        metrics_queue = ctx.SimpleQueue()
+        threading.Thread(target=_collect_metrics, args=(metrics_queue,), name="metrics-collector", daemon=True).start()
+        _serve_metrics(JOB_WORKER_METRICS_PORT)
+
+    def stop(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    processes = []
+    while not stopping.is_set():
+        # Процес, що завершився (перезапуск після завислого потоку чи падіння), замінюється новим
+        processes = [process for process in processes if process.is_alive()]
+        while len(processes) < args.processes:
+            process = ctx.Process(target=_process_main, args=(metrics_queue,), daemon=False)
+            process.start()
+            processes.append(process)
+        stopping.wait(1.0)
+
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join(JOB_LEASE_SECONDS)
+        if process.is_alive():
+            process.kill()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+import math
+import os
+import time
+import numpy as np
+from backend.core.validation import TaskValidator
+from backend.core.progress import ProgressTracker
+from backend.core.cancelation import CancelationManager, TaskCancelledError
+from backend.core.gauss_solver import GaussSolver
+from backend.core.tracing import Tracer
+
+try:
+    import scipy.sparse
+    from scipy.sparse.linalg import spilu
+except ImportError:
+    spilu = None
+
+KRYLOV_METHODS = ("cg", "gmres", "bicgstab")
+PRECONDITIONERS = ("none", "jacobi", "ilu")
+DEFAULT_PRECONDITIONER = "jacobi"
+
+KRYLOV_TOL = float(os.getenv("KRYLOV_TOL", 1e-10))
+KRYLOV_MAX_ITER = int(os.getenv("KRYLOV_MAX_ITER", 10000))
+GMRES_RESTART = int(os.getenv("GMRES_RESTART", 50))
+KRYLOV_REFINEMENTS = 3
+ILU_DROP_TOL = 1e-4
+ILU_FILL_FACTOR = 10
+
+
+class KrylovSolver:
+
+    # Ітераційні методи для великих добре обумовлених (CG — симетричних додатно визначених)
+    # або діагонально домінантних систем: кожна ітерація — одне-два множення A на вектор.
+    # A — щільний масив або scipy CSR (з /gauss/sparse/solve); b ≠ 0, x0 = 0.
+    # Збіжність — за відносним залишком ||b - Ax|| / ||b|| <= tol; прогрес рахується з того,
+    # яку частку шляху від ||b|| до tol·||b|| вже пройшов залишок (у логарифмічній шкалі).
+
+    @staticmethod
+    def solve_system(
+        task_id: str,
+        user_id: int,
+        matrix,
+        vector: np.ndarray,
+        method: str = "cg",
+        tol: float = None,
+        max_iter: int = None,
+        preconditioner: str = None
+    ):
+
+        n = len(vector)
+        tol = tol or KRYLOV_TOL
+        max_iter = max_iter or KRYLOV_MAX_ITER
+        preconditioner = preconditioner or DEFAULT_PRECONDITIONER
+
+        Tracer.event("krylov.start", n=n, method=method, preconditioner=preconditioner, tol=tol, max_iter=max_iter)
+        start_time = time.time()
+
+        try:
+
+            ProgressTracker.start(task_id, user_id)
+            ProgressTracker.update(task_id, 5, matrix_size=n)
+
+            A = matrix
+            b = np.array(vector, dtype=float)
+            b_norm = np.linalg.norm(b)
+
+            if b_norm == 0:
+                x = np.zeros(n)
+                iterations = 0
+            else:
+                with Tracer.span("precondition", level="debug", preconditioner=preconditioner):
+                    M = KrylovSolver._preconditioner(A, preconditioner)
+                monitor = KrylovSolver._monitor(task_id, start_time, n, b_norm, tol)
+                solve = {
+                    "cg": KrylovSolver._cg,
+                    "gmres": KrylovSolver._gmres,
+                    "bicgstab": KrylovSolver._bicgstab,
+                }[method]
+
+                with Tracer.span("iterate", engine=method, n=n):
+                    x, iterations = solve(A, b, M, tol * b_norm, max_iter, monitor)
+
+                    # Рекурентний залишок може відійти від справжнього: тоді доуточнюємо x
+                    # розв'язком A·d = b - A·x у межах решти ітерацій
+                    residual = float(np.linalg.norm(b - A @ x) / b_norm)
+                    refinements = 0
+                    while residual > tol and iterations < max_iter and refinements < KRYLOV_REFINEMENTS:
+                        d, extra = solve(A, b - A @ x, M, tol * b_norm, max_iter - iterations, monitor)
+                        x += d
+                        iterations += extra
+                        refinements += 1
+                        residual = float(np.linalg.norm(b - A @ x) / b_norm)
+
+            # Звітуємо справжній залишок; розв'язок гірший за tol — не "completed"
+            residual = float(np.linalg.norm(b - A @ x) / b_norm) if b_norm else 0.0
+            if not np.isfinite(residual) or residual > tol:
+                raise ValueError(
+                    f"Метод {method} не збігся за {iterations} ітерацій "
+                    f"(відносний залишок {residual:.3e}, потрібно {tol:.1e})"
+                )
+
+            solution = GaussSolver._round_solution(x)
+
+            ProgressTracker.finish(task_id)
+
+            Tracer.event("krylov.completed", total=time.time() - start_time, iterations=iterations, residual=residual)
+
+            return {
+                "task_id": task_id,
+                "status": "completed",
+                "solution": solution,
+                "stats": {
+                    "method": method,
+                    "preconditioner": preconditioner,
+                    "iterations": iterations,
+                    "residual": residual
+                }
+            }
+
+        except TaskCancelledError:
+            Tracer.event("krylov.cancelled")
+            ProgressTracker.update(task_id, 0, matrix_size=n)
+            return {
+                "task_id": task_id,
+                "status": "cancelled",
+                "solution": None
+            }
+
+        except Exception as e:
+            Tracer.event("krylov.error", level="error", type=type(e).__name__, error=str(e))
+
+            ProgressTracker.update(task_id, 0, matrix_size=n)
+            return {
+                "task_id": task_id,
+                "status": "error",
+                "error": str(e),
+                "solution": None
+            }
+
+    @staticmethod
+    def _monitor(task_id: str, start_time: float, n: int, b_norm: float, tol: float):
+
+        # Викликається після кожної ітерації: скасування, тайм-аут і прогрес 5 → 95%.
+        # Прогрес не спадає, навіть коли залишок тимчасово росте (BiCGSTAB, рестарти GMRES)
+        span = -math.log(tol)
+        state = {"progress": 5.0}
+
+        def monitor(iteration: int, residual: float):
+            if CancelationManager.is_cancelled(task_id):
+                raise TaskCancelledError(task_id)
+            TaskValidator.validate_timeout(start_time)
+
+            if not np.isfinite(residual):
+                raise ValueError(f"Метод розійшовся на ітерації {iteration}")
+
+            reduction = math.log(b_norm / residual) if residual > 0 else span
+            progress = 5 + 90 * min(1.0, max(0.0, reduction / span))
+            if progress >= state["progress"] + 1:
+                state["progress"] = progress
+                ProgressTracker.update(task_id, progress, matrix_size=n)
+
+        return monitor
+
+    @staticmethod
+    def _preconditioner(A, kind: str):
+
+        # Повертає функцію r -> M⁻¹ r
+        if kind == "none":
+            return lambda r: r
+
+        if kind == "jacobi":
+            diagonal = np.asarray(A.diagonal(), dtype=float)
+            zero = np.flatnonzero(diagonal == 0)
+            if len(zero):
+                raise ValueError(f"Передобумовлювач Якобі: нульовий елемент на діагоналі (рядок {zero[0]})")
+            inverse = 1.0 / diagonal
+            return lambda r: inverse * r
+
+        if kind == "ilu":
+            if spilu is None:
+                raise RuntimeError("Передобумовлювач ILU потребує SciPy")
+            # Неповний LU з відкиданням малих елементів: для щільної A — розріджене наближення
+            try:
+                ilu = spilu(scipy.sparse.csc_matrix(A), drop_tol=ILU_DROP_TOL, fill_factor=ILU_FILL_FACTOR)
+            except RuntimeError as e:
+                raise ValueError(f"Не вдалося побудувати ILU: {e}")
+            return ilu.solve
+
+        raise ValueError(f"Невідомий передобумовлювач '{kind}'")
+
+    @staticmethod
+    def _cg(A, b: np.ndarray, M, target: float, max_iter: int, monitor):
+
+        x = np.zeros_like(b)
+        r = b.copy()
+        z = M(r)
+        p = z.copy()
+        rz = r @ z
+
+        for k in range(1, max_iter + 1):
+            Ap = A @ p
+            pAp = p @ Ap
+            if pAp <= 0:
+                raise ValueError("Метод CG: матриця не є симетричною додатно визначеною")
+
+            alpha = rz / pAp
+            x += alpha * p
+            r -= alpha * Ap
+
+            residual = np.linalg.norm(r)
+            monitor(k, residual)
+            if residual <= target:
+                return x, k
+
+            z = M(r)
+            rz_next = r @ z
+            p = z + (rz_next / rz) * p
+            rz = rz_next
+
+        return x, max_iter
+
+    @staticmethod
+    def _bicgstab(A, b: np.ndarray, M, target: float, max_iter: int, monitor):
+
+        # Праве передобумовлення: залишок r — залишок вихідної системи
+        x = np.zeros_like(b)
+        r = b.copy()
+        r_hat = r.copy()
+        rho = alpha = omega = 1.0
+        v = np.zeros_like(b)
+        p = np.zeros_like(b)
+
+        for k in range(1, max_iter + 1):
+            rho_next = r_hat @ r
+            if rho_next == 0:
+                raise ValueError(f"Метод BiCGSTAB: вироджений крок на ітерації {k}")
+
+            p = r + (rho_next / rho) * (alpha / omega) * (p - omega * v)
+            p_hat = M(p)
+            v = A @ p_hat
+            alpha = rho_next / (r_hat @ v)
+
+            s = r - alpha * v
+            residual = np.linalg.norm(s)
+            if residual <= target:
+                x += alpha * p_hat
+                monitor(k, residual)
+                return x, k
+
+            s_hat = M(s)
+            t = A @ s_hat
+            tt = t @ t
+            if tt == 0:
+                raise ValueError(f"Метод BiCGSTAB: вироджений крок на ітерації {k}")
+            omega = (t @ s) / tt
+
+            x += alpha * p_hat + omega * s_hat
+            r = s - omega * t
+            rho = rho_next
+
+            residual = np.linalg.norm(r)
+            monitor(k, residual)
+            if residual <= target:
+                return x, k
+            if omega == 0:
+                raise ValueError(f"Метод BiCGSTAB: вироджений крок на ітерації {k}")
+
+        return x, max_iter
+
+    @staticmethod
+    def _gmres(A, b: np.ndarray, M, target: float, max_iter: int, monitor):
+
+        # GMRES(m) з рестартами та правим передобумовленням; мінімізація залишку —
+        # через обертання Гівенса, тож його норма відома на кожній ітерації без множень
+        n = len(b)
+        m = min(GMRES_RESTART, n)
+        x = np.zeros_like(b)
+        total = 0
+
+        while total < max_iter:
+            r = b - A @ x
+            beta = np.linalg.norm(r)
+            if beta <= target:
+                break
+
+            V = np.zeros((m + 1, n))
+            H = np.zeros((m + 1, m))
+            cs = np.zeros(m)
+            sn = np.zeros(m)
+            g = np.zeros(m + 1)
+            g[0] = beta
+            V[0] = r / beta
+
+            k = 0
+            converged = False
+            for j in range(m):
+                w = A @ M(V[j])
+                for i in range(j + 1):
+                    H[i, j] = w @ V[i]
+                    w -= H[i, j] * V[i]
+                H[j + 1, j] = np.linalg.norm(w)
+                if H[j + 1, j] != 0:
+                    V[j + 1] = w / H[j + 1, j]
+
+                for i in range(j):
+                    H[i, j], H[i + 1, j] = (
+                        cs[i] * H[i, j] + sn[i] * H[i + 1, j],
+                        -sn[i] * H[i, j] + cs[i] * H[i + 1, j]
+                    )
+
+                denominator = math.hypot(H[j, j], H[j + 1, j])
+                if denominator == 0:
+                    raise ValueError(f"Метод GMRES: вироджений крок на ітерації {total + 1}")
+                cs[j] = H[j, j] / denominator
+                sn[j] = H[j + 1, j] / denominator
+                H[j, j] = denominator
+                H[j + 1, j] = 0.0
+                g[j + 1] = -sn[j] * g[j]
+                g[j] = cs[j] * g[j]
+
+                k = j + 1
+                total += 1
+                residual = abs(g[k])
+                monitor(total, residual)
+
+                if residual <= target:
+                    converged = True
+                    break
+                if total >= max_iter:
+                    break
+
+            y = np.linalg.solve(np.triu(H[:k, :k]), g[:k])
+            x += M(V[:k].T @ y)
+
+            if converged:
+                break
+
+        return x, total
@@ -0,0 +1,237 @@
+import numpy as np
+import time
+from backend.core.progress import ProgressTracker
+from backend.core.cancelation import TaskCancelledError
+from backend.core.gauss_solver import GaussSolver
+from backend.core.work_model import WorkModel
+from backend.core.metrics import Metrics
+from backend.core.tracing import Tracer
+
+try:
+    from scipy.linalg import solve_triangular
+except ImportError:
+    solve_triangular = None
+
+LU_BLOCK_SIZE = 128
+UPDATE_STRIP_ROWS = 512
+PIVOT_TOLERANCE = 1e-10
+
+
+def _solve_triangular(T: np.ndarray, B: np.ndarray, lower: bool, unit_diagonal: bool = False) -> np.ndarray:
+
+    if solve_triangular is not None:
+        return solve_triangular(T, B, lower=lower, unit_diagonal=unit_diagonal, check_finite=False)
+
+    # Запасний варіант без SciPy: блочна підстановка, кожен блок — щільний solve + gemv/gemm
+    n = T.shape[0]
+    X = np.array(B, dtype=np.result_type(T, B), copy=True)
+    starts = list(range(0, n, LU_BLOCK_SIZE))
+    if not lower:
+        starts.reverse()
+
+    for s in starts:
+        e = min(s + LU_BLOCK_SIZE, n)
+        if lower:
+            if s > 0:
+                X[s:e] -= T[s:e, :s] @ X[:s]
+            D = np.tril(T[s:e, s:e], -1 if unit_diagonal else 0)
+        else:
+            if e < n:
+                X[s:e] -= T[s:e, e:] @ X[e:]
+            D = np.triu(T[s:e, s:e], 1 if unit_diagonal else 0)
+        if unit_diagonal:
+            D += np.eye(e - s, dtype=D.dtype)
+        X[s:e] = np.linalg.solve(D, X[s:e])
+
+    return X
+
+
+class BlockedLUSolver:
+
+    @staticmethod
+    def factorize(A: np.ndarray, block_size: int = LU_BLOCK_SIZE, on_panel=None, on_pivot=None) -> np.ndarray:
+
+        # Right-looking блочний LU з частковим вибором головного елемента, in-place:
+        # після виходу A містить L (під діагоналлю, одинична діагональ) та U,
+        # A_orig[perm] = L @ U; on_panel(k, n) викликається на межі кожної панелі,
+        # on_pivot(j) — перед кожним головним елементом
+
+        n = A.shape[0]
+        perm = np.arange(n)
+
+        for k0 in range(0, n, block_size):
+            if on_panel is not None:
+                on_panel(k0, n)
+
+            k1 = min(k0 + block_size, n)
+
+            for j in range(k0, k1):
+                if on_pivot is not None:
+                    on_pivot(j)
+
+                p = j + int(np.argmax(np.abs(A[j:, j])))
+                if p != j:
+                    A[[j, p]] = A[[p, j]]
+                    perm[[j, p]] = perm[[p, j]]
+
+                pivot = A[j, j]
+                if abs(pivot) < PIVOT_TOLERANCE:
+                    raise ValueError(f"Матриця вироджена: нульовий елемент на діагоналі (рядок {j})")
+
+                A[j+1:, j] /= pivot
+                if j + 1 < k1:
+                    A[j+1:, j+1:k1] -= np.outer(A[j+1:, j], A[j, j+1:k1])
+
+            if k1 < n:
+                A[k0:k1, k1:] = _solve_triangular(A[k0:k1, k0:k1], A[k0:k1, k1:], lower=True, unit_diagonal=True)
+
+                # Оновлення trailing-підматриці смугами, щоб тимчасовий буфер gemm не дорівнював усій матриці
+                U12 = A[k0:k1, k1:]
+                for r0 in range(k1, n, UPDATE_STRIP_ROWS):
+                    r1 = min(r0 + UPDATE_STRIP_ROWS, n)
+                    A[r0:r1, k1:] -= A[r0:r1, k0:k1] @ U12
+
+        return perm
+
+    @staticmethod
+    def lu_solve(LU: np.ndarray, perm: np.ndarray, b: np.ndarray) -> np.ndarray:
+        y = _solve_triangular(LU, b[perm], lower=True, unit_diagonal=True)
+        return _solve_triangular(LU, y, lower=False)
+
+    @staticmethod
+    def _task_callbacks(
+        task_id: str,
+        start_time: float,
+        n: int,
+        span: float,
+        start: float = 5,
+        engine: str = "blocked_lu"
+    ):
+
+        # Контрольні точки WorkModel (за годинником) перед головними елементами й на межах панелей;
+        # прогрес start → start + span — за флопами виключення перших k стовпців
+        report = WorkModel.tracker(task_id, engine, n, WorkModel.elimination_flops(n), start_time, start, span)
+
+        def on_pivot(j: int):
+            report(WorkModel.elimination_flops(n, j))
+
+        def on_panel(k: int, size: int):
+            report(WorkModel.elimination_flops(n, k), force=k >= size)
+
+        return on_panel, on_pivot
+
+    @staticmethod
+    def factorize_system(task_id: str, user_id: int, matrix: np.ndarray, perm_out: np.ndarray):
+
+        # Лише факторизація, на місці: matrix — записуваний буфер (файл FactorizationStore),
+        # після виходу в ньому LU, а в perm_out — перестановка рядків
+        n = len(matrix)
+        Tracer.event("blocked_lu.factorize_start", n=n, block_size=LU_BLOCK_SIZE)
+        start_time = time.time()
+
+        try:
+            ProgressTracker.start(task_id, user_id)
+            ProgressTracker.update(task_id, 5, matrix_size=n)
+
+            on_panel, on_pivot = BlockedLUSolver._task_callbacks(task_id, start_time, n, 95)
+            factor_start = time.time()
+            with Tracer.span("forward", engine="blocked_lu", n=n):
+                perm_out[:] = BlockedLUSolver.factorize(matrix, on_panel=on_panel, on_pivot=on_pivot)
+            factor_time = time.time() - factor_start
+            WorkModel.record("blocked_lu", WorkModel.elimination_flops(n), factor_time)
+            Metrics.observe("solver_forward_seconds", factor_time, engine="blocked_lu", size=Metrics.size_bucket(n))
+
+            ProgressTracker.finish(task_id)
+            Tracer.event("blocked_lu.factorize_completed", total=time.time() - start_time)
+
+            return {
+                "task_id": task_id,
+                "status": "completed",
+                "n": n
+            }
+
+        except TaskCancelledError:
+            Tracer.event("blocked_lu.cancelled")
+            ProgressTracker.update(task_id, 0, matrix_size=n)
+            return {
+                "task_id": task_id,
+                "status": "cancelled"
+            }
+
+        except Exception as e:
+            Tracer.event("blocked_lu.error", level="error", type=type(e).__name__, error=str(e))
+            ProgressTracker.update(task_id, 0, matrix_size=n)
+            return {
+                "task_id": task_id,
+                "status": "error",
+                "error": str(e)
+            }
+
+    @staticmethod
+    def solve_system(task_id: str, user_id: int, matrix: list[list[float]], vector: list[float]):
+
+        Tracer.event("blocked_lu.start", n=len(matrix), block_size=LU_BLOCK_SIZE)
+        start_time = time.time()
+
+        try:
+
+            A = np.array(matrix, dtype=float)
+            b = np.array(vector, dtype=float)
+            n = len(A)
+
+            ProgressTracker.start(task_id, user_id)
+            ProgressTracker.update(task_id, 5, matrix_size=n)
+
+            on_panel, on_pivot = BlockedLUSolver._task_callbacks(task_id, start_time, n, 85)
+
+            factor_start = time.time()
+            with Tracer.span("forward", engine="blocked_lu", n=n):
+                perm = BlockedLUSolver.factorize(A, on_panel=on_panel, on_pivot=on_pivot)
+            factor_time = time.time() - factor_start
+            WorkModel.record("blocked_lu", WorkModel.elimination_flops(n), factor_time)
+
+            on_panel(n, n)
+
+            solve_start = time.time()
+            with Tracer.span("backward", engine="blocked_lu", n=n):
+                x = BlockedLUSolver.lu_solve(A, perm, b)
+            solve_time = time.time() - solve_start
+            Metrics.observe("solver_forward_seconds", factor_time, engine="blocked_lu", size=Metrics.size_bucket(n))
+            Metrics.observe("solver_backward_seconds", solve_time, engine="blocked_lu", size=Metrics.size_bucket(n))
+
+            solution = GaussSolver._round_solution(x)
+
+            ProgressTracker.finish(task_id)
+
+            Tracer.event(
+                "blocked_lu.completed",
+                total=time.time() - start_time,
+                forward=factor_time,
+                backward=solve_time
+            )
+
+            return {
+                "task_id": task_id,
+                "status": "completed",
+                "solution": solution
+            }
+
+        except TaskCancelledError:
+            Tracer.event("blocked_lu.cancelled")
+            ProgressTracker.update(task_id, 0, matrix_size=len(matrix))
+            return {
+                "task_id": task_id,
+                "status": "cancelled",
+                "solution": None
+            }
+
+        except Exception as e:
+            Tracer.event("blocked_lu.error", level="error", type=type(e).__name__, error=str(e))
+
+            ProgressTracker.update(task_id, 0, matrix_size=len(matrix))
+            return {
+                "task_id": task_id,
+                "status": "error",
+                "error": str(e),
+                "solution": None
+            }
@@ -0,0 +1,82 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from backend.core.db_bridge import DBBridge
+from backend.core.validation import MAX_TIME
+from backend.core.tracing import Tracer
+from backend.core.worker_pool import SolverPool
+from backend.db import repository
+
+TASK_PROGRESS_RETENTION_DAYS = int(os.getenv("TASK_PROGRESS_RETENTION_DAYS", 7))
+TASK_PROGRESS_PARTITIONS_AHEAD = int(os.getenv("TASK_PROGRESS_PARTITIONS_AHEAD", 3))
+MAINTENANCE_INTERVAL = float(os.getenv("MAINTENANCE_INTERVAL", 60))
+# Обчислення не триває довше за MAX_TIME (TaskValidator) — із запасом на запис результату
+STALE_PROCESSING_TIMEOUT = float(os.getenv("STALE_PROCESSING_TIMEOUT", MAX_TIME + 300))
+STALE_QUEUED_TIMEOUT = float(os.getenv("STALE_QUEUED_TIMEOUT", 6 * 3600))
+
+
+class Maintenance:
+
+    # Фонове обслуговування task_progress у процесі API, на loop DBBridge:
+    # секції на TASK_PROGRESS_PARTITIONS_AHEAD днів уперед, відкидання секцій, старших
+    # за TASK_PROGRESS_RETENTION_DAYS, і позначення як помилкових задач, що зависли в
+    # processing/queued після падіння воркера чи репліки. Репліки запускають цикл
+    # незалежно, але кожен крок виконує лише та, що взяла advisory lock.
+
+    _future = None
+
+    @staticmethod
+    def start():
+        if Maintenance._future is None or Maintenance._future.done():
+            Maintenance._future = DBBridge.run_coroutine_soon(Maintenance._run())
+
+    @staticmethod
+    def shutdown():
+        if Maintenance._future is not None:
+            Maintenance._future.cancel()
+            Maintenance._future = None
+
+    @staticmethod
+    async def _run():
+        while True:
+            try:
+                await Maintenance.run_once()
+            except Exception as e:
+                Tracer.event("maintenance.failed", level="error", error=str(e))
+            await asyncio.sleep(MAINTENANCE_INTERVAL)
+
+    @staticmethod
+    async def _call(fn, *args):
+        # Окрема сесія DBBridge на кожен крок: збій одного не відкочує інші
+        return await asyncio.wrap_future(DBBridge.submit(fn, *args))
+
+    @staticmethod
+    async def run_once() -> dict:
+
+        now = datetime.utcnow()
+        today = now.date()
+
+        created = await Maintenance._call(
+            repository.ensure_task_progress_partitions, today, TASK_PROGRESS_PARTITIONS_AHEAD + 1
+        )
+        dropped = await Maintenance._call(
+            repository.drop_task_progress_partitions, today - timedelta(days=TASK_PROGRESS_RETENTION_DAYS)
+        )
+        reaped = await Maintenance._call(
+            repository.reap_stale_tasks,
+            now - timedelta(seconds=STALE_PROCESSING_TIMEOUT),
+            now - timedelta(seconds=STALE_QUEUED_TIMEOUT),
+            "Задачу перервано: обчислення не завершилось (воркер або сервер зупинився)"
+        )
+
+        if created:
+            Tracer.event("maintenance.partitions_created", partitions=",".join(created))
+        if dropped:
+            Tracer.event("maintenance.partitions_dropped", partitions=",".join(dropped))
+        if reaped:
+            Tracer.event("maintenance.tasks_reaped", level="warning", count=len(reaped))
+            # Інші репліки прибирають свої записи планувальника за NOTIFY; тут — не чекаючи на нього
+            for task_id in reaped:
+                SolverPool.cancel_waiting(task_id)
+
+        return {"created": created, "dropped": dropped, "reaped": reaped}
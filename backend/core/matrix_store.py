@@ -0,0 +1,113 @@
+import hashlib
+import io
+import zlib
+import numpy as np
+
+MATRIX_DTYPE = np.dtype("<f8")
+MATRIX_CODEC = "shuffle-zlib"
+SPARSE_CODEC = "csr-npz"
+SPARSE_PARTS = ("indptr", "indices", "data", "rhs")
+MATRIX_COMPRESSION_LEVEL = 1
+PREVIEW_SIZE = 10
+
+
+class MatrixStore:
+
+    # Вхідні системи зберігаються один раз: ключ — хеш вмісту, значення — стиснутий [A | b].
+    # Перед zlib байти float64 переставляються по площинах (shuffle): старші байти
+    # сусідніх чисел схожі, тож так стиснення значно краще, ніж на сирих даних.
+    # Розріджені системи (CSR: indptr, indices, data + rhs) зберігаються як стиснутий .npz.
+
+    @staticmethod
+    def is_sparse(arrays: dict) -> bool:
+        return "indptr" in arrays
+
+    @staticmethod
+    def input_hash(arrays: dict) -> str:
+        if MatrixStore.is_sparse(arrays):
+            return MatrixStore.sparse_hash(*(arrays[name] for name in SPARSE_PARTS))
+        return MatrixStore.content_hash(arrays["matrix"], arrays["rhs"])
+
+    @staticmethod
+    def archive(arrays: dict) -> tuple[str, bytes]:
+        if MatrixStore.is_sparse(arrays):
+            buffer = io.BytesIO()
+            np.savez_compressed(buffer, **{name: arrays[name] for name in SPARSE_PARTS})
+            return SPARSE_CODEC, buffer.getvalue()
+        return MATRIX_CODEC, MatrixStore.encode(arrays["matrix"], arrays["rhs"])
+
+    @staticmethod
+    def restore(codec: str, data: bytes, n: int) -> dict:
+        # Обернене до archive: масиви системи з matrix_blobs
+        if codec == SPARSE_CODEC:
+            with np.load(io.BytesIO(data)) as parts:
+                return {name: parts[name] for name in SPARSE_PARTS}
+        matrix, rhs = MatrixStore.decode(data, n)
+        return {"matrix": matrix, "rhs": rhs}
+
+    @staticmethod
+    def input_summary(arrays: dict, input_hash: str) -> dict:
+        if MatrixStore.is_sparse(arrays):
+            return {
+                "n": len(arrays["rhs"]),
+                "nnz": len(arrays["data"]),
+                "format": "csr",
+                "hash": input_hash,
+                "codec": SPARSE_CODEC
+            }
+        return MatrixStore.summary(arrays["matrix"], arrays["rhs"], input_hash)
+
+    @staticmethod
+    def sparse_hash(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, rhs: np.ndarray) -> str:
+
+        digest = hashlib.blake2b(digest_size=32, person=b"csr")
+        for part, dtype in ((indptr, "<i8"), (indices, "<i8"), (data, MATRIX_DTYPE), (rhs, MATRIX_DTYPE)):
+            part = np.ascontiguousarray(part, dtype=dtype)
+            digest.update(np.array(part.shape, dtype="<i8").tobytes())
+            digest.update(memoryview(part).cast("B"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def content_hash(matrix: np.ndarray, rhs: np.ndarray) -> str:
+
+        matrix = np.ascontiguousarray(matrix, dtype=MATRIX_DTYPE)
+        rhs = np.ascontiguousarray(rhs, dtype=MATRIX_DTYPE)
+
+        digest = hashlib.blake2b(digest_size=32)
+        digest.update(np.array(matrix.shape, dtype="<i8").tobytes())
+        digest.update(memoryview(matrix).cast("B"))
+        digest.update(memoryview(rhs).cast("B"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def encode(matrix: np.ndarray, rhs: np.ndarray) -> bytes:
+
+        n = len(rhs)
+        values = np.empty(n * n + n, dtype=MATRIX_DTYPE)
+        values[:n * n] = np.asarray(matrix, dtype=MATRIX_DTYPE).reshape(-1)
+        values[n * n:] = rhs
+
+        planes = values.view(np.uint8).reshape(-1, MATRIX_DTYPE.itemsize).T.copy()
+        return zlib.compress(planes, MATRIX_COMPRESSION_LEVEL)
+
+    @staticmethod
+    def decode(data: bytes, n: int) -> tuple[np.ndarray, np.ndarray]:
+
+        planes = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+        values = planes.reshape(MATRIX_DTYPE.itemsize, -1).T.copy().view(MATRIX_DTYPE).reshape(-1)
+        return values[:n * n].reshape(n, n), values[n * n:]
+
+    @staticmethod
+    def summary(matrix: np.ndarray, rhs: np.ndarray, input_hash: str) -> dict:
+
+        # Те, що потрібно історії без розпакування: розмір і кут матриці для перегляду
+        n = len(rhs)
+        return {
+            "n": n,
+            "hash": input_hash,
+            "codec": MATRIX_CODEC,
+            "preview": {
+                "matrix": np.asarray(matrix[:PREVIEW_SIZE, :PREVIEW_SIZE]).tolist(),
+                "rhs": np.asarray(rhs[:PREVIEW_SIZE]).tolist()
+            }
+        }
@@ -0,0 +1,202 @@
+import bisect
+import math
+import os
+import threading
+import time
+
+METRICS_PUSH_INTERVAL = float(os.getenv("METRICS_PUSH_INTERVAL", 2.0))
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+SIZE_BUCKETS = (100, 500, 1000, 2000, 5000)
+
+# name -> (тип, опис, межі кошиків гістограми)
+METRICS = {
+    "solver_queue_wait_seconds": (
+        "histogram", "Time from submission until a worker picks the task up", DURATION_BUCKETS
+    ),
+    "solver_forward_seconds": (
+        "histogram", "Forward elimination / factorization time", DURATION_BUCKETS
+    ),
+    "solver_backward_seconds": (
+        "histogram", "Back substitution / triangular solve time", DURATION_BUCKETS
+    ),
+    "solver_solve_seconds": (
+        "histogram", "Total solve time in the worker", DURATION_BUCKETS
+    ),
+    "db_roundtrip_seconds": (
+        "histogram", "Database round-trip latency of solver-side operations", DB_BUCKETS
+    ),
+    "solver_tasks_total": (
+        "counter", "Finished solver tasks by outcome", None
+    ),
+}
+
+
+class Metrics:
+
+    # Метрики у форматі Prometheus без сторонніх залежностей. observe/inc — словник під
+    # локом і bisect, тож їх можна викликати з розв'язувача; рахуються фази, а не ітерації.
+    # Воркери пулу — окремі процеси: їхні значення накопичуються локально, і set_sink
+    # раз на METRICS_PUSH_INTERVAL (і після кожної задачі через flush) відправляє приріст
+    # батьківському процесу, який додає його через merge. Gauge — функції, що
+    # обчислюються в момент запиту /metrics.
+
+    _values = {}
+    _gauges = {}
+    _lock = threading.Lock()
+    _sink = None
+    _thread = None
+    _pid = None
+
+    @staticmethod
+    def size_bucket(n: int) -> str:
+        for bound in SIZE_BUCKETS:
+            if n <= bound:
+                return str(bound)
+        return "+Inf"
+
+    @staticmethod
+    def observe(name: str, value: float, **labels):
+
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect.bisect_left(buckets, value)
+
+        with Metrics._lock:
+            entry = Metrics._values.get(key)
+            if entry is None:
+                # Лічильники по кошиках (не накопичені), далі сума і кількість
+                entry = Metrics._values[key] = [0] * (len(buckets) + 1) + [0.0, 0]
+            entry[index] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    @staticmethod
+    def inc(name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with Metrics._lock:
+            Metrics._values[key] = Metrics._values.get(key, 0) + value
+
+    @staticmethod
+    def gauge(name: str, description: str, fn):
+        # fn() -> число або {((мітка, значення), ...): число}; перереєстрація замінює функцію
+        Metrics._gauges[name] = (description, fn)
+
+    @staticmethod
+    def drain() -> dict:
+        with Metrics._lock:
+            values = Metrics._values
+            Metrics._values = {}
+        return values
+
+    @staticmethod
+    def merge(values: dict):
+
+        with Metrics._lock:
+            for key, value in values.items():
+                current = Metrics._values.get(key)
+                if current is None:
+                    Metrics._values[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    for i, item in enumerate(value):
+                        current[i] += item
+                else:
+                    Metrics._values[key] = current + value
+
+    @staticmethod
+    def set_sink(send):
+
+        # send(values) викликається у воркері з приростом метрик; після fork/spawn потік новий
+        Metrics._sink = send
+        if Metrics._thread is not None and Metrics._pid == os.getpid():
+            return
+
+        Metrics._pid = os.getpid()
+        Metrics._thread = threading.Thread(target=Metrics._run, name="metrics-sink", daemon=True)
+        Metrics._thread.start()
+
+    @staticmethod
+    def _run():
+        while True:
+            time.sleep(METRICS_PUSH_INTERVAL)
+            Metrics.flush()
+
+    @staticmethod
+    def flush():
+
+        sink = Metrics._sink
+        if sink is None:
+            return
+        values = Metrics.drain()
+        if not values:
+            return
+        try:
+            sink(values)
+        except Exception as e:
+            # Приріст не губимо — піде з наступною спробою
+            Metrics.merge(values)
+            print(f"[Metrics] Warning: failed to ship metrics: {e}")
+
+    @staticmethod
+    def _labels(labels, extra: tuple = ()) -> str:
+        items = list(labels) + list(extra)
+        if not items:
+            return ""
+        escaped = (
+            key + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+            for key, value in items
+        )
+        return "{" + ",".join(escaped) + "}"
+
+    @staticmethod
+    def _number(value: float) -> str:
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    @staticmethod
+    def render() -> str:
+
+        with Metrics._lock:
+            values = {
+                key: list(value) if isinstance(value, list) else value
+                for key, value in Metrics._values.items()
+            }
+
+        lines = []
+        for name, (kind, description, buckets) in METRICS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for (metric, labels), value in sorted(values.items(), key=lambda item: item[0]):
+                if metric != name:
+                    continue
+                if kind == "counter":
+                    lines.append(f"{name}{Metrics._labels(labels)} {Metrics._number(value)}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(list(buckets) + [math.inf], value):
+                    cumulative += count
+                    le = "+Inf" if math.isinf(bound) else Metrics._number(float(bound))
+                    lines.append(f"{name}_bucket{Metrics._labels(labels, (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{Metrics._labels(labels)} {Metrics._number(value[-2])}")
+                lines.append(f"{name}_count{Metrics._labels(labels)} {value[-1]}")
+
+        for name, (description, fn) in Metrics._gauges.items():
+            try:
+                value = fn()
+            except Exception as e:
+                print(f"[Metrics] Warning: gauge {name} failed: {e}")
+                continue
+
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            if isinstance(value, dict):
+                for labels, item in value.items():
+                    lines.append(f"{name}{Metrics._labels(labels)} {Metrics._number(item)}")
+            else:
+                lines.append(f"{name} {Metrics._number(value)}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,181 @@
+import os
+import time
+import numpy as np
+from backend.core.validation import TaskValidator
+from backend.core.progress import ProgressTracker
+from backend.core.cancelation import CancelationManager, TaskCancelledError
+from backend.core.gauss_solver import GaussSolver
+from backend.core.lu_solver import BlockedLUSolver
+from backend.core.work_model import WorkModel
+from backend.core.metrics import Metrics
+from backend.core.tracing import Tracer
+
+MIXED_MAX_REFINEMENTS = int(os.getenv("MIXED_MAX_REFINEMENTS", 10))
+# Крок уточнення має зменшувати похибку хоча б удвічі, інакше — повний float64
+MIXED_MIN_REDUCTION = 0.5
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+
+class MixedPrecisionLUSolver:
+
+    # LU у float32 (удвічі менше даних для BLAS), потім ітераційне уточнення в float64:
+    # r = b - A·x рахується з вихідною матрицею (без копії), поправка d з float32-LU.
+    # Зупинка, коли нормована зворотна похибка ||r||∞ / (||A||∞·||x||∞ + ||b||∞) не більша
+    # за √n·eps(float64) — як у LAPACK dsgesv. Якщо уточнення застрягло, float32-LU
+    # виявився виродженим або матриця не вміщується в діапазон float32 — розв'язуємо
+    # звичайним блочним LU у float64.
+
+    @staticmethod
+    def solve_system(task_id: str, user_id: int, matrix: np.ndarray, vector: np.ndarray):
+
+        n = len(vector)
+        Tracer.event("mixed_lu.start", n=n)
+        start_time = time.time()
+
+        try:
+
+            A = np.asarray(matrix, dtype=float)
+            b = np.array(vector, dtype=float)
+
+            ProgressTracker.start(task_id, user_id)
+            ProgressTracker.update(task_id, 5, matrix_size=n)
+
+            a_norm = float(np.max(np.sum(np.abs(A), axis=1)))
+            b_norm = float(np.max(np.abs(b)))
+            target = np.sqrt(n) * np.finfo(np.float64).eps
+
+            x, steps, backward_error = MixedPrecisionLUSolver._refine(
+                task_id, start_time, A, b, a_norm, b_norm, target
+            )
+            precision = "float32"
+
+            if x is None:
+                Tracer.event("mixed_lu.fallback", level="warning", steps=steps, backward_error=backward_error)
+                x, backward_error = MixedPrecisionLUSolver._solve_float64(task_id, start_time, A, b, a_norm, b_norm)
+                precision = "float64"
+
+            solution = GaussSolver._round_solution(x)
+
+            ProgressTracker.finish(task_id)
+
+            Tracer.event(
+                "mixed_lu.completed",
+                total=time.time() - start_time,
+                precision=precision,
+                steps=steps,
+                backward_error=backward_error
+            )
+
+            return {
+                "task_id": task_id,
+                "status": "completed",
+                "solution": solution,
+                "stats": {
+                    "method": "mixed_lu",
+                    "precision": precision,
+                    "iterations": steps,
+                    "backward_error": backward_error
+                }
+            }
+
+        except TaskCancelledError:
+            Tracer.event("mixed_lu.cancelled")
+            ProgressTracker.update(task_id, 0, matrix_size=n)
+            return {
+                "task_id": task_id,
+                "status": "cancelled",
+                "solution": None
+            }
+
+        except Exception as e:
+            Tracer.event("mixed_lu.error", level="error", type=type(e).__name__, error=str(e))
+
+            ProgressTracker.update(task_id, 0, matrix_size=n)
+            return {
+                "task_id": task_id,
+                "status": "error",
+                "error": str(e),
+                "solution": None
+            }
+
+    @staticmethod
+    def backward_error(A: np.ndarray, x: np.ndarray, b: np.ndarray, a_norm: float, b_norm: float):
+
+        # Повертає (залишок r, нормована зворотна похибка)
+        r = b - A @ x
+        denominator = a_norm * float(np.max(np.abs(x))) + b_norm
+        error = float(np.max(np.abs(r))) / denominator if denominator > 0 else 0.0
+        return r, error
+
+    @staticmethod
+    def _refine(task_id: str, start_time: float, A: np.ndarray, b: np.ndarray, a_norm: float, b_norm: float, target: float):
+
+        # Повертає (x, кроки, похибка) або (None, кроки, похибка), якщо потрібен float64
+        n = len(b)
+        if a_norm > FLOAT32_MAX or b_norm > FLOAT32_MAX:
+            return None, 0, float("inf")
+
+        A32 = A.astype(np.float32)
+        on_panel, on_pivot = BlockedLUSolver._task_callbacks(task_id, start_time, n, 70, engine="mixed_lu")
+
+        factor_start = time.time()
+        try:
+            with Tracer.span("forward", engine="mixed_lu", n=n, precision="float32"):
+                perm = BlockedLUSolver.factorize(A32, on_panel=on_panel, on_pivot=on_pivot)
+        except ValueError as e:
+            # Головний елемент зник через округлення до float32 — вирішить float64
+            Tracer.event("mixed_lu.float32_failed", level="warning", error=str(e))
+            return None, 0, float("inf")
+        factor_time = time.time() - factor_start
+        WorkModel.record("mixed_lu", WorkModel.elimination_flops(n), factor_time)
+        Metrics.observe("solver_forward_seconds", factor_time, engine="mixed_lu", size=Metrics.size_bucket(n))
+
+        on_panel(n, n)
+        solve_start = time.time()
+
+        x = BlockedLUSolver.lu_solve(A32, perm, b.astype(np.float32)).astype(np.float64)
+        r, error = MixedPrecisionLUSolver.backward_error(A, x, b, a_norm, b_norm)
+
+        steps = 0
+        while error > target and steps < MIXED_MAX_REFINEMENTS and np.isfinite(error):
+
+            if CancelationManager.is_cancelled(task_id):
+                raise TaskCancelledError(task_id)
+            TaskValidator.validate_timeout(start_time)
+
+            steps += 1
+            ProgressTracker.update(task_id, 75 + 20 * steps / MIXED_MAX_REFINEMENTS, matrix_size=n)
+
+            # Залишок нормується перед переведенням у float32, щоб не зникнути в субнормальних числах
+            scale = float(np.max(np.abs(r)))
+            d = BlockedLUSolver.lu_solve(A32, perm, (r / scale).astype(np.float32))
+            x = x + scale * d.astype(np.float64)
+
+            previous = error
+            r, error = MixedPrecisionLUSolver.backward_error(A, x, b, a_norm, b_norm)
+            Tracer.event("mixed_lu.refinement_step", level="debug", step=steps, backward_error=error)
+
+            if error > target and error > previous * MIXED_MIN_REDUCTION:
+                break
+
+        # Підстановки разом з уточненням
+        Metrics.observe("solver_backward_seconds", time.time() - solve_start, engine="mixed_lu", size=Metrics.size_bucket(n))
+        return (x if error <= target else None), steps, error
+
+    @staticmethod
+    def _solve_float64(task_id: str, start_time: float, A: np.ndarray, b: np.ndarray, a_norm: float, b_norm: float):
+
+        LU = np.array(A, dtype=np.float64)
+        n = len(b)
+        on_panel, on_pivot = BlockedLUSolver._task_callbacks(task_id, start_time, n, 20, start=75)
+
+        factor_start = time.time()
+        with Tracer.span("forward", engine="mixed_lu", n=n, precision="float64"):
+            perm = BlockedLUSolver.factorize(LU, on_panel=on_panel, on_pivot=on_pivot)
+        factor_time = time.time() - factor_start
+        WorkModel.record("blocked_lu", WorkModel.elimination_flops(n), factor_time)
+        Metrics.observe("solver_forward_seconds", factor_time, engine="mixed_lu", size=Metrics.size_bucket(n))
+
+        x = BlockedLUSolver.lu_solve(LU, perm, b)
+        _, error = MixedPrecisionLUSolver.backward_error(A, x, b, a_norm, b_norm)
+        return x, error
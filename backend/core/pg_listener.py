@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import asyncpg
+from backend.core.db_bridge import DBBridge
+from backend.db.database import DATABASE_URL
+
+LISTEN_RECONNECT_DELAY = 2.0
+
+LISTEN_DSN = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+
+class PgListener:
+
+    # Одне LISTEN-з'єднання на процес, що живе на фоновому loop DBBridge;
+    # колбеки викликаються в потоці цього loop
+
+    _callbacks = {}
+    _on_reconnect = []
+    _connection = None
+    _channels = set()
+    _started = False
+    _lock = threading.Lock()
+
+    @staticmethod
+    def subscribe(channel: str, callback, on_reconnect=None):
+
+        with PgListener._lock:
+            PgListener._callbacks.setdefault(channel, []).append(callback)
+            if on_reconnect is not None:
+                PgListener._on_reconnect.append(on_reconnect)
+            start = not PgListener._started
+            PgListener._started = True
+
+        if start:
+            DBBridge.run_coroutine_soon(PgListener._listen())
+        elif PgListener._connection is not None:
+            DBBridge.run_coroutine_soon(PgListener._add_channel(PgListener._connection, channel))
+
+    @staticmethod
+    def is_listening() -> bool:
+        return PgListener._connection is not None
+
+    @staticmethod
+    async def _add_channel(conn, channel: str):
+
+        if channel in PgListener._channels:
+            return
+        PgListener._channels.add(channel)
+
+        def dispatch(connection, pid, channel, payload):
+            for callback in PgListener._callbacks.get(channel, []):
+                try:
+                    callback(payload)
+                except Exception as e:
+                    print(f"[PgListener] Callback error on '{channel}': {e}")
+
+        await conn.add_listener(channel, dispatch)
+        print(f"[PgListener] Listening on channel '{channel}'")
+
+    @staticmethod
+    async def _listen():
+
+        while True:
+            closed = asyncio.Event()
+            conn = None
+            try:
+                conn = await asyncpg.connect(LISTEN_DSN)
+                conn.add_termination_listener(lambda _conn: closed.set())
+                PgListener._channels = set()
+                PgListener._connection = conn
+
+                # Канали, підписані після цієї точки, додає сам subscribe
+                for channel in list(PgListener._callbacks):
+                    await PgListener._add_channel(conn, channel)
+
+                # Поки з'єднання не було, сповіщення могли загубитися
+                for callback in list(PgListener._on_reconnect):
+                    callback()
+
+                await closed.wait()
+            except asyncio.CancelledError:
+                PgListener._connection = None
+                if conn is not None:
+                    await conn.close()
+                raise
+            except Exception as e:
+                print(f"[PgListener] Listener error: {e}")
+
+            PgListener._connection = None
+            await asyncio.sleep(LISTEN_RECONNECT_DELAY)
@@ -1,164 +1,68 @@
-import asyncio
-import threading
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from backend.db.database import DATABASE_URL
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.db_bridge import DBBridge
+from backend.core.progress_writer import ProgressWriter
+from backend.core.tracing import Tracer
 from backend.db import repository
 
 class ProgressTracker:
 
-    _last_saved = {}
-    _last_saved_lock = threading.Lock()
+    _publisher = None
 
     @staticmethod
-    def _run_async_in_thread(coro):
-
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(coro)
-            return result
-        except Exception as e:
-            print(f"[ProgressTracker] Error in async execution: {e}")
-            return None
-        finally:
-            # Закриваємо всі pending tasks
-            try:
-                pending = asyncio.all_tasks(loop)
-                for task in pending:
-                    task.cancel()
-                # Даємо tasks можливість завершитися
-                if pending:
-                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-            except Exception:
-                pass
-            finally:
-                loop.close()
-
-    @staticmethod
-    def _create_db_session():
-
-        engine = create_async_engine(
-            DATABASE_URL, 
-            echo=False,
-            pool_size=5,
-            max_overflow=10,
-            pool_pre_ping=True
-        )
-        
-        async_session_maker = sessionmaker(
-            bind=engine,
-            class_=AsyncSession,
-            expire_on_commit=False
-        )
-        
-        return async_session_maker, engine
+    def set_publisher(publisher):
+        # publisher(task_id, value, eta) отримує кожне оновлення одразу, без очікування запису в БД
+        ProgressTracker._publisher = publisher
 
     @staticmethod
     def start(task_id: str, user_id: int = None):
 
         if user_id is None:
-            print(f"[ProgressTracker] Warning: user_id not provided for {task_id}")
+            Tracer.event("progress.no_user", level="warning")
             return
-        
-        async def _start():
-            session_maker, engine = ProgressTracker._create_db_session()
-            try:
-                async with session_maker() as db:
-                    await repository.create_task_progress(db, task_id, user_id)
-            finally:
-                await engine.dispose()
-        
-        ProgressTracker._run_async_in_thread(_start())
-        
-        with ProgressTracker._last_saved_lock:
-            ProgressTracker._last_saved[task_id] = 0
+
+        try:
+            DBBridge.run(repository.start_task_progress, task_id, user_id)
+        except Exception as e:
+            Tracer.event("progress.start_failed", level="warning", error=str(e))
 
     @staticmethod
-    def update(task_id: str, value: float, matrix_size: int = 100):
+    def update(task_id: str, value: float, matrix_size: int = 100, eta: float = None):
 
+        # Не блокує розв'язувач: у БД значення потрапить з наступним пакетом ProgressWriter.
+        # eta — оцінка решти часу в секундах від розв'язувача (None — невідомо)
         value = min(100, max(0, value))
 
-        if int(value) % 20 == 0:
-            print(f"[ProgressTracker] Task {task_id}: {int(value)}%")
-
-        with ProgressTracker._last_saved_lock:
-            last_saved = ProgressTracker._last_saved.get(task_id, 0)
-
-        if matrix_size <= 100:
-            threshold = 10
-        elif matrix_size <= 500:
-            threshold = 5
-        else:
-            threshold = 2
-
-        should_update = (
-            value == 100 or
-            value == 0 or
-            abs(value - last_saved) >= threshold
-        )
-        
-        if not should_update:
-            return
-        
-        async def _update():
-            session_maker, engine = ProgressTracker._create_db_session()
-            try:
-                async with session_maker() as db:
-                    await repository.update_task_progress_value(db, task_id, value)
-            finally:
-                await engine.dispose()
-        
-        try:
-            ProgressTracker._run_async_in_thread(_update())
-            
-            with ProgressTracker._last_saved_lock:
-                ProgressTracker._last_saved[task_id] = value
-        except Exception as e:
-            print(f"[ProgressTracker] Warning: failed to update progress: {e}")
+        if ProgressTracker._publisher is not None:
+            ProgressTracker._publisher(task_id, value, eta)
+
+        Tracer.event("progress", level="debug", value=value, eta=eta)
+
+        ProgressWriter.submit(task_id, value, eta)
 
     @staticmethod
     def get(task_id: str):
-        async def _get():
-            session_maker, engine = ProgressTracker._create_db_session()
-            try:
-                async with session_maker() as db:
-                    task = await repository.get_task_progress(db, task_id)
-                    if task is None:
-                        return None
-                    return task.progress
-            finally:
-                await engine.dispose()
-        
+        async def _get(db: AsyncSession):
+            task = await repository.get_task_progress(db, task_id)
+            if task is None:
+                return None
+            return task.progress
+
         try:
-            return ProgressTracker._run_async_in_thread(_get())
+            return DBBridge.run(_get)
         except Exception as e:
-            print(f"[ProgressTracker] Warning: failed to get progress: {e}")
+            Tracer.event("progress.get_failed", level="warning", error=str(e))
             return None
 
     @staticmethod
     def finish(task_id: str):
-        async def _finish():
-            session_maker, engine = ProgressTracker._create_db_session()
-            try:
-                async with session_maker() as db:
-                    await repository.update_task_progress_value(db, task_id, 100.0)
-            finally:
-                await engine.dispose()
-        
-        try:
-            ProgressTracker._run_async_in_thread(_finish())
-            
-            with ProgressTracker._last_saved_lock:
-                if task_id in ProgressTracker._last_saved:
-                    del ProgressTracker._last_saved[task_id]
-        except Exception as e:
-            print(f"[ProgressTracker] Warning: failed to finish progress: {e}")
+        if ProgressTracker._publisher is not None:
+            ProgressTracker._publisher(task_id, 100.0, 0.0)
+
+        ProgressWriter.submit(task_id, 100.0, 0.0)
 
     @staticmethod
     async def get_async(task_id: str, db: AsyncSession):
         task = await repository.get_task_progress(db, task_id)
         if task is None:
             return None
-        return task.progress
\ No newline at end of file
+        return task.progress
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from backend.core.pg_listener import PgListener
+from backend.db.repository import PROGRESS_CHANNEL
+
+STREAM_HEARTBEAT = 15.0
+STREAM_RETENTION = 5000
+TERMINAL_STATUSES = ("completed", "error", "cancelled", "not_found")
+
+
+class ProgressBroker:
+
+    # Останній знімок прогресу кожної задачі та підписники SSE.
+    # Живиться подіями локального пулу розв'язувачів і NOTIFY від інших реплік.
+
+    _snapshots = OrderedDict()
+    _started_at = {}
+    _subscribers = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def start():
+        PgListener.subscribe(PROGRESS_CHANNEL, ProgressBroker._on_notify)
+
+    @staticmethod
+    def _on_notify(payload: str):
+        data = json.loads(payload)
+        ProgressBroker.publish(data.pop("task_id"), **data)
+
+    @staticmethod
+    def has(task_id: str) -> bool:
+        return task_id in ProgressBroker._snapshots
+
+    @staticmethod
+    def get(task_id: str) -> dict | None:
+        with ProgressBroker._lock:
+            snapshot = ProgressBroker._snapshots.get(task_id)
+            return dict(snapshot) if snapshot is not None else None
+
+    @staticmethod
+    def publish(task_id: str, status: str = None, progress: float = None, eta: float = None, **extra):
+
+        now = time.time()
+
+        with ProgressBroker._lock:
+            previous = ProgressBroker._snapshots.get(task_id)
+            snapshot = dict(previous) if previous else {"task_id": task_id, "status": "queued", "progress": 0.0}
+
+            # Запізнілі події після завершення задачі ігноруємо
+            if snapshot["status"] in TERMINAL_STATUSES and status not in TERMINAL_STATUSES:
+                return
+
+            if status is not None:
+                snapshot["status"] = status
+            elif progress and snapshot["status"] == "queued":
+                snapshot["status"] = "processing"
+            if progress is not None:
+                if status is None and snapshot["status"] == "processing":
+                    progress = max(progress, snapshot["progress"])
+                snapshot["progress"] = round(progress, 2)
+
+            if snapshot["status"] == "processing":
+                ProgressBroker._started_at.setdefault(task_id, now)
+
+            started_at = ProgressBroker._started_at.get(task_id)
+            if started_at is not None:
+                elapsed = now - started_at
+                snapshot["elapsed"] = round(elapsed, 3)
+                done = snapshot["progress"]
+                if snapshot["status"] != "processing":
+                    snapshot["eta"] = None
+                elif eta is not None:
+                    # Оцінка розв'язувача — за залишком флопів і виміряною швидкістю
+                    snapshot["eta"] = round(eta, 3)
+                elif done >= 1:
+                    snapshot["eta"] = round(elapsed * (100 - done) / done, 3)
+                else:
+                    snapshot["eta"] = None
+
+            # Та сама подія може прийти двічі: з локального пулу та через NOTIFY
+            if (
+                previous is not None and not extra
+                and previous["status"] == snapshot["status"]
+                and previous["progress"] == snapshot["progress"]
+            ):
+                return
+
+            snapshot.update(extra)
+            # Позиція в черзі має сенс лише поки задача чекає
+            if snapshot["status"] != "queued":
+                snapshot.pop("queue_position", None)
+
+            ProgressBroker._snapshots[task_id] = snapshot
+            ProgressBroker._snapshots.move_to_end(task_id)
+            while len(ProgressBroker._snapshots) > STREAM_RETENTION:
+                old_id, _ = ProgressBroker._snapshots.popitem(last=False)
+                ProgressBroker._started_at.pop(old_id, None)
+
+            subscribers = list(ProgressBroker._subscribers.get(task_id, ()))
+
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, snapshot)
+
+    @staticmethod
+    async def stream(task_id: str, initial: dict = None):
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        subscriber = (loop, queue)
+
+        with ProgressBroker._lock:
+            ProgressBroker._subscribers.setdefault(task_id, []).append(subscriber)
+            current = ProgressBroker._snapshots.get(task_id)
+            if current is None and initial is not None:
+                current = dict(initial)
+                if current.get("status") not in TERMINAL_STATUSES:
+                    ProgressBroker._snapshots[task_id] = current
+
+        try:
+            if current is not None:
+                yield current
+                if current.get("status") in TERMINAL_STATUSES:
+                    return
+
+            while True:
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                # Клієнту потрібен лише останній стан
+                while not queue.empty():
+                    snapshot = queue.get_nowait()
+
+                yield snapshot
+                if snapshot.get("status") in TERMINAL_STATUSES:
+                    return
+        finally:
+            with ProgressBroker._lock:
+                subscribers = ProgressBroker._subscribers.get(task_id, [])
+                if subscriber in subscribers:
+                    subscribers.remove(subscriber)
+                if not subscribers:
+                    ProgressBroker._subscribers.pop(task_id, None)
+
+    @staticmethod
+    async def sse(task_id: str, initial: dict = None):
+        async for snapshot in ProgressBroker.stream(task_id, initial):
+            if snapshot is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(snapshot)}\n\n"
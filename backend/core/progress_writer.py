@@ -0,0 +1,79 @@
+import os
+import threading
+from backend.core.db_bridge import DBBridge
+from backend.db import repository
+
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", 0.5))
+
+
+class ProgressWriter:
+
+    # Write-behind для прогресу: розв'язувач лише кладе (прогрес, ETA) у словник (останнє на задачу),
+    # а фоновий потік раз на PROGRESS_FLUSH_INTERVAL пише всі змінені задачі одним UPDATE
+
+    _dirty = {}
+    _lock = threading.Lock()
+    _thread = None
+    _stop = threading.Event()
+    _pid = None
+
+    @staticmethod
+    def submit(task_id: str, value: float, eta: float = None):
+
+        with ProgressWriter._lock:
+            ProgressWriter._dirty[task_id] = (value, eta)
+            ProgressWriter._ensure_started()
+
+    @staticmethod
+    def _ensure_started():
+
+        # Викликається під _lock; після fork/spawn потік треба створити заново
+        if ProgressWriter._thread is not None and ProgressWriter._pid == os.getpid():
+            return
+
+        ProgressWriter._stop = threading.Event()
+        ProgressWriter._pid = os.getpid()
+        ProgressWriter._thread = threading.Thread(
+            target=ProgressWriter._run,
+            name="progress-writer",
+            daemon=True
+        )
+        ProgressWriter._thread.start()
+
+    @staticmethod
+    def _run():
+        stop = ProgressWriter._stop
+        while not stop.wait(PROGRESS_FLUSH_INTERVAL):
+            ProgressWriter.flush()
+
+    @staticmethod
+    def flush():
+
+        with ProgressWriter._lock:
+            batch = ProgressWriter._dirty
+            ProgressWriter._dirty = {}
+
+        if not batch:
+            return
+
+        try:
+            DBBridge.run(repository.update_task_progress_values, batch)
+        except Exception as e:
+            print(f"[ProgressWriter] Warning: failed to write progress for {len(batch)} task(s): {e}")
+            # Новіші значення, що прийшли під час запису, мають пріоритет
+            with ProgressWriter._lock:
+                for task_id, value in batch.items():
+                    ProgressWriter._dirty.setdefault(task_id, value)
+
+    @staticmethod
+    def shutdown():
+
+        with ProgressWriter._lock:
+            thread = ProgressWriter._thread if ProgressWriter._pid == os.getpid() else None
+            ProgressWriter._thread = None
+
+        if thread is not None:
+            ProgressWriter._stop.set()
+            thread.join()
+
+        ProgressWriter.flush()
@@ -0,0 +1,38 @@
+import json
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    # Те, що orjson не пише напряму (несуміжні зрізи, скаляри NumPy), і весь NumPy для json
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ArrayJSONResponse(JSONResponse):
+
+    # Відповідь з масивами NumPy без проміжних Python-списків і без jsonable_encoder:
+    # orjson пише float64 напряму з буфера масиву. Без orjson — стандартний json,
+    # масиви перетворюються на списки. Ендпоінти повертають цей клас явно;
+    # ендпоінти з response_model і так серіалізуються Pydantic одразу в байти
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(
+                content,
+                default=_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            )
+        return json.dumps(
+            content,
+            default=_default,
+            ensure_ascii=False,
+            separators=(",", ":")
+        ).encode("utf-8")
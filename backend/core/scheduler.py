@@ -0,0 +1,234 @@
+import math
+import os
+import threading
+import numpy as np
+from backend.core.krylov_solver import KRYLOV_METHODS, KRYLOV_MAX_ITER
+from backend.core.tracing import Tracer
+
+SCHEDULER_USER_CONCURRENCY = int(os.getenv("SCHEDULER_USER_CONCURRENCY", 2))
+SCHEDULER_USER_JOBS = int(os.getenv("SCHEDULER_USER_JOBS", 8))
+SCHEDULER_USER_MEMORY = int(os.getenv("SCHEDULER_USER_MEMORY", 4 * 1024 * 1024 * 1024))
+SCHEDULER_MEMORY_BUDGET = int(os.getenv("SCHEDULER_MEMORY_BUDGET", 8 * 1024 * 1024 * 1024))
+# Скільки ітерацій закладаємо в оцінку вартості Krylov-методу (реальна кількість наперед невідома)
+KRYLOV_EXPECTED_ITERATIONS = 100
+# У скільки разів множники SuperLU зазвичай більші за вхідну матрицю
+SPARSE_FILL_FACTOR = 20
+
+
+class QuotaExceededError(Exception):
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class SolveScheduler:
+
+    # Черга перед воркерами пулу: зважена справедлива черга (self-clocked WFQ).
+    # Вартість задачі — оцінка флопів (щільний LU ≈ 2n³/3); кожна задача отримує мітку
+    # finish = max(V, останній finish користувача) + вартість, а віртуальний час V —
+    # мітка останньої виданої задачі. Першою йде задача з найменшою міткою, тож мала система
+    # не чекає за чужою 5000×5000, а користувач із потоком важких задач не витісняє інших.
+    # Задача видається, лише коли є вільний воркер, користувач не перевищив
+    # SCHEDULER_USER_CONCURRENCY і сумарна пам'ять виконуваних задач вміщується в бюджет.
+
+    _slots = 1
+    _waiting = {}
+    _running = {}
+    _user_jobs = {}
+    _user_memory = {}
+    _user_running = {}
+    _last_finish = {}
+    _virtual_time = 0.0
+    _sequence = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def configure(slots: int):
+        with SolveScheduler._lock:
+            SolveScheduler._slots = max(1, slots)
+
+    @staticmethod
+    def estimate(message: dict) -> tuple[float, int]:
+
+        # (флопи, байти) за розкладкою вхідних масивів і типом задачі
+        layout = message["layout"]
+        input_bytes = sum(
+            math.prod(shape) * np.dtype(dtype).itemsize
+            for _, shape, dtype in layout.values()
+        )
+        kind = message.get("kind")
+        engine = message.get("engine")
+        options = message.get("options") or {}
+        iterations = min(options.get("max_iter") or KRYLOV_MAX_ITER, KRYLOV_EXPECTED_ITERATIONS)
+
+        if kind == "sparse":
+            nnz = layout["data"][1][0]
+            if engine in KRYLOV_METHODS:
+                return 2.0 * nnz * iterations, input_bytes
+            # Заповнення SuperLU наперед невідоме; nnz^1.5 флопів — типовий порядок для сіткових задач
+            return float(nnz) ** 1.5, input_bytes + nnz * SPARSE_FILL_FACTOR * 16
+
+        if kind == "factorize":
+            n = layout["lu"][1][0]
+            return 2.0 * n ** 3 / 3, input_bytes
+
+        n = layout["matrix"][1][0]
+        if engine in KRYLOV_METHODS:
+            return 2.0 * n * n * min(iterations, n), input_bytes
+        if engine == "mixed_lu":
+            # Копія у float32, резервно — ще одна у float64
+            return n ** 3 / 3, input_bytes + n * n * 12
+        return 2.0 * n ** 3 / 3, input_bytes + n * n * 8
+
+    @staticmethod
+    def enqueue(message: dict, capacity: int):
+
+        # Кидає QuotaExceededError або повертає False, якщо загальна черга заповнена
+        task_id = message["task_id"]
+        user_id = message["user_id"]
+        cost, memory = SolveScheduler.estimate(message)
+
+        with SolveScheduler._lock:
+
+            limit = min(SCHEDULER_MEMORY_BUDGET, SCHEDULER_USER_MEMORY)
+            if memory > limit:
+                raise QuotaExceededError(
+                    413,
+                    f"Задача потребує ~{memory // (1024 * 1024)} MB, більше за допустимі "
+                    f"{limit // (1024 * 1024)} MB"
+                )
+            if SolveScheduler._user_jobs.get(user_id, 0) >= SCHEDULER_USER_JOBS:
+                raise QuotaExceededError(
+                    429,
+                    f"Забагато активних задач: не більше {SCHEDULER_USER_JOBS} на користувача"
+                )
+            if SolveScheduler._user_memory.get(user_id, 0) + memory > SCHEDULER_USER_MEMORY:
+                raise QuotaExceededError(
+                    429,
+                    f"Перевищено квоту пам'яті ({SCHEDULER_USER_MEMORY // (1024 * 1024)} MB на користувача): "
+                    f"дочекайтеся завершення попередніх задач"
+                )
+            if len(SolveScheduler._waiting) >= capacity:
+                return False
+
+            start = max(SolveScheduler._virtual_time, SolveScheduler._last_finish.get(user_id, 0.0))
+            finish = start + cost
+            SolveScheduler._last_finish[user_id] = finish
+            SolveScheduler._sequence += 1
+
+            SolveScheduler._waiting[task_id] = {
+                "message": message,
+                "user_id": user_id,
+                "cost": cost,
+                "memory": memory,
+                "finish": finish,
+                "sequence": SolveScheduler._sequence
+            }
+            SolveScheduler._user_jobs[user_id] = SolveScheduler._user_jobs.get(user_id, 0) + 1
+            SolveScheduler._user_memory[user_id] = SolveScheduler._user_memory.get(user_id, 0) + memory
+
+        Tracer.event("scheduler.enqueued", level="debug", cost=cost, memory=memory)
+        return True
+
+    @staticmethod
+    def next():
+
+        # Наступне повідомлення для воркера або None
+        with SolveScheduler._lock:
+            if len(SolveScheduler._running) >= SolveScheduler._slots:
+                return None
+
+            running_memory = sum(job["memory"] for job in SolveScheduler._running.values())
+
+            for job in SolveScheduler._ordered():
+                if SolveScheduler._user_running.get(job["user_id"], 0) >= SCHEDULER_USER_CONCURRENCY:
+                    continue
+                if SolveScheduler._running and running_memory + job["memory"] > SCHEDULER_MEMORY_BUDGET:
+                    continue
+
+                task_id = job["message"]["task_id"]
+                del SolveScheduler._waiting[task_id]
+                SolveScheduler._running[task_id] = job
+                SolveScheduler._user_running[job["user_id"]] = SolveScheduler._user_running.get(job["user_id"], 0) + 1
+                SolveScheduler._virtual_time = max(SolveScheduler._virtual_time, job["finish"])
+                return job["message"]
+
+            return None
+
+    @staticmethod
+    def finish(task_id: str):
+        with SolveScheduler._lock:
+            job = SolveScheduler._running.pop(task_id, None)
+            if job is None:
+                return
+            SolveScheduler._user_running[job["user_id"]] -= 1
+            SolveScheduler._forget(job)
+
+    @staticmethod
+    def remove(task_id: str) -> bool:
+        # Задача ще чекає в черзі — прибираємо її (скасування); True, якщо вона там була
+        with SolveScheduler._lock:
+            job = SolveScheduler._waiting.pop(task_id, None)
+            if job is None:
+                return False
+            SolveScheduler._forget(job)
+            return True
+
+    @staticmethod
+    def _forget(job: dict):
+
+        # Викликається під _lock
+        user_id = job["user_id"]
+        SolveScheduler._user_jobs[user_id] -= 1
+        SolveScheduler._user_memory[user_id] -= job["memory"]
+        if SolveScheduler._user_jobs[user_id] == 0:
+            del SolveScheduler._user_jobs[user_id]
+            del SolveScheduler._user_memory[user_id]
+            SolveScheduler._user_running.pop(user_id, None)
+            # Мітка неактивного користувача нижча за V — max(V, ...) її все одно відкине
+            if SolveScheduler._last_finish.get(user_id, 0.0) <= SolveScheduler._virtual_time:
+                SolveScheduler._last_finish.pop(user_id, None)
+
+    @staticmethod
+    def _ordered() -> list:
+        return sorted(SolveScheduler._waiting.values(), key=lambda job: (job["finish"], job["sequence"]))
+
+    @staticmethod
+    def positions() -> dict:
+        # task_id -> позиція в черзі (з 1) у порядку видачі
+        with SolveScheduler._lock:
+            return {
+                job["message"]["task_id"]: position
+                for position, job in enumerate(SolveScheduler._ordered(), start=1)
+            }
+
+    @staticmethod
+    def stats() -> dict:
+        with SolveScheduler._lock:
+            return {
+                "waiting": len(SolveScheduler._waiting),
+                "running": len(SolveScheduler._running),
+                "slots": SolveScheduler._slots,
+                "virtual_time": SolveScheduler._virtual_time,
+                "users": {
+                    user_id: {
+                        "jobs": jobs,
+                        "running": SolveScheduler._user_running.get(user_id, 0),
+                        "memory": SolveScheduler._user_memory.get(user_id, 0)
+                    }
+                    for user_id, jobs in SolveScheduler._user_jobs.items()
+                }
+            }
+
+    @staticmethod
+    def reset():
+        with SolveScheduler._lock:
+            SolveScheduler._waiting = {}
+            SolveScheduler._running = {}
+            SolveScheduler._user_jobs = {}
+            SolveScheduler._user_memory = {}
+            SolveScheduler._user_running = {}
+            SolveScheduler._last_finish = {}
+            SolveScheduler._virtual_time = 0.0
@@ -0,0 +1,72 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+SOLUTION_CACHE_BYTES = int(os.getenv("SOLUTION_CACHE_BYTES", 256 * 1024 * 1024))
+
+
+class SolutionCache:
+
+    # LRU розв'язків за хешем вмісту системи (той самий ключ, що й у matrix_blobs),
+    # обмежений сумарним розміром у байтах. Після перезапуску кеш порожній,
+    # але промах добирається з tasks_history — там розв'язки вже лежать за input_hash.
+
+    _entries = OrderedDict()
+    _size = 0
+    _lock = threading.Lock()
+    _stats = {"hits": 0, "db_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def get(input_hash: str):
+
+        with SolutionCache._lock:
+            solution = SolutionCache._entries.get(input_hash)
+            if solution is None:
+                return None
+            SolutionCache._entries.move_to_end(input_hash)
+            SolutionCache._stats["hits"] += 1
+            return solution
+
+    @staticmethod
+    def put(input_hash: str, solution: np.ndarray):
+
+        solution = np.array(solution, dtype=np.float64)
+        solution.setflags(write=False)
+        if solution.nbytes > SOLUTION_CACHE_BYTES:
+            return
+
+        with SolutionCache._lock:
+            previous = SolutionCache._entries.pop(input_hash, None)
+            if previous is not None:
+                SolutionCache._size -= previous.nbytes
+
+            SolutionCache._entries[input_hash] = solution
+            SolutionCache._size += solution.nbytes
+
+            while SolutionCache._size > SOLUTION_CACHE_BYTES:
+                _, evicted = SolutionCache._entries.popitem(last=False)
+                SolutionCache._size -= evicted.nbytes
+                SolutionCache._stats["evictions"] += 1
+
+    @staticmethod
+    def record(hit_from_db: bool):
+        with SolutionCache._lock:
+            SolutionCache._stats["db_hits" if hit_from_db else "misses"] += 1
+
+    @staticmethod
+    def stats() -> dict:
+
+        with SolutionCache._lock:
+            stats = dict(SolutionCache._stats)
+            entries = len(SolutionCache._entries)
+            size = SolutionCache._size
+
+        lookups = stats["hits"] + stats["db_hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": round((stats["hits"] + stats["db_hits"]) / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": SOLUTION_CACHE_BYTES
+        }
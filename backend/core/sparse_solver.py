@@ -0,0 +1,171 @@
+import math
+import threading
+import time
+import numpy as np
+from backend.core.validation import TaskValidator
+from backend.core.progress import ProgressTracker
+from backend.core.cancelation import CancelationManager, TaskCancelledError
+from backend.core.gauss_solver import GaussSolver
+from backend.core.metrics import Metrics
+from backend.core.tracing import Tracer
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.linalg import splu
+except ImportError:
+    csr_matrix = splu = None
+
+SPARSE_ORDERING = "COLAMD"
+SPARSE_POLL_INTERVAL = 0.2
+
+
+class SparseSolver:
+
+    # Розріджена система в CSR: перестановка стовпців COLAMD для зменшення заповнення + SuperLU.
+    # splu — один виклик C-коду без точок зупинки, тож він іде в окремому потоці, а потік
+    # розв'язувача тим часом перевіряє скасування й тайм-аут і рухає прогрес за оцінкою часу.
+    # Якщо задачу скасовано посеред факторизації, зупинити SuperLU неможливо: результат
+    # позначається restart_worker, і воркер завершується після відповіді (пул підніме новий).
+
+    @staticmethod
+    def solve_system(
+        task_id: str,
+        user_id: int,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        data: np.ndarray,
+        vector: np.ndarray
+    ):
+
+        n = len(vector)
+        nnz = len(data)
+        Tracer.event("splu.start", n=n, nnz=nnz, density=nnz / max(1, n * n))
+        start_time = time.time()
+        state = {"abandoned": False}
+
+        try:
+
+            if splu is None:
+                raise RuntimeError("Для розріджених систем потрібен SciPy")
+
+            ProgressTracker.start(task_id, user_id)
+            ProgressTracker.update(task_id, 5, matrix_size=n)
+
+            A = SparseSolver.operator(indptr, indices, data).tocsc()
+            b = np.array(vector, dtype=float)
+            SparseSolver._check(task_id, start_time)
+            ProgressTracker.update(task_id, 10, matrix_size=n)
+
+            factor_start = time.time()
+            with Tracer.span("forward", engine="splu", n=n, ordering=SPARSE_ORDERING):
+                try:
+                    lu = SparseSolver._run_interruptible(
+                        lambda: splu(A, permc_spec=SPARSE_ORDERING),
+                        task_id,
+                        start_time,
+                        n,
+                        nnz,
+                        state
+                    )
+                except RuntimeError as e:
+                    # SuperLU повідомляє про виродженість через RuntimeError
+                    raise ValueError(f"Матриця вироджена: {e}")
+            factor_time = time.time() - factor_start
+            Tracer.event("splu.fill_in", level="debug", l_nnz=lu.L.nnz, u_nnz=lu.U.nnz)
+
+            SparseSolver._check(task_id, start_time)
+            ProgressTracker.update(task_id, 90, matrix_size=n)
+
+            solve_start = time.time()
+            with Tracer.span("backward", engine="splu", n=n):
+                x = lu.solve(b)
+            if not np.all(np.isfinite(x)):
+                raise ValueError("Матриця вироджена: розв'язок містить нескінченні значення")
+            Metrics.observe("solver_forward_seconds", factor_time, engine="splu", size=Metrics.size_bucket(n))
+            Metrics.observe("solver_backward_seconds", time.time() - solve_start, engine="splu", size=Metrics.size_bucket(n))
+
+            solution = GaussSolver._round_solution(x)
+
+            ProgressTracker.finish(task_id)
+
+            Tracer.event("splu.completed", total=time.time() - start_time, forward=factor_time)
+
+            return {
+                "task_id": task_id,
+                "status": "completed",
+                "solution": solution
+            }
+
+        except TaskCancelledError:
+            Tracer.event("splu.cancelled", abandoned=state["abandoned"])
+            ProgressTracker.update(task_id, 0, matrix_size=n)
+            return {
+                "task_id": task_id,
+                "status": "cancelled",
+                "solution": None,
+                "restart_worker": state["abandoned"]
+            }
+
+        except Exception as e:
+            Tracer.event("splu.error", level="error", type=type(e).__name__, error=str(e))
+
+            ProgressTracker.update(task_id, 0, matrix_size=n)
+            return {
+                "task_id": task_id,
+                "status": "error",
+                "error": str(e),
+                "solution": None,
+                "restart_worker": state["abandoned"]
+            }
+
+    @staticmethod
+    def operator(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray):
+
+        if csr_matrix is None:
+            raise RuntimeError("Для розріджених систем потрібен SciPy")
+        n = len(indptr) - 1
+        return csr_matrix((data, indices, indptr), shape=(n, n))
+
+    @staticmethod
+    def _check(task_id: str, start_time: float):
+        if CancelationManager.is_cancelled(task_id):
+            raise TaskCancelledError(task_id)
+        TaskValidator.validate_timeout(start_time)
+
+    @staticmethod
+    def _run_interruptible(fn, task_id: str, start_time: float, n: int, nnz: int, state: dict):
+
+        outcome = {}
+
+        def target():
+            try:
+                outcome["value"] = fn()
+            except BaseException as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=target, name=f"splu-{task_id}", daemon=True)
+        thread.start()
+
+        # Тривалість SuperLU наперед невідома: прогрес асимптотично наближається до 85%
+        # зі сталою часу, пропорційною кількості ненульових елементів
+        tau = max(1.0, nnz / 2e6)
+        factor_start = time.time()
+
+        while True:
+            thread.join(SPARSE_POLL_INTERVAL)
+            if not thread.is_alive():
+                break
+
+            try:
+                SparseSolver._check(task_id, start_time)
+            except Exception:
+                # Потік SuperLU лишається працювати — воркер треба буде перезапустити
+                state["abandoned"] = True
+                raise
+
+            elapsed = time.time() - factor_start
+            ProgressTracker.update(task_id, 10 + 75 * (1 - math.exp(-elapsed / tau)), matrix_size=n)
+
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["value"]
@@ -0,0 +1,33 @@
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+
+class TaskIds:
+
+    # Ідентифікатори задач у форматі UUIDv7 (RFC 9562): старші 48 біт — мілісекунди
+    # Unix-часу, тож рядки task_id впорядковані за часом створення (при COLLATE "C").
+    # На цьому тримається секціонування task_progress за діапазонами task_id:
+    # пошук за первинним ключем потрапляє рівно в одну секцію, а секція дня — це
+    # задачі, створені того дня, і її можна відкинути цілком (див. Maintenance).
+
+    @staticmethod
+    def new() -> str:
+        ms = time.time_ns() // 1_000_000
+        rand = int.from_bytes(os.urandom(10), "big")
+        value = (
+            (ms & 0xFFFFFFFFFFFF) << 80
+            | 0x7 << 76
+            | (rand >> 62 & 0xFFF) << 64
+            | 0b10 << 62
+            | rand & 0x3FFFFFFFFFFFFFFF
+        )
+        return str(uuid.UUID(int=value))
+
+    @staticmethod
+    def bound(moment: datetime) -> str:
+        # Найменший task_id, створений не раніше moment (naive UTC): 48-бітний префікс часу
+        ms = (moment - datetime(1970, 1, 1)) // timedelta(milliseconds=1)
+        prefix = f"{ms:012x}"
+        return f"{prefix[:8]}-{prefix[8:]}"
@@ -1,182 +1,444 @@
-import uuid
-import threading
-import time
-from backend.core.gauss_solver import GaussSolver
-from backend.core.validation import TaskValidator
+import base64
+import queue
+from datetime import datetime
+import numpy as np
+from fastapi import HTTPException
+from backend.core.worker_pool import SolverPool, SharedArrays
+from backend.core.job_queue import JobQueue, SOLVER_BACKEND
+from backend.core.scheduler import QuotaExceededError
+from backend.core.engines import DEFAULT_ENGINE, ITERATIVE_ENGINES
+from backend.core.progress_stream import ProgressBroker
+from backend.core.uploads import UploadStore
+from backend.core.matrix_store import MatrixStore, MATRIX_DTYPE, SPARSE_CODEC
+from backend.core.solution_cache import SolutionCache
+from backend.core.factorizations import FactorizationStore
+from backend.core.lu_solver import BlockedLUSolver
+from backend.core.db_bridge import DBBridge
+from backend.core.tracing import Tracer
+from backend.core.task_ids import TaskIds
 from backend.db.schemas import TaskCreate
 import asyncio
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from backend.db.database import DATABASE_URL
 from backend.db import repository
 
+SOLUTION_DTYPE = np.dtype("<f8")
+
+# Розв'язування систем — у локальному пулі або в стійкій черзі для окремих воркерів.
+# Факторизації лишаються в SolverPool: LU живе у файлі цієї репліки (FactorizationStore)
+Solver = JobQueue if SOLVER_BACKEND == "queue" else SolverPool
+
 class TaskManager:
 
     @staticmethod
-    def _run_task_in_background(
+    def _finalize_task(
         task_id: str,
         user_id: int,
-        matrix: list[list[float]],
-        vector: list[float]
+        result: dict,
+        arrays: dict,
+        input_hash: str = None
     ):
+        with Tracer.task(task_id, user_id), Tracer.span("persist", status=result.get("status")):
+            TaskManager._persist_result(task_id, user_id, result, arrays, input_hash)
 
-        print(f"[TaskManager] Thread started for task {task_id}")
-        try:
+    @staticmethod
+    def _persist_result(task_id: str, user_id: int, result: dict, arrays: dict, input_hash: str = None):
 
-            print(f"[TaskManager] Starting solver for task {task_id}, matrix size: {len(matrix)}x{len(matrix)}")
-            result = GaussSolver.solve_system(
-                task_id=task_id,
-                user_id=user_id,
-                matrix=matrix,
-                vector=vector
-            )
-            print(f"[TaskManager] Solver finished for task {task_id}, status: {result.get('status')}")
+        try:
 
             if result.get("status") == "completed":
 
-                async def update_progress_result():
-                    engine = create_async_engine(DATABASE_URL, echo=False)
-                    async_session_maker = sessionmaker(
-                        bind=engine,
-                        class_=AsyncSession,
-                        expire_on_commit=False
-                    )
-                    try:
-                        async with async_session_maker() as db:
-                            await repository.update_task_progress_status(
-                                db, 
-                                task_id, 
-                                status="completed",
-                                progress=100.0,
-                                result={"solution": result["solution"]}
-                            )
-                    finally:
-                        await engine.dispose()
-
-                async def save_to_history():
-                    engine = create_async_engine(DATABASE_URL, echo=False)
-                    async_session_maker = sessionmaker(
-                        bind=engine,
-                        class_=AsyncSession,
-                        expire_on_commit=False
-                    )
-                    try:
-                        async with async_session_maker() as db:
-
-                            await repository.add_task(
-                                db,
-                                TaskCreate(
-                                    user_id=user_id,
-                                    input_data={"matrix": matrix, "rhs": vector},
-                                    result=result
-                                )
-                            )
-                    except Exception as db_error:
-                        print(f"[TaskManager] Error saving to history: {db_error}")
-                    finally:
-                        await engine.dispose()
+                solution = np.asarray(result["solution"], dtype=SOLUTION_DTYPE)
+                summary = {"n": len(solution), "task_id": task_id}
+                if result.get("stats"):
+                    # Ітераційні методи: кількість ітерацій і фінальний залишок
+                    summary["solver"] = result["stats"]
+
+                # Вхідна система — у сховищі за хешем вмісту; повторно надіслана не стискається й не пишеться вдруге
+                if input_hash is None:
+                    input_hash = MatrixStore.input_hash(arrays)
+                input_blob = None
+                if not DBBridge.run(repository.has_matrix_blob, input_hash):
+                    codec, data = MatrixStore.archive(arrays)
+                    input_blob = {
+                        "hash": input_hash,
+                        "n": len(solution),
+                        "codec": codec,
+                        "size": len(data),
+                        "data": data
+                    }
+
+                history = TaskCreate(
+                    user_id=user_id,
+                    input_data=MatrixStore.input_summary(arrays, input_hash),
+                    result=summary,
+                    task_id=task_id,
+                    solution=solution.tobytes(),
+                    input_hash=input_hash,
+                    n=len(solution),
+                    status="completed",
+                    residual=TaskManager._residual(arrays, solution)
+                )
 
                 try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    loop.run_until_complete(update_progress_result())
-                    loop.run_until_complete(save_to_history())
-                    loop.close()
-                except Exception as async_error:
-                    print(f"[TaskManager] Error in async execution: {async_error}")
+                    # Статус task_progress та запис в tasks_history — однією транзакцією;
+                    # сам розв'язок лежить лише в tasks_history.solution
+                    DBBridge.run(
+                        repository.complete_task,
+                        task_id,
+                        result=summary,
+                        history=history,
+                        input_blob=input_blob
+                    )
+                    # Кеш віддає розв'язок будь-якому методу, тож лише прямі розв'язки:
+                    # ітераційний точний лише до tol конкретного запиту
+                    if (result.get("stats") or {}).get("method") not in ITERATIVE_ENGINES:
+                        SolutionCache.put(input_hash, solution)
+                except Exception as db_error:
+                    Tracer.event("persist.history_failed", level="error", error=str(db_error))
+                    DBBridge.run(
+                        repository.update_task_progress_status,
+                        task_id,
+                        status="completed",
+                        progress=100.0,
+                        result={"solution": solution.tolist()}
+                    )
                     
             elif result.get("status") == "error":
 
-                
-                async def save_error():
-                    engine = create_async_engine(DATABASE_URL, echo=False)
-                    async_session_maker = sessionmaker(
-                        bind=engine,
-                        class_=AsyncSession,
-                        expire_on_commit=False
-                    )
-                    try:
-                        async with async_session_maker() as db:
-                            await repository.update_task_progress_status(
-                                db,
-                                task_id,
-                                status="error",
-                                progress=0.0,
-                                error_message=result.get("error")
-                            )
-                    finally:
-                        await engine.dispose()
-                
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(save_error())
-                loop.close()
+                TaskManager._save_error(task_id, result.get("error"))
+
+            # Фінальний статус публікуємо лише після запису в БД, щоб /tasks/result вже його бачив
+            ProgressBroker.publish(
+                task_id,
+                status=result.get("status"),
+                progress=100.0 if result.get("status") == "completed" else 0.0
+            )
                 
         except Exception as e:
-            print(f"[TaskManager] Error in background task: {e}")
-            
-            async def save_error():
-                engine = create_async_engine(DATABASE_URL, echo=False)
-                async_session_maker = sessionmaker(
-                    bind=engine,
-                    class_=AsyncSession,
-                    expire_on_commit=False
-                )
-                try:
-                    async with async_session_maker() as db:
-                        await repository.update_task_progress_status(
-                            db,
-                            task_id,
-                            status="error",
-                            progress=0.0,
-                            error_message=str(e)
-                        )
-                finally:
-                    await engine.dispose()
-            
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(save_error())
-            loop.close()
+            Tracer.event("persist.failed", level="error", error=str(e))
+            TaskManager._save_error(task_id, str(e))
+            ProgressBroker.publish(task_id, status="error", progress=0.0)
+
+    @staticmethod
+    def _residual(arrays: dict, solution: np.ndarray) -> float:
+
+        # Нормована зворотна похибка ||b - A·x||∞ / (||A||∞·||x||∞ + ||b||∞) збереженого
+        # розв'язку — однакова міра для всіх методів, O(n²) або O(nnz) проти O(n³) розв'язання
+        rhs = np.asarray(arrays["rhs"], dtype=MATRIX_DTYPE)
+        n = len(rhs)
+        if n == 0:
+            return 0.0
+
+        if MatrixStore.is_sparse(arrays):
+            data = np.asarray(arrays["data"], dtype=MATRIX_DTYPE)
+            rows = np.repeat(np.arange(n), np.diff(arrays["indptr"]))
+            product = np.bincount(rows, weights=data * solution[arrays["indices"]], minlength=n)
+            a_norm = float(np.bincount(rows, weights=np.abs(data), minlength=n).max())
+        else:
+            matrix = arrays["matrix"]
+            product = matrix @ solution
+            a_norm = float(np.abs(matrix).sum(axis=1).max())
+
+        denominator = a_norm * float(np.max(np.abs(solution))) + float(np.max(np.abs(rhs)))
+        error = float(np.max(np.abs(rhs - product)))
+        return error / denominator if denominator > 0 else 0.0
+
+    @staticmethod
+    def _save_error(task_id: str, error_message: str):
+
+        try:
+            DBBridge.run(
+                repository.update_task_progress_status,
+                task_id,
+                status="error",
+                progress=0.0,
+                error_message=error_message
+            )
+        except Exception as e:
+            Tracer.event("persist.error_failed", level="error", error=str(e))
 
     @staticmethod
     async def start_gauss_task(
         user_id: int,
         matrix: list[list[float]],
         vector: list[float],
-        db
+        db,
+        engine: str = DEFAULT_ENGINE,
+        options: dict = None
     ):
 
-        task_id = str(uuid.uuid4())
-        
-        print(f"[TaskManager] Creating new task {task_id} for user {user_id}")
+        task_id = TaskIds.new()
+        Tracer.bind(task_id, user_id)
+        Tracer.event("task.created", engine=engine, n=len(matrix))
+
+        with Tracer.span("ingest"):
+            matrix = await asyncio.to_thread(np.asarray, matrix, MATRIX_DTYPE)
+            vector = await asyncio.to_thread(np.asarray, vector, MATRIX_DTYPE)
+            input_hash = await asyncio.to_thread(MatrixStore.content_hash, matrix, vector)
 
-        TaskValidator.validate_matrix(matrix, vector)
-        print(f"[TaskManager] Matrix validated: {len(matrix)}x{len(matrix[0]) if matrix else 0}")
+        cached = await TaskManager._complete_from_cache(task_id, user_id, input_hash, {"matrix": matrix, "rhs": vector}, db)
+        if cached is not None:
+            return cached
 
-        thread = threading.Thread(
-            target=TaskManager._run_task_in_background,
-            args=(task_id, user_id, matrix, vector),
-            daemon=True,
-            name=f"GaussSolver-{task_id[:8]}"
+        def on_done(result: dict, arrays: dict):
+            TaskManager._finalize_task(task_id, user_id, result, arrays, input_hash)
+
+        return await TaskManager._enqueue(
+            task_id,
+            user_id,
+            db,
+            Solver.submit,
+            {"task_id": task_id, "user_id": user_id, "engine": engine, "options": options or {}, "input_hash": input_hash},
+            {"matrix": matrix, "rhs": vector},
+            on_done
         )
-        thread.start()
-        print(f"[TaskManager] Thread started: {thread.name}, alive: {thread.is_alive()}")
 
-        timeout = 0.5
-        start = time.time()
-        while not thread.is_alive() and (time.time() - start) < timeout:
-            time.sleep(0.001)
-        
-        if not thread.is_alive():
-            print(f"[TaskManager] WARNING: Thread failed to start!")
-        
-        print(f"[TaskManager] Returning task_id {task_id}")
-        
+    @staticmethod
+    async def start_sparse_task(user_id: int, system: dict, db, engine: str = None, options: dict = None):
+
+        # system — канонічний CSR від MatrixDecoder.decode_sparse; у пул іде лише O(nnz) даних.
+        # engine None — прямий SuperLU, інакше ітераційний метод (KrylovSolver)
+        task_id = TaskIds.new()
+        n = len(system["rhs"])
+        Tracer.bind(task_id, user_id)
+        Tracer.event("task.created", kind="sparse", engine=engine or "splu", n=n, nnz=len(system["data"]))
+
+        with Tracer.span("ingest"):
+            input_hash = await asyncio.to_thread(MatrixStore.input_hash, system)
+        cached = await TaskManager._complete_from_cache(task_id, user_id, input_hash, system, db)
+        if cached is not None:
+            return cached
+
+        def on_done(result: dict, arrays: dict):
+            TaskManager._finalize_task(task_id, user_id, result, arrays, input_hash)
+
+        return await TaskManager._enqueue(
+            task_id,
+            user_id,
+            db,
+            Solver.submit,
+            {
+                "task_id": task_id,
+                "user_id": user_id,
+                "kind": "sparse",
+                "engine": engine,
+                "options": options or {},
+                "input_hash": input_hash
+            },
+            system,
+            on_done
+        )
+
+    @staticmethod
+    async def start_gauss_task_from_upload(
+        user_id: int,
+        upload: dict,
+        db,
+        engine: str = DEFAULT_ENGINE,
+        options: dict = None
+    ):
+
+        # Система вже лежить у файлі UploadStore: у пул передається лише шлях,
+        # файл видаляється після збереження результату
+        task_id = TaskIds.new()
+        n = upload["n"]
+        Tracer.bind(task_id, user_id)
+        Tracer.event("task.created", engine=engine, n=n, upload_id=upload["upload_id"])
+
+        with Tracer.span("ingest"):
+            _, arrays = SharedArrays.map_file(upload["path"], UploadStore.layout(n))
+            input_hash = await asyncio.to_thread(MatrixStore.content_hash, arrays["matrix"], arrays["rhs"])
+
+        cached = await TaskManager._complete_from_cache(task_id, user_id, input_hash, arrays, db)
+        arrays = None
+        if cached is not None:
+            UploadStore.delete(upload["upload_id"])
+            return cached
+
+        def on_done(result: dict, arrays: dict):
+            TaskManager._finalize_task(task_id, user_id, result, arrays, input_hash)
+
+        try:
+            return await TaskManager._enqueue(
+                task_id,
+                user_id,
+                db,
+                Solver.submit_file,
+                {"task_id": task_id, "user_id": user_id, "engine": engine, "options": options or {}, "input_hash": input_hash},
+                upload["path"],
+                UploadStore.layout(n),
+                on_done,
+                lambda: UploadStore.delete(upload["upload_id"])
+            )
+        except Exception:
+            UploadStore.release(upload["upload_id"])
+            raise
+
+    @staticmethod
+    async def start_factorization(handle: str, user_id: int, n: int, db):
+
+        # Матриця вже записана у файл FactorizationStore; воркер факторизує її на місці
+        Tracer.bind(handle, user_id)
+        Tracer.event("task.created", kind="factorize", n=n)
+
+        def on_done(result: dict, arrays: dict):
+            TaskManager._finalize_factorization(handle, result)
+
+        try:
+            response = await TaskManager._enqueue(
+                handle,
+                user_id,
+                db,
+                SolverPool.submit_file,
+                {"task_id": handle, "user_id": user_id, "kind": "factorize"},
+                FactorizationStore.path(handle),
+                FactorizationStore.layout(n),
+                on_done,
+                None,
+                True
+            )
+        except Exception:
+            FactorizationStore.delete(handle)
+            raise
+
+        return dict(response, handle=handle)
+
+    @staticmethod
+    def _finalize_factorization(handle: str, result: dict):
+        with Tracer.task(handle), Tracer.span("persist", status=result.get("status")):
+            TaskManager._persist_factorization(handle, result)
+
+    @staticmethod
+    def _persist_factorization(handle: str, result: dict):
+
+        status = result.get("status")
+        try:
+            if status == "completed":
+                FactorizationStore.mark(handle, "ready")
+                DBBridge.run(
+                    repository.update_task_progress_status,
+                    handle,
+                    status="completed",
+                    progress=100.0,
+                    result={"handle": handle, "n": result.get("n")}
+                )
+            else:
+                FactorizationStore.delete(handle)
+                if status == "error":
+                    TaskManager._save_error(handle, result.get("error"))
+
+            ProgressBroker.publish(handle, status=status, progress=100.0 if status == "completed" else 0.0)
+
+        except Exception as e:
+            Tracer.event("persist.failed", level="error", error=str(e))
+            FactorizationStore.delete(handle)
+            TaskManager._save_error(handle, str(e))
+            ProgressBroker.publish(handle, status="error", progress=0.0)
+
+    @staticmethod
+    async def solve_with_factorization(handle: str, user_id: int, rhs: np.ndarray) -> np.ndarray:
+
+        # Дві трикутні підстановки на кожну праву частину — O(n²) замість O(n³)
+        n, lu, perm = FactorizationStore.open(handle, user_id)
+        Tracer.event("factorization.solve", handle=handle, n=n, count=len(rhs))
+
+        solutions = await asyncio.to_thread(BlockedLUSolver.lu_solve, lu, perm, rhs.T)
+        return np.ascontiguousarray(solutions.T)
+
+    @staticmethod
+    async def _complete_from_cache(task_id: str, user_id: int, input_hash: str, arrays: dict, db):
+
+        # Та сама система вже розв'язувалась: задача завершується одразу, без пулу
+        solution = SolutionCache.get(input_hash)
+        if solution is None:
+            stored = await repository.find_solution_by_hash(db, input_hash, exclude_methods=ITERATIVE_ENGINES)
+            SolutionCache.record(hit_from_db=stored is not None)
+            if stored is None:
+                return None
+            solution = np.frombuffer(stored, dtype=SOLUTION_DTYPE)
+            SolutionCache.put(input_hash, solution)
+
+        Tracer.event("task.cache_hit", input_hash=input_hash[:12])
+
+        summary = {"n": len(solution), "task_id": task_id, "cached": True}
+        history = TaskCreate(
+            user_id=user_id,
+            input_data=MatrixStore.input_summary(arrays, input_hash),
+            result=summary,
+            task_id=task_id,
+            solution=solution.tobytes(),
+            input_hash=input_hash,
+            n=len(solution),
+            status="cached",
+            duration=0.0,
+            residual=await asyncio.to_thread(TaskManager._residual, arrays, solution)
+        )
+
+        await repository.create_task_progress(db, task_id, user_id, status="queued")
+        await repository.complete_task(db, task_id, result=summary, history=history)
+        ProgressBroker.publish(task_id, status="completed", progress=100.0)
+
         return {
             "task_id": task_id,
-            "status": "processing",
-            "message": "Завдання прийнято та перебуває в обробці"
+            "status": "completed",
+            "cached": True,
+            "message": "Цю систему вже розв'язували — результат узято з кешу"
+        }
+
+    @staticmethod
+    async def _enqueue(task_id: str, user_id: int, db, submit, *args):
+
+        # Рядок прогресу створюємо до постановки в чергу, щоб статус був доступний одразу
+        await repository.create_task_progress(db, task_id, user_id, status="queued")
+        ProgressBroker.publish(task_id, status="queued", progress=0.0)
+
+        try:
+            await asyncio.to_thread(submit, *args)
+        except QuotaExceededError as e:
+            await repository.update_task_progress_status(
+                db,
+                task_id,
+                status="error",
+                progress=0.0,
+                error_message=e.detail
+            )
+            ProgressBroker.publish(task_id, status="error", progress=0.0)
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        except queue.Full:
+            await repository.update_task_progress_status(
+                db,
+                task_id,
+                status="error",
+                progress=0.0,
+                error_message="Черга обчислень переповнена"
+            )
+            ProgressBroker.publish(task_id, status="error", progress=0.0)
+            raise HTTPException(
+                status_code=503,
+                detail="Сервер перевантажений: черга обчислень заповнена, спробуйте пізніше"
+            )
+        except Exception as e:
+            # Будь-який інший збій постановки (pickle, спільна пам'ять, зупинений пул) —
+            # інакше рядок лишився б у "queued" назавжди
+            Tracer.event("task.enqueue_failed", level="error", error=str(e))
+            await repository.update_task_progress_status(
+                db,
+                task_id,
+                status="error",
+                progress=0.0,
+                error_message=f"Не вдалося поставити задачу в чергу: {e}"
+            )
+            ProgressBroker.publish(task_id, status="error", progress=0.0)
+            raise
+
+        if submit in (JobQueue.submit, JobQueue.submit_file):
+            Tracer.event("task.queued", backend="queue")
+        else:
+            Tracer.event("task.queued", queued=SolverPool.queued())
+
+        return {
+            "task_id": task_id,
+            "status": "queued",
+            "message": "Завдання прийнято та перебуває в черзі на обробку"
         }
 
     @staticmethod
@@ -197,26 +459,142 @@ class TaskManager:
                 "progress": 0
             }
         
-        return {
+        status = {
             "task_id": task_id,
             "status": task.status,
             "progress": task.progress
         }
 
+        # Час рахується від початку обчислення, а не від постановки в чергу;
+        # ETA записана разом з прогресом, тож віднімаємо час, що минув відтоді
+        now = datetime.utcnow()
+        if task.started_at is not None:
+            end = now if task.status == "processing" else (task.updated_at or now)
+            status["elapsed"] = round(max(0.0, (end - task.started_at).total_seconds()), 3)
+        if task.status == "processing" and task.eta is not None and task.updated_at is not None:
+            status["eta"] = round(max(0.0, task.eta - (now - task.updated_at).total_seconds()), 3)
+
+        if task.status == "queued":
+            # Позицію знає репліка, у чиїй черзі задача; решта отримують її через NOTIFY
+            snapshot = ProgressBroker.get(task_id)
+            if snapshot is not None and snapshot.get("queue_position") is not None:
+                status["queue_position"] = snapshot["queue_position"]
+
+        return status
+
+    @staticmethod
+    async def get_solution(task_id: str, db, offset: int = 0, limit: int = None):
+
+        # Повертає (n, зріз розв'язку як float64) або None
+        stored = await repository.get_solution_slice(
+            db, task_id, offset, limit, item_size=SOLUTION_DTYPE.itemsize
+        )
+        if stored is not None:
+            n, data = stored
+            return n, np.frombuffer(data, dtype=SOLUTION_DTYPE)
+
+        # Задачі, збережені до появи бінарного формату, або резервний запис у task_progress
+        task = await repository.get_task_progress(db, task_id)
+        if task is None or not task.result or task.result.get("solution") is None:
+            return None
+
+        solution = task.result["solution"]
+        end = None if limit is None else offset + limit
+        return len(solution), np.asarray(solution[offset:end], dtype=SOLUTION_DTYPE)
+
+    @staticmethod
+    async def get_history(user_id: int, db, limit: int = 50, cursor: str = None):
+
+        # Курсор — непрозорий ключ (created_at, id) останнього запису сторінки
+        before = None
+        if cursor:
+            try:
+                created_at, history_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+                before = (datetime.fromisoformat(created_at), int(history_id))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Некоректний курсор сторінки")
+
+        items = await repository.get_tasks_for_user(db, user_id, limit=limit, before=before)
+
+        next_cursor = None
+        if len(items) == limit:
+            last = items[-1]
+            key = f"{last.created_at.isoformat()}|{last.id}"
+            next_cursor = base64.urlsafe_b64encode(key.encode()).decode()
+
+        return {"items": items, "next_cursor": next_cursor}
+
     @staticmethod
-    async def get_task_result_from_db(task_id: str, db):
+    async def get_history_entry(history_id: int, user_id: int, db):
+
+        entry = await repository.get_history_entry(db, history_id)
+        if entry is None or entry.user_id != user_id:
+            raise HTTPException(status_code=404, detail="Задачу не знайдено")
+        return entry
+
+    @staticmethod
+    async def get_task_input(task_id: str, user_id: int, db):
+
+        # Повертає (тіло, media type, заголовки) вхідних даних збереженої задачі або None.
+        # Щільні — у raw-форматі /gauss/solve (A по рядках, потім b), розріджені — .npz з CSR
+        history = await repository.get_task_history(db, task_id)
+        if history is None or history.user_id != user_id:
+            return None
+
+        if history.input_hash is None:
+            data = history.input_data
+            if "matrix" not in data:
+                return None
+            matrix = np.asarray(data["matrix"], dtype=MATRIX_DTYPE)
+            rhs = np.asarray(data["rhs"], dtype=MATRIX_DTYPE)
+        else:
+            blob = await repository.get_matrix_blob(db, history.input_hash)
+            if blob is None:
+                return None
+            if blob.codec == SPARSE_CODEC:
+                return blob.data, "application/x-npz", {"X-Matrix-Size": str(blob.n)}
+            matrix, rhs = await asyncio.to_thread(MatrixStore.decode, blob.data, blob.n)
+
+        return matrix.tobytes() + rhs.tobytes(), "application/octet-stream", {"X-Matrix-Size": str(len(rhs))}
+
+    @staticmethod
+    async def get_task_result_from_db(task_id: str, db, offset: int = 0, limit: int = None):
         
         task = await repository.get_task_progress(db, task_id)
         
         if task is None:
             return None
         
-        if task.status == "completed" and task.result:
+        if task.status == "completed" and task.result and task.result.get("handle"):
+            # Задача факторизації: результат — дескриптор для /gauss/factorizations/{handle}/solve
             return {
                 "task_id": task_id,
                 "status": "completed",
-                "solution": task.result.get("solution")
+                "handle": task.result["handle"],
+                "n": task.result.get("n")
+            }
+
+        if task.status == "completed" and task.result:
+            stored = await TaskManager.get_solution(task_id, db, offset, limit)
+            if stored is None:
+                return {
+                    "task_id": task_id,
+                    "status": "completed",
+                    "solution": None
+                }
+
+            n, solution = stored
+            response = {
+                "task_id": task_id,
+                "status": "completed",
+                "cached": bool(task.result.get("cached")),
+                "n": n,
+                "offset": offset,
+                "solution": solution
             }
+            if task.result.get("solver"):
+                response["solver"] = task.result["solver"]
+            return response
         elif task.status == "error":
             return {
                 "task_id": task_id,
@@ -238,6 +616,10 @@ class TaskManager:
     async def cancel_task_in_db(task_id: str, db):
         
         await repository.cancel_task_progress(db, task_id)
+        SolverPool.cancel_waiting(task_id)
+        if SOLVER_BACKEND == "queue":
+            # Задача, яку ще не взяв воркер, просто зникає з черги
+            await repository.cancel_queued_solve_job(db, task_id)
         
         return {
             "task_id": task_id,
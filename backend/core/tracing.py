@@ -0,0 +1,212 @@
+import contextvars
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40, "off": 100}
+
+TRACE_LEVEL = os.getenv("TRACE_LEVEL", "info")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 1.0))
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(tempfile.gettempdir(), "webapp_trace.jsonl"))
+TRACE_CONSOLE = os.getenv("TRACE_CONSOLE", "1") == "1"
+TRACE_FLUSH_INTERVAL = float(os.getenv("TRACE_FLUSH_INTERVAL", 0.5))
+TRACE_BUFFER_SIZE = 65536
+
+# {"task_id", "user_id", "sampled", "span_id"} поточної задачі або None
+_context = contextvars.ContextVar("trace_context", default=None)
+_NOOP = nullcontext()
+
+
+class _Span:
+
+    __slots__ = ("name", "attrs", "span_id", "parent_id", "start", "token")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.span_id = Tracer._next_id()
+
+    def __enter__(self):
+        context = _context.get()
+        self.parent_id = context.get("span_id") if context else None
+        self.token = _context.set(dict(context or {}, span_id=self.span_id))
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.time()
+        _context.reset(self.token)
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        Tracer._emit("span", self.name, self.attrs, start=self.start, duration=end - self.start,
+                     span_id=self.span_id, parent_id=self.parent_id)
+        return False
+
+
+class Tracer:
+
+    # Структуроване трасування замість print: спани фаз (ingest, validate, queue, forward,
+    # backward, persist) і події з рівнем та контекстом задачі (task_id, user_id).
+    # Запис — лише додавання dict у deque; серіалізацію в JSON lines (TRACE_FILE) і дзеркало
+    # в консоль робить фоновий потік раз на TRACE_FLUSH_INTERVAL, тож потоки розв'язувача
+    # не чекають на stdout чи диск. Вибірка — по задачі (crc32 task_id), усі спани задачі
+    # або пишуться, або ні. Вимкнений рівень коштує одне порівняння: span повертає nullcontext.
+    # Якщо буфер переповнений, найстаріші записи відкидаються й рахуються в dropped.
+
+    _level = LEVELS.get(TRACE_LEVEL, LEVELS["info"])
+    _buffer = deque(maxlen=TRACE_BUFFER_SIZE)
+    _dropped = 0
+    _ids = itertools.count(1)
+    _lock = threading.Lock()
+    _thread = None
+    _stop = threading.Event()
+    _pid = None
+
+    @staticmethod
+    def _next_id() -> str:
+        # Унікальний між процесами: спани воркера й API пишуться в один файл
+        return f"{os.getpid():x}.{next(Tracer._ids)}"
+
+    @staticmethod
+    def enabled(level: str = "info") -> bool:
+        if LEVELS[level] < Tracer._level:
+            return False
+        context = _context.get()
+        return context is None or context.get("sampled", True)
+
+    @staticmethod
+    def _task_context(task_id: str, user_id: int = None) -> dict:
+        sampled = zlib.crc32(task_id.encode()) % 10000 < TRACE_SAMPLE_RATE * 10000
+        return {"task_id": task_id, "user_id": user_id, "sampled": sampled, "span_id": None}
+
+    @staticmethod
+    @contextmanager
+    def task(task_id: str, user_id: int = None):
+        token = _context.set(Tracer._task_context(task_id, user_id))
+        try:
+            yield
+        finally:
+            _context.reset(token)
+
+    @staticmethod
+    def bind(task_id: str, user_id: int = None):
+        # Контекст до кінця поточної asyncio-задачі (обробника запиту); asyncio.to_thread
+        # переносить його в потік. Для потоків пулу й воркерів — Tracer.task
+        _context.set(Tracer._task_context(task_id, user_id))
+
+    @staticmethod
+    def span(name: str, level: str = "info", **attrs):
+        if not Tracer.enabled(level):
+            return _NOOP
+        return _Span(name, attrs)
+
+    @staticmethod
+    def record_span(name: str, start: float, end: float, level: str = "info", **attrs):
+        # Спан, виміряний деінде (напр. очікування в черзі: від постановки до воркера)
+        if not Tracer.enabled(level):
+            return
+        context = _context.get()
+        Tracer._emit("span", name, attrs, start=start, duration=max(0.0, end - start),
+                     span_id=Tracer._next_id(), parent_id=context.get("span_id") if context else None)
+
+    @staticmethod
+    def event(name: str, level: str = "info", **attrs):
+        if not Tracer.enabled(level):
+            return
+        Tracer._emit("event", name, attrs, level=level, start=time.time())
+
+    @staticmethod
+    def _emit(kind: str, name: str, attrs: dict, **fields):
+
+        record = {"type": kind, "name": name, "pid": os.getpid()}
+        context = _context.get()
+        if context is not None:
+            if context.get("task_id") is not None:
+                record["task_id"] = context["task_id"]
+            if context.get("user_id") is not None:
+                record["user_id"] = context["user_id"]
+        record.update(fields)
+        if attrs:
+            record["attrs"] = attrs
+
+        if len(Tracer._buffer) == TRACE_BUFFER_SIZE:
+            Tracer._dropped += 1
+        Tracer._buffer.append(record)
+
+        if Tracer._pid != os.getpid():
+            Tracer._ensure_started()
+
+    @staticmethod
+    def _ensure_started():
+
+        # Після fork/spawn потік експорту треба створити заново
+        with Tracer._lock:
+            if Tracer._pid == os.getpid():
+                return
+            Tracer._stop = threading.Event()
+            Tracer._thread = threading.Thread(target=Tracer._run, name="trace-exporter", daemon=True)
+            Tracer._pid = os.getpid()
+            Tracer._thread.start()
+
+    @staticmethod
+    def _run():
+        stop = Tracer._stop
+        while not stop.wait(TRACE_FLUSH_INTERVAL):
+            Tracer.flush()
+
+    @staticmethod
+    def flush():
+
+        batch = []
+        try:
+            while True:
+                batch.append(Tracer._buffer.popleft())
+        except IndexError:
+            pass
+
+        dropped, Tracer._dropped = Tracer._dropped, 0
+        if dropped:
+            batch.append({"type": "event", "name": "trace.dropped", "pid": os.getpid(),
+                          "level": "warning", "start": time.time(), "attrs": {"count": dropped}})
+        if not batch:
+            return
+
+        try:
+            data = "".join(json.dumps(record, default=str, ensure_ascii=False) + "\n" for record in batch).encode()
+            # Один write з O_APPEND на пакет — рядки різних процесів не перемішуються
+            fd = os.open(TRACE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        except Exception as e:
+            print(f"[Tracer] Warning: failed to export {len(batch)} record(s): {e}")
+
+        if TRACE_CONSOLE:
+            print("\n".join(Tracer._format(record) for record in batch), flush=True)
+
+    @staticmethod
+    def _format(record: dict) -> str:
+
+        parts = [f"[Trace] {record['name']}"]
+        if record["type"] == "span":
+            parts.append(f"{record['duration']:.3f}s")
+        elif record.get("level", "info") != "info":
+            parts.append(record["level"].upper())
+        if "task_id" in record:
+            parts.append(f"task={record['task_id']}")
+        parts.extend(f"{key}={value}" for key, value in record.get("attrs", {}).items())
+        return " ".join(parts)
+
+    @staticmethod
+    def shutdown():
+        if Tracer._thread is not None and Tracer._pid == os.getpid():
+            Tracer._stop.set()
+            Tracer._thread.join(TRACE_FLUSH_INTERVAL * 4)
+        Tracer.flush()
@@ -0,0 +1,267 @@
+import asyncio
+import fcntl
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+import numpy as np
+from fastapi import HTTPException, Request
+from backend.core.tracing import Tracer
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "webapp_uploads"))
+UPLOAD_TTL = 24 * 3600
+# Запис, що не завершився за цей час (репліка впала посеред запиту), не блокує claim
+UPLOAD_WRITE_TIMEOUT = 3600
+# Частини тіла запиту збираються в пакет і копіюються у файл поза циклом подій
+UPLOAD_WRITE_BATCH = 4 * 1024 * 1024
+ITEM_SIZE = 8
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadStore:
+
+    # Система зберігається у файлі float64 на диску: [A по рядках | b].
+    # Частини пишуться в memory-mapped файл у міру надходження (можна дозавантажувати
+    # з будь-якого зсуву), а розв'язувач відображає той самий файл, а не списки в пам'яті.
+    # Метадані — JSON поруч із файлом, тож за спільного UPLOAD_DIR їх бачать обидві репліки.
+
+    @staticmethod
+    def layout(n: int) -> dict:
+        return {
+            "matrix": (0, (n, n), "<f8"),
+            "rhs": (n * n * ITEM_SIZE, (n,), "<f8"),
+        }
+
+    @staticmethod
+    def _paths(upload_id: str) -> tuple[str, str]:
+        if not _UPLOAD_ID.match(upload_id):
+            raise HTTPException(status_code=404, detail="Завантаження не знайдено")
+        base = os.path.join(UPLOAD_DIR, upload_id)
+        return base + ".f64", base + ".json"
+
+    @staticmethod
+    @contextmanager
+    def _locked_meta(upload_id: str):
+        _, meta_path = UploadStore._paths(upload_id)
+        try:
+            f = open(meta_path, "r+")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Завантаження не знайдено")
+
+        with f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            meta = json.load(f)
+            yield meta
+            f.seek(0)
+            f.truncate()
+            json.dump(meta, f)
+
+    @staticmethod
+    def create(user_id: int, n: int) -> dict:
+
+        if n < 1:
+            raise HTTPException(status_code=400, detail="Розмірність матриці має бути додатною")
+
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        UploadStore.purge_expired()
+
+        upload_id = uuid.uuid4().hex
+        data_path, meta_path = UploadStore._paths(upload_id)
+        size = (n * n + n) * ITEM_SIZE
+
+        # Розріджений файл: місце на диску займають лише записані сторінки
+        with open(data_path, "wb") as f:
+            f.truncate(size)
+
+        meta = {
+            "upload_id": upload_id,
+            "user_id": user_id,
+            "n": n,
+            "size": size,
+            "ranges": [],
+            "created_at": time.time(),
+        }
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+
+        Tracer.event("upload.created", level="debug", upload=upload_id, n=n, size=size)
+        return UploadStore.describe(meta)
+
+    @staticmethod
+    def get(upload_id: str, user_id: int) -> dict:
+        with UploadStore._locked_meta(upload_id) as meta:
+            if meta["user_id"] != user_id:
+                raise HTTPException(status_code=404, detail="Завантаження не знайдено")
+            return dict(meta, path=UploadStore._paths(upload_id)[0])
+
+    @staticmethod
+    def claim(upload_id: str, user_id: int) -> dict:
+
+        # Одне завантаження — одна задача: файл видаляється після її завершення
+        with UploadStore._locked_meta(upload_id) as meta:
+            if meta["user_id"] != user_id:
+                raise HTTPException(status_code=404, detail="Завантаження не знайдено")
+            if meta.get("claimed"):
+                raise HTTPException(status_code=409, detail="Розв'язування цього завантаження вже запущено")
+            if UploadStore._writing(meta):
+                raise HTTPException(status_code=409, detail="Частину завантаження ще записують")
+            if sum(end - start for start, end in meta["ranges"]) != meta["size"]:
+                raise HTTPException(status_code=409, detail="Завантаження ще не завершене")
+            meta["claimed"] = True
+            return dict(meta, path=UploadStore._paths(upload_id)[0])
+
+    @staticmethod
+    def release(upload_id: str):
+        # Повертає завантаження, якщо задачу не вдалося поставити в чергу
+        try:
+            with UploadStore._locked_meta(upload_id) as meta:
+                meta["claimed"] = False
+        except HTTPException:
+            pass
+
+    @staticmethod
+    def describe(meta: dict) -> dict:
+        received = sum(end - start for start, end in meta["ranges"])
+        return {
+            "upload_id": meta["upload_id"],
+            "n": meta["n"],
+            "size": meta["size"],
+            "received": received,
+            "ranges": meta["ranges"],
+            "complete": received == meta["size"],
+        }
+
+    @staticmethod
+    def _writing(meta: dict) -> bool:
+        cutoff = time.time() - UPLOAD_WRITE_TIMEOUT
+        return any(started > cutoff for started in meta.get("writing", {}).values())
+
+    @staticmethod
+    def _write(buffer: np.memmap, position: int, chunks: list):
+        data = b"".join(chunks)
+        buffer[position:position + len(data)] = np.frombuffer(data, dtype=np.uint8)
+
+    @staticmethod
+    async def write_stream(upload_id: str, user_id: int, offset: int, request: Request) -> dict:
+
+        if offset < 0 or offset % ITEM_SIZE:
+            raise HTTPException(status_code=400, detail="Зсув має бути невід'ємним і кратним 8 байтам")
+
+        # Поки запис триває, claim відмовляє: розв'язувач не побачить файл, що ще переписується
+        token = uuid.uuid4().hex
+        with UploadStore._locked_meta(upload_id) as meta:
+            if meta["user_id"] != user_id:
+                raise HTTPException(status_code=404, detail="Завантаження не знайдено")
+            if meta.get("claimed"):
+                raise HTTPException(status_code=409, detail="Завантаження вже передано на розв'язування")
+            meta.setdefault("writing", {})[token] = time.time()
+            size = meta["size"]
+
+        position = offset
+        try:
+            buffer = np.memmap(UploadStore._paths(upload_id)[0], dtype=np.uint8, mode="r+")
+            try:
+                pending, pending_start, pending_size = [], position, 0
+                async for chunk in request.stream():
+                    if not chunk:
+                        continue
+                    end = position + len(chunk)
+                    if end > size:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Дані виходять за межі системи ({size} байт)"
+                        )
+                    pending.append(chunk)
+                    pending_size += len(chunk)
+                    position = end
+                    if pending_size >= UPLOAD_WRITE_BATCH:
+                        await asyncio.to_thread(UploadStore._write, buffer, pending_start, pending)
+                        pending, pending_start, pending_size = [], position, 0
+                if pending:
+                    await asyncio.to_thread(UploadStore._write, buffer, pending_start, pending)
+                await asyncio.to_thread(buffer.flush)
+            finally:
+                del buffer
+        except BaseException:
+            try:
+                UploadStore._finish_write(upload_id, token)
+            except HTTPException:
+                pass
+            raise
+
+        state = UploadStore._finish_write(upload_id, token, [offset, position] if position > offset else None)
+        if state is None:
+            raise HTTPException(status_code=409, detail="Завантаження вже передано на розв'язування")
+        return state
+
+    @staticmethod
+    def _finish_write(upload_id: str, token: str, written: list = None):
+        # None — завантаження тим часом передали на розв'язування, записане не зараховується
+        with UploadStore._locked_meta(upload_id) as current:
+            current.get("writing", {}).pop(token, None)
+            if current.get("claimed"):
+                return None
+            if written is not None:
+                current["ranges"] = UploadStore._merge(current["ranges"] + [written])
+            return UploadStore.describe(current)
+
+    @staticmethod
+    async def receive(request: Request, user_id: int, n: int) -> dict:
+
+        # Одноразове потокове завантаження: тіло запиту одразу йде у файл, без буферизації
+        upload = UploadStore.create(user_id, n)
+        try:
+            state = await UploadStore.write_stream(upload["upload_id"], user_id, 0, request)
+        except Exception:
+            UploadStore.delete(upload["upload_id"])
+            raise
+
+        if not state["complete"]:
+            UploadStore.delete(upload["upload_id"])
+            raise HTTPException(
+                status_code=400,
+                detail=f"Очікувалось {state['size']} байт для системи {n}×{n}, отримано {state['received']}"
+            )
+
+        return UploadStore.claim(upload["upload_id"], user_id)
+
+    @staticmethod
+    def _merge(ranges: list) -> list:
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+
+    @staticmethod
+    def delete(upload_id: str):
+        for path in UploadStore._paths(upload_id):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def purge_expired():
+        cutoff = time.time() - UPLOAD_TTL
+        try:
+            entries = os.listdir(UPLOAD_DIR)
+        except FileNotFoundError:
+            return
+
+        for name in entries:
+            upload_id, ext = os.path.splitext(name)
+            if ext != ".json" or not _UPLOAD_ID.match(upload_id):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(UPLOAD_DIR, name)) < cutoff:
+                    Tracer.event("upload.expired", upload=upload_id)
+                    UploadStore.delete(upload_id)
+            except FileNotFoundError:
+                pass
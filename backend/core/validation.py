@@ -6,14 +6,6 @@ MAX_TIME = 600
 
 class TaskValidator:
 
-    @staticmethod
-    def validate_matrix(matrix: list[list[float]], vector: list[float]):
-
-        n = len(matrix)
-
-        print(f"[Validator] Matrix size: {n}x{n}")
-        
-    
     @staticmethod
     def validate_timeout(start_time: float):
 
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from backend.core.validation import TaskValidator
+from backend.core.progress import ProgressTracker
+from backend.core.cancelation import CancelationManager, TaskCancelledError
+
+CHECKPOINT_INTERVAL = float(os.getenv("CHECKPOINT_INTERVAL", 0.25))
+THROUGHPUT_SMOOTHING = 0.3
+# Швидкість поточної задачі вважаємо надійною після стількох секунд обчислень
+MIN_MEASURE_TIME = 0.5
+
+
+class WorkModel:
+
+    # Прогрес і ETA за виконаною роботою, а не за номером ітерації.
+    # Крок i виключення Гауса оновлює підматрицю (n-i-1)×(n-i): 2(n-i-1)(n-i) флопів,
+    # разом E(n) = 2(n³ - n)/3; зворотна підстановка — n² флопів на праву частину.
+    # Тож за номером рядка i = n/2 виконано вже 7/8 виключення, а не половину.
+    # ETA = залишок флопів / швидкість: виміряна в цій задачі, а до першого виміру —
+    # згладжена швидкість попередніх задач того ж методу в цьому процесі.
+    # Контрольні точки (скасування, тайм-аут, прогрес) — за годинником, раз на CHECKPOINT_INTERVAL.
+
+    _throughput = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def elimination_flops(n: int, k: int = None) -> float:
+        # Флопи виключення після перших k стовпців (k = None — повне)
+        def total(m):
+            return 2.0 * (m ** 3 - m) / 3
+        return total(n) if k is None else total(n) - total(n - k)
+
+    @staticmethod
+    def substitution_flops(n: int, steps: int = None) -> float:
+        steps = n if steps is None else steps
+        return float(steps) ** 2
+
+    @staticmethod
+    def solve_flops(n: int) -> float:
+        # Виключення + дві трикутні підстановки
+        return WorkModel.elimination_flops(n) + 2 * WorkModel.substitution_flops(n)
+
+    @staticmethod
+    def throughput(engine: str):
+        with WorkModel._lock:
+            return WorkModel._throughput.get(engine)
+
+    @staticmethod
+    def record(engine: str, flops: float, seconds: float):
+
+        if seconds < MIN_MEASURE_TIME or flops <= 0:
+            return
+        rate = flops / seconds
+        with WorkModel._lock:
+            previous = WorkModel._throughput.get(engine)
+            WorkModel._throughput[engine] = rate if previous is None else (
+                THROUGHPUT_SMOOTHING * rate + (1 - THROUGHPUT_SMOOTHING) * previous
+            )
+
+    @staticmethod
+    def tracker(task_id: str, engine: str, n: int, total: float, start_time: float, start: float = 5, span: float = 90):
+
+        # report(done) — виконано done флопів з total; перевіряє скасування й тайм-аут
+        # і оновлює прогрес start → start + span, але не частіше ніж раз на CHECKPOINT_INTERVAL.
+        # report(done, force=True) — контрольна точка поза розкладом (межа фази)
+        total = max(total, 1.0)
+        started = time.monotonic()
+        state = {"next": started}
+
+        def report(done: float, force: bool = False):
+            now = time.monotonic()
+            if not force and now < state["next"]:
+                return
+            state["next"] = now + CHECKPOINT_INTERVAL
+
+            if CancelationManager.is_cancelled(task_id):
+                raise TaskCancelledError(task_id)
+            TaskValidator.validate_timeout(start_time)
+
+            elapsed = now - started
+            rate = done / elapsed if elapsed >= MIN_MEASURE_TIME and done > 0 else WorkModel.throughput(engine)
+            eta = max(0.0, total - done) / rate if rate else None
+
+            ProgressTracker.update(task_id, start + span * min(1.0, done / total), matrix_size=n, eta=eta)
+
+        return report
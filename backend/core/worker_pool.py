@@ -0,0 +1,564 @@
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backend.core.progress_stream import ProgressBroker
+from backend.core.metrics import Metrics
+from backend.core.tracing import Tracer
+from backend.core.scheduler import SolveScheduler
+from backend.core.pg_listener import PgListener
+from backend.core.db_bridge import DBBridge
+from backend.db import repository
+from backend.db.repository import CANCEL_CHANNEL
+
+SOLVER_WORKERS = int(os.getenv("SOLVER_WORKERS", os.cpu_count() or 1))
+SOLVER_QUEUE_SIZE = int(os.getenv("SOLVER_QUEUE_SIZE", SOLVER_WORKERS * 4))
+SOLVER_BLAS_THREADS = int(os.getenv("SOLVER_BLAS_THREADS", max(1, (os.cpu_count() or 1) // SOLVER_WORKERS)))
+
+_BLAS_THREAD_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+_ALIGNMENT = 64
+
+
+class SharedArrays:
+
+    @staticmethod
+    def pack(arrays: dict) -> tuple[shared_memory.SharedMemory, dict]:
+        # Розкладка: name -> (offset, shape, dtype); кожен масив вирівняний на 64 байти
+        layout = {}
+        offset = 0
+        prepared = {}
+
+        for name, data in arrays.items():
+            arr = data if isinstance(data, np.ndarray) else np.asarray(data, dtype=np.float64)
+            prepared[name] = arr
+            layout[name] = (offset, arr.shape, arr.dtype.str)
+            offset += -(-arr.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        try:
+            for name, arr in prepared.items():
+                start, shape, dtype = layout[name]
+                view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+                view[...] = arr
+                del view
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+
+        return shm, layout
+
+    @staticmethod
+    def attach(shm_name: str, layout: dict) -> tuple[shared_memory.SharedMemory, dict]:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        return shm, SharedArrays.views(shm.buf, layout)
+
+    @staticmethod
+    def map_file(path: str, layout: dict, writable: bool = False) -> tuple[np.memmap, dict]:
+        # Сторінки файлу підтягуються з page cache на вимогу
+        buffer = np.memmap(path, dtype=np.uint8, mode="r+" if writable else "r")
+        return buffer, SharedArrays.views(buffer, layout)
+
+    @staticmethod
+    def views(buffer, layout: dict) -> dict:
+        return {
+            name: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=start)
+            for name, (start, shape, dtype) in layout.items()
+        }
+
+    @staticmethod
+    def release(shm: shared_memory.SharedMemory, unlink: bool = False):
+        try:
+            shm.close()
+        except BufferError as e:
+            print(f"[SharedArrays] Warning: segment {shm.name} still referenced: {e}")
+        if unlink:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def solve_task(task: dict, arrays: dict) -> dict:
+
+    # Розв'язує одну задачу в поточному процесі; спільне для воркерів SolverPool і JobWorker
+    from backend.core.engines import SOLVER_ENGINES, DEFAULT_ENGINE
+    from backend.core.lu_solver import BlockedLUSolver
+    from backend.core.sparse_solver import SparseSolver
+
+    task_id = task["task_id"]
+    if task.get("kind") == "factorize":
+        # LU пишеться на місце матриці в тому ж буфері, перестановка — у сусідній масив
+        return BlockedLUSolver.factorize_system(
+            task_id=task_id,
+            user_id=task["user_id"],
+            matrix=arrays["lu"],
+            perm_out=arrays["perm"]
+        )
+    elif task.get("kind") == "sparse" and task.get("engine"):
+        # Ітераційний метод на розрідженій матриці: лише множення CSR на вектор
+        solver = SOLVER_ENGINES[task["engine"]]
+        return solver.solve_system(
+            task_id=task_id,
+            user_id=task["user_id"],
+            matrix=SparseSolver.operator(arrays["indptr"], arrays["indices"], arrays["data"]),
+            vector=arrays["rhs"],
+            **task.get("options", {})
+        )
+    elif task.get("kind") == "sparse":
+        return SparseSolver.solve_system(
+            task_id=task_id,
+            user_id=task["user_id"],
+            indptr=arrays["indptr"],
+            indices=arrays["indices"],
+            data=arrays["data"],
+            vector=arrays["rhs"]
+        )
+    else:
+        solver = SOLVER_ENGINES[task.get("engine", DEFAULT_ENGINE)]
+        return solver.solve_system(
+            task_id=task_id,
+            user_id=task["user_id"],
+            matrix=arrays["matrix"],
+            vector=arrays["rhs"],
+            **task.get("options", {})
+        )
+
+
+def _worker_main(tasks_queue, events_queue):
+    from backend.core.engines import DEFAULT_ENGINE
+    from backend.core.db_bridge import DBBridge
+    from backend.core.cancelation import CancelationManager
+    from backend.core.progress import ProgressTracker
+    from backend.core.progress_writer import ProgressWriter
+    from backend.core.validation import MAX_TIME
+
+    pid = os.getpid()
+    Tracer.event("worker.started", pid=pid)
+
+    CancelationManager.start_listener()
+    ProgressTracker.set_publisher(
+        lambda task_id, value, eta: events_queue.put(("progress", task_id, (value, eta)))
+    )
+    Metrics.set_sink(lambda values: events_queue.put(("metrics", None, values)))
+
+    abandoned = False
+    while True:
+        task = tasks_queue.get()
+        if task is None:
+            break
+
+        task_id = task["task_id"]
+        events_queue.put(("started", task_id, pid))
+
+        started = time.time()
+        kind = task.get("kind", "dense")
+        if kind == "factorize":
+            engine = "blocked_lu"
+        elif kind == "sparse":
+            engine = task.get("engine") or "splu"
+        else:
+            engine = task.get("engine", DEFAULT_ENGINE)
+        layout = task["layout"]
+        size = Metrics.size_bucket((layout["lu"] if kind == "factorize" else layout["rhs"])[1][0])
+        if "enqueued_at" in task:
+            Metrics.observe("solver_queue_wait_seconds", started - task["enqueued_at"], engine=engine)
+
+        with Tracer.task(task_id, task["user_id"]):
+            if "enqueued_at" in task:
+                Tracer.record_span("queue", task["enqueued_at"], started, engine=engine)
+
+            with Tracer.span("solve", engine=engine, kind=kind):
+                shm = buffer = None
+                if "file_path" in task:
+                    buffer, arrays = SharedArrays.map_file(task["file_path"], task["layout"], task.get("writable", False))
+                else:
+                    shm, arrays = SharedArrays.attach(task["shm_name"], task["layout"])
+                try:
+                    result = solve_task(task, arrays)
+                except Exception as e:
+                    result = {
+                        "task_id": task_id,
+                        "status": "error",
+                        "error": str(e),
+                        "solution": None
+                    }
+                finally:
+                    arrays = None
+                    if shm is not None:
+                        SharedArrays.release(shm)
+                    if buffer is not None and task.get("writable"):
+                        buffer.flush()
+                    buffer = None
+                    CancelationManager.clear(task_id)
+
+        elapsed = time.time() - started
+        outcome = result["status"]
+        if outcome == "error" and elapsed >= MAX_TIME:
+            outcome = "timeout"
+        Metrics.observe("solver_solve_seconds", elapsed, engine=engine, kind=kind, size=size)
+        Metrics.inc("solver_tasks_total", status=outcome)
+        # Метрики задачі — раніше за "done", щоб /metrics уже їх показував, коли задача завершена
+        Metrics.flush()
+
+        events_queue.put(("done", task_id, result))
+
+        # У процесі лишився потік, який неможливо зупинити (напр. SuperLU скасованої задачі)
+        if result.get("restart_worker"):
+            Tracer.event("worker.restarting", level="warning", pid=pid, abandoned_task=task_id)
+            abandoned = True
+            break
+
+    Tracer.event("worker.stopped", pid=pid)
+    ProgressWriter.shutdown()
+    DBBridge.shutdown()
+    Tracer.shutdown()
+
+    if abandoned:
+        # os._exit не чекає на потік-годувальник mp.Queue: спершу дописуємо "done" у канал
+        events_queue.close()
+        events_queue.join_thread()
+        # Звичайне завершення інтерпретатора чекало б на завислий потік
+        os._exit(0)
+
+
+class SolverPool:
+
+    _ctx = mp.get_context("spawn")
+    _tasks_queue = None
+    _events_queue = None
+    _workers = []
+    _running = {}
+    _pending = {}
+    _pending_lock = threading.Lock()
+    _dispatch_lock = threading.Lock()
+    _positions = {}
+    _capacity = SOLVER_QUEUE_SIZE
+    _cancel_subscribed = False
+    _collector = None
+    _finalizers = None
+    _stopping = threading.Event()
+
+    @staticmethod
+    def start(workers: int = SOLVER_WORKERS, queue_size: int = SOLVER_QUEUE_SIZE):
+
+        if SolverPool._workers:
+            return
+
+        print(f"[SolverPool] Starting {workers} workers, queue size {queue_size}")
+
+        # Черга очікування — у SolveScheduler; воркерам видається не більше задач, ніж їх є
+        SolverPool._stopping.clear()
+        SolverPool._capacity = queue_size
+        SolveScheduler.reset()
+        SolveScheduler.configure(workers)
+        SolverPool._positions = {}
+        SolverPool._tasks_queue = SolverPool._ctx.Queue()
+        SolverPool._events_queue = SolverPool._ctx.Queue()
+        SolverPool._finalizers = ThreadPoolExecutor(max_workers=4, thread_name_prefix="SolverFinalize")
+
+        for _ in range(workers):
+            SolverPool._spawn_worker()
+
+        SolverPool._collector = threading.Thread(
+            target=SolverPool._collect,
+            daemon=True,
+            name="SolverPool-collector"
+        )
+        SolverPool._collector.start()
+
+        Metrics.gauge("solver_tasks_running", "Tasks being solved by workers", lambda: len(SolverPool._running))
+        Metrics.gauge("solver_tasks_queued", "Tasks waiting in the scheduler queue", SolverPool.queued)
+        Metrics.gauge(
+            "solver_worker_processes", "Live solver worker processes",
+            lambda: sum(1 for process in SolverPool._workers if process.is_alive())
+        )
+        Metrics.gauge("solver_blas_threads", "BLAS threads per worker process", lambda: SOLVER_BLAS_THREADS)
+        Metrics.gauge("process_threads", "Threads in the API process", threading.active_count)
+
+        # Скасування з будь-якої репліки прибирає задачу з черги очікування
+        if not SolverPool._cancel_subscribed:
+            SolverPool._cancel_subscribed = True
+            PgListener.subscribe(CANCEL_CHANNEL, SolverPool.cancel_waiting)
+
+    @staticmethod
+    def _spawn_worker():
+
+        # Обмежуємо потоки BLAS у воркерах, щоб N процесів не перевантажували ядра
+        saved = {var: os.environ.get(var) for var in _BLAS_THREAD_VARS}
+        for var in _BLAS_THREAD_VARS:
+            os.environ[var] = str(SOLVER_BLAS_THREADS)
+
+        try:
+            process = SolverPool._ctx.Process(
+                target=_worker_main,
+                args=(SolverPool._tasks_queue, SolverPool._events_queue),
+                daemon=True,
+                name="SolverWorker"
+            )
+            process.start()
+        finally:
+            for var, value in saved.items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+
+        SolverPool._workers.append(process)
+        return process
+
+    @staticmethod
+    def submit(task: dict, arrays: dict, on_done):
+        # Кидає queue.Full, якщо черга заповнена, і QuotaExceededError, якщо користувач вичерпав квоту
+
+        if not SolverPool._workers:
+            raise RuntimeError("SolverPool is not started")
+
+        task_id = task["task_id"]
+        shm, layout = SharedArrays.pack(arrays)
+
+        message = dict(task, shm_name=shm.name, layout=layout)
+
+        try:
+            SolverPool._enqueue(message, {"shm": shm, "layout": layout, "on_done": on_done})
+        except Exception:
+            SharedArrays.release(shm, unlink=True)
+            raise
+
+    @staticmethod
+    def submit_file(task: dict, path: str, layout: dict, on_done, cleanup=None, writable: bool = False):
+        # Дані вже на диску (потокове завантаження): воркер відображає файл напряму;
+        # writable — воркер може змінювати файл (факторизація на місці)
+
+        if not SolverPool._workers:
+            raise RuntimeError("SolverPool is not started")
+
+        message = dict(task, file_path=path, layout=layout, writable=writable)
+        SolverPool._enqueue(message, {
+            "file_path": path,
+            "layout": layout,
+            "on_done": on_done,
+            "cleanup": cleanup
+        })
+
+    @staticmethod
+    def _enqueue(message: dict, entry: dict):
+
+        task_id = message["task_id"]
+        message["enqueued_at"] = time.time()
+
+        with SolverPool._pending_lock:
+            SolverPool._pending[task_id] = entry
+
+        try:
+            if not SolveScheduler.enqueue(message, SolverPool._capacity):
+                raise queue.Full
+        except Exception:
+            with SolverPool._pending_lock:
+                SolverPool._pending.pop(task_id, None)
+            raise
+
+        SolverPool._dispatch()
+
+    @staticmethod
+    def _dispatch():
+
+        # Віддає воркерам задачі в порядку SolveScheduler, поки є вільні воркери,
+        # і публікує нові позиції задач, що лишились чекати
+        with SolverPool._dispatch_lock:
+            while True:
+                message = SolveScheduler.next()
+                if message is None:
+                    break
+                SolverPool._tasks_queue.put(message)
+
+            positions = SolveScheduler.positions()
+            changed = {
+                task_id: position
+                for task_id, position in positions.items()
+                if SolverPool._positions.get(task_id) != position
+            }
+            SolverPool._positions = positions
+
+        for task_id, position in changed.items():
+            ProgressBroker.publish(task_id, queue_position=position)
+        if changed:
+            # Іншим реплікам — через NOTIFY, без очікування на БД
+            DBBridge.submit(repository.notify_queue_positions, changed)
+
+    @staticmethod
+    def cancel_waiting(task_id: str) -> bool:
+
+        # Задача ще не потрапила до воркера — завершуємо її одразу, не займаючи воркер
+        if not SolveScheduler.remove(task_id):
+            return False
+
+        with Tracer.task(task_id):
+            Tracer.event("task.cancelled_waiting")
+        Metrics.inc("solver_tasks_total", status="cancelled")
+        SolverPool._complete(task_id, {
+            "task_id": task_id,
+            "status": "cancelled",
+            "solution": None
+        })
+        SolverPool._dispatch()
+        return True
+
+    @staticmethod
+    def queued() -> int:
+        return len(SolverPool._positions)
+
+    @staticmethod
+    def _collect():
+
+        last_check = time.time()
+        while not SolverPool._stopping.is_set():
+            if time.time() - last_check >= 1.0:
+                SolverPool._check_workers()
+                last_check = time.time()
+
+            try:
+                event = SolverPool._events_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            SolverPool._handle(event)
+
+    @staticmethod
+    def _drain():
+        # Події, що вже лежать у каналі, — без очікування нових
+        while True:
+            try:
+                event = SolverPool._events_queue.get_nowait()
+            except queue.Empty:
+                return
+            except (EOFError, OSError):
+                return
+            SolverPool._handle(event)
+
+    @staticmethod
+    def _handle(event):
+        kind, task_id, payload = event
+
+        if kind == "progress":
+            value, eta = payload
+            ProgressBroker.publish(task_id, progress=value, eta=eta)
+        elif kind == "metrics":
+            Metrics.merge(payload)
+        elif kind == "started":
+            SolverPool._running[task_id] = payload
+            ProgressBroker.publish(task_id, status="processing")
+        elif kind == "done":
+            SolverPool._running.pop(task_id, None)
+            SolveScheduler.finish(task_id)
+            SolverPool._dispatch()
+            SolverPool._complete(task_id, payload)
+
+    @staticmethod
+    def _complete(task_id: str, result: dict):
+
+        with SolverPool._pending_lock:
+            entry = SolverPool._pending.pop(task_id, None)
+
+        if entry is None:
+            Tracer.event("pool.unknown_completion", level="warning", task=task_id)
+            return
+
+        def _finalize():
+            try:
+                if entry.get("shm") is not None:
+                    arrays = SharedArrays.views(entry["shm"].buf, entry["layout"])
+                else:
+                    _, arrays = SharedArrays.map_file(entry["file_path"], entry["layout"])
+                entry["on_done"](result, arrays)
+            except Exception as e:
+                Tracer.event("pool.finalize_failed", level="error", task=task_id, error=str(e))
+            finally:
+                arrays = None
+                SolverPool._release(entry)
+
+        SolverPool._finalizers.submit(_finalize)
+
+    @staticmethod
+    def _release(entry: dict):
+        if entry.get("shm") is not None:
+            SharedArrays.release(entry["shm"], unlink=True)
+        if entry.get("cleanup") is not None:
+            try:
+                entry["cleanup"]()
+            except Exception as e:
+                Tracer.event("pool.cleanup_failed", level="warning", error=str(e))
+
+    @staticmethod
+    def _check_workers():
+
+        dead = [process for process in SolverPool._workers if not process.is_alive()]
+        if not dead or SolverPool._stopping.is_set():
+            return
+
+        # Процес міг штатно завершитись (restart_worker) після "done": його події вже в каналі,
+        # і їх треба обробити раніше, ніж вважати задачі процесу аварійно перерваними
+        SolverPool._drain()
+
+        for process in dead:
+
+            Tracer.event("worker.died", level="warning", pid=process.pid, exitcode=process.exitcode)
+            SolverPool._workers.remove(process)
+
+            for task_id, pid in list(SolverPool._running.items()):
+                if pid == process.pid:
+                    SolverPool._running.pop(task_id, None)
+                    SolveScheduler.finish(task_id)
+                    Metrics.inc("solver_tasks_total", status="error")
+                    SolverPool._complete(task_id, {
+                        "task_id": task_id,
+                        "status": "error",
+                        "error": f"Процес обчислення аварійно завершився (код {process.exitcode})",
+                        "solution": None
+                    })
+
+            SolverPool._spawn_worker()
+            SolverPool._dispatch()
+
+    @staticmethod
+    def shutdown(timeout: float = 5.0):
+
+        if not SolverPool._workers:
+            return
+
+        print(f"[SolverPool] Shutting down {len(SolverPool._workers)} workers")
+        SolverPool._stopping.set()
+
+        for _ in SolverPool._workers:
+            try:
+                SolverPool._tasks_queue.put(None, timeout=timeout)
+            except queue.Full:
+                break
+
+        deadline = time.time() + timeout
+        for process in SolverPool._workers:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.terminate()
+
+        if SolverPool._collector is not None:
+            SolverPool._collector.join(timeout)
+
+        SolverPool._finalizers.shutdown(wait=True)
+
+        with SolverPool._pending_lock:
+            for entry in SolverPool._pending.values():
+                SolverPool._release(entry)
+            SolverPool._pending.clear()
+
+        SolverPool._workers = []
+        SolverPool._running = {}
+        SolveScheduler.reset()
@@ -1,16 +1,81 @@
-from backend.db.database import engine
+from backend.db.database import engine, SessionLocal
 from backend.db.models import Base
+from backend.db import repository
+from backend.core.maintenance import TASK_PROGRESS_RETENTION_DAYS, TASK_PROGRESS_PARTITIONS_AHEAD
+from sqlalchemy import text
+from datetime import datetime
 import asyncio
 
+# task_progress став секціонованим (див. TaskProgress): стару звичайну таблицю
+# відсуваємо до create_all, а свіжі рядки переносимо після створення секцій
+PRE_MIGRATIONS = [
+    """
+    DO $$ BEGIN
+        IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'task_progress' AND relkind = 'r') THEN
+            ALTER TABLE task_progress RENAME TO task_progress_legacy;
+            ALTER TABLE task_progress_legacy RENAME CONSTRAINT task_progress_pkey TO task_progress_legacy_pkey;
+            ALTER INDEX IF EXISTS ix_task_progress_task_id RENAME TO ix_task_progress_legacy_task_id;
+            ALTER TABLE task_progress_legacy ADD COLUMN IF NOT EXISTS started_at TIMESTAMP;
+            ALTER TABLE task_progress_legacy ADD COLUMN IF NOT EXISTS eta DOUBLE PRECISION;
+        END IF;
+    END $$
+    """,
+]
+
+LEGACY_COPY = f"""
+    DO $$ BEGIN
+        IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'task_progress_legacy') THEN
+            INSERT INTO task_progress (task_id, user_id, status, progress, result, error_message,
+                                       is_cancelled, started_at, eta, created_at, updated_at)
+            SELECT task_id, user_id, status, progress, result, error_message,
+                   is_cancelled, started_at, eta, created_at, updated_at
+            FROM task_progress_legacy
+            WHERE created_at >= now() - interval '{TASK_PROGRESS_RETENTION_DAYS} days';
+            DROP TABLE task_progress_legacy;
+        END IF;
+    END $$
+"""
+
+# create_all не додає колонки до вже існуючих таблиць
+MIGRATIONS = [
+    "ALTER TABLE tasks_history ADD COLUMN IF NOT EXISTS task_id VARCHAR",
+    "ALTER TABLE tasks_history ADD COLUMN IF NOT EXISTS solution BYTEA",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_tasks_history_task_id ON tasks_history (task_id)",
+    "ALTER TABLE tasks_history ADD COLUMN IF NOT EXISTS input_hash VARCHAR REFERENCES matrix_blobs (hash)",
+    "ALTER TABLE tasks_history ADD COLUMN IF NOT EXISTS n INTEGER",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_history_input_hash ON tasks_history (input_hash)",
+    "ALTER TABLE task_progress ADD COLUMN IF NOT EXISTS started_at TIMESTAMP",
+    "ALTER TABLE task_progress ADD COLUMN IF NOT EXISTS eta DOUBLE PRECISION",
+    "ALTER TABLE tasks_history ADD COLUMN IF NOT EXISTS status VARCHAR",
+    "ALTER TABLE tasks_history ADD COLUMN IF NOT EXISTS duration DOUBLE PRECISION",
+    "ALTER TABLE tasks_history ADD COLUMN IF NOT EXISTS residual DOUBLE PRECISION",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_history_user_created ON tasks_history (user_id, created_at DESC, id DESC)",
+    # Зведення для записів, збережених до появи колонок
+    "UPDATE tasks_history SET status = 'completed' WHERE status IS NULL",
+]
+
 async def run():
     async with engine.begin() as conn:
+        for statement in PRE_MIGRATIONS:
+            await conn.execute(text(statement))
         await conn.run_sync(Base.metadata.create_all)
+        for statement in MIGRATIONS:
+            await conn.execute(text(statement))
+
+    async with SessionLocal() as db:
+        await repository.ensure_task_progress_partitions(
+            db, datetime.utcnow().date(), TASK_PROGRESS_PARTITIONS_AHEAD + 1
+        )
+        await db.execute(text(LEGACY_COPY))
+        await db.commit()
     
     print("✅ All tables created successfully!")
     print("Tables:")
     print("  - users")
     print("  - tasks_history")
-    print("  - task_progress (NEW)")
+    print("  - matrix_blobs")
+    print("  - task_progress")
+    print("  - solve_jobs")
 
 if __name__ == "__main__":
     asyncio.run(run())
\ No newline at end of file
@@ -1,5 +1,5 @@
-from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime, Float, Boolean, func
+from sqlalchemy.orm import declarative_base, relationship, deferred
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime, Float, Boolean, LargeBinary, Index, func
 
 Base = declarative_base()
 
@@ -20,18 +20,51 @@ class TaskHistory(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
-    input_data = Column(JSON, nullable=False)
-    result = Column(JSON, nullable=False)
+    # Вміст задачі вантажиться лише для окремої задачі; список історії — зі зведених колонок
+    input_data = deferred(Column(JSON, nullable=False))
+    result = deferred(Column(JSON, nullable=False))
     created_at = Column(DateTime(timezone=False), server_default=func.now())
 
+    # Розв'язок зберігається один раз, як float64 little-endian; у списках історії не вантажиться
+    task_id = Column(String, unique=True, index=True, nullable=True)
+    solution = deferred(Column(LargeBinary, nullable=True))
+
+    # Сама система — в matrix_blobs за хешем вмісту; input_data містить лише зведення
+    input_hash = Column(String, ForeignKey("matrix_blobs.hash"), index=True, nullable=True)
+    n = Column(Integer, nullable=True)
+
+    # Зведення для списку історії: обчислюються при збереженні результату
+    status = Column(String, nullable=True)
+    duration = Column(Float, nullable=True)
+    residual = Column(Float, nullable=True)
+
     user = relationship("User", back_populates="tasks")
 
+    # Сторінки історії — за ключем (user_id, created_at, id), від новіших до старіших
+    __table_args__ = (
+        Index("ix_tasks_history_user_created", "user_id", created_at.desc(), id.desc()),
+    )
+
+
+class MatrixBlob(Base):
+    __tablename__ = "matrix_blobs"
+
+    hash = Column(String, primary_key=True)
+    n = Column(Integer, nullable=False)
+    codec = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    data = deferred(Column(LargeBinary, nullable=False))
+    created_at = Column(DateTime(timezone=False), server_default=func.now())
+
 
 class TaskProgress(Base):
 
     __tablename__ = "task_progress"
+    # Секції по днях за діапазонами task_id (UUIDv7, див. TaskIds) — створює й відкидає
+    # Maintenance; задачі зі старими uuid4 потрапляють у секцію DEFAULT
+    __table_args__ = {"postgresql_partition_by": "RANGE (task_id)"}
 
-    task_id = Column(String, primary_key=True, index=True)  
+    task_id = Column(String(collation="C"), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     status = Column(String, nullable=False, default="processing")  
@@ -41,6 +74,39 @@ class TaskProgress(Base):
     error_message = Column(String, nullable=True)
     
     is_cancelled = Column(Boolean, nullable=False, default=False) 
+
+    # Початок обчислення (не постановки в чергу) та остання оцінка решти часу, с
+    started_at = Column(DateTime(timezone=False), nullable=True)
+    eta = Column(Float, nullable=True)
     
     created_at = Column(DateTime(timezone=False), server_default=func.now())
-    updated_at = Column(DateTime(timezone=False), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=False), server_default=func.now(), onupdate=func.now())
+
+class SolveJob(Base):
+
+    # Стійка черга розв'язувань (SOLVER_BACKEND=queue): рядок живе від постановки до
+    # збереження результату. Вхідна система — у matrix_blobs; воркери (JobWorker) беруть
+    # задачі через SELECT ... FOR UPDATE SKIP LOCKED і тримають оренду до lease_expires_at.
+    # Усі мітки часу — now() сервера БД, спільний годинник для всіх воркерів
+    __tablename__ = "solve_jobs"
+
+    task_id = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    input_hash = Column(String, ForeignKey("matrix_blobs.hash"), nullable=False)
+    # Повідомлення задачі для воркера: kind, engine, options
+    payload = Column(JSON, nullable=False)
+
+    status = Column(String, nullable=False, default="queued")  # queued | running
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime(timezone=False), nullable=False, server_default=func.now())
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=False), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=False), nullable=True)
+    last_error = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=False), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_solve_jobs_claim", "status", "available_at"),
+        Index("ix_solve_jobs_user_status", "user_id", "status"),
+    )
@@ -1,15 +1,26 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, func, case, cast, text, tuple_, and_, or_, Float, LargeBinary
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import undefer, aliased
 from backend.db import models
 from backend.db.schemas import TaskCreate, UserCreate
-from datetime import datetime
-from backend.auth.auth_utils import hash_password
+from backend.core.task_ids import TaskIds
+from datetime import date, datetime, timedelta
+import json
 
-async def create_user(db: AsyncSession, data: UserCreate):
+CANCEL_CHANNEL = "task_cancel"
+PROGRESS_CHANNEL = "task_progress"
+JOB_CHANNEL = "solve_jobs"
+PARTITION_PREFIX = "task_progress_p"
+DEFAULT_PARTITION = "task_progress_default"
+MAINTENANCE_LOCK = 0x7461736B
+JOB_QUEUE_LOCK = 0x6A6F6273
+
+async def create_user(db: AsyncSession, data: UserCreate, password_hash: str):
     new_user = models.User(
         name=data.name,
         email=data.email,
-        password=hash_password(data.password),
+        password=password_hash,
     )
     db.add(new_user)
     await db.commit()
@@ -42,24 +53,59 @@ async def add_task(db: AsyncSession, data: TaskCreate):
     await db.refresh(new_task)
     return new_task
 
-async def get_tasks_for_user(db: AsyncSession, user_id: int):
-    result = await db.execute(
-        select(models.TaskHistory).where(models.TaskHistory.user_id == user_id)
+async def get_tasks_for_user(db: AsyncSession, user_id: int, limit: int = 50, before: tuple = None):
+
+    # Сторінка від новіших до старіших за індексом (user_id, created_at, id);
+    # before = (created_at, id) останнього запису попередньої сторінки.
+    # input_data, result і solution відкладені — читаються лише зведені колонки
+    query = (
+        select(models.TaskHistory)
+        .where(models.TaskHistory.user_id == user_id)
+        .order_by(models.TaskHistory.created_at.desc(), models.TaskHistory.id.desc())
+        .limit(limit)
     )
+    if before is not None:
+        query = query.where(
+            tuple_(models.TaskHistory.created_at, models.TaskHistory.id) < tuple_(*before)
+        )
+
+    result = await db.execute(query)
     return result.scalars().all()
 
+async def get_history_entry(db: AsyncSession, history_id: int):
+    result = await db.execute(
+        select(models.TaskHistory)
+        .where(models.TaskHistory.id == history_id)
+        .options(undefer(models.TaskHistory.input_data), undefer(models.TaskHistory.result))
+    )
+    return result.scalar_one_or_none()
+
 
 
-async def create_task_progress(db: AsyncSession, task_id: str, user_id: int):
+async def notify_task_progress(db: AsyncSession, task_id: str, **fields):
 
+    # Доставляється слухачам (SSE-стрімам усіх реплік) у момент commit
+    payload = json.dumps({"task_id": task_id, **fields})
+    await db.execute(
+        select(func.pg_notify(PROGRESS_CHANNEL, payload))
+    )
+
+async def create_task_progress(db: AsyncSession, task_id: str, user_id: int, status: str = "processing"):
+
+    now = datetime.utcnow()
     task_progress = models.TaskProgress(
         task_id=task_id,
         user_id=user_id,
-        status="processing",
+        status=status,
         progress=0.0,
-        is_cancelled=False
+        is_cancelled=False,
+        started_at=now if status == "processing" else None,
+        # UTC, як і решта міток часу задачі: за ними працює Maintenance
+        created_at=now,
+        updated_at=now
     )
     db.add(task_progress)
+    await notify_task_progress(db, task_id, status=status, progress=0.0)
     await db.commit()
     await db.refresh(task_progress)
     return task_progress
@@ -70,6 +116,21 @@ async def get_task_progress(db: AsyncSession, task_id: str):
     )
     return result.scalar_one_or_none()
 
+async def start_task_progress(db: AsyncSession, task_id: str, user_id: int):
+
+    task = await get_task_progress(db, task_id)
+    if task is None:
+        return await create_task_progress(db, task_id, user_id)
+
+    if not task.is_cancelled:
+        await db.execute(
+            update(models.TaskProgress)
+            .where(models.TaskProgress.task_id == task_id)
+            .values(started_at=datetime.utcnow())
+        )
+        await update_task_progress_status(db, task_id, status="processing")
+    return task
+
 async def update_task_progress_value(db: AsyncSession, task_id: str, progress: float):
 
     await db.execute(
@@ -77,6 +138,46 @@ async def update_task_progress_value(db: AsyncSession, task_id: str, progress: f
         .where(models.TaskProgress.task_id == task_id)
         .values(progress=progress, updated_at=datetime.utcnow())
     )
+    await notify_task_progress(db, task_id, progress=progress)
+    await db.commit()
+
+async def update_task_progress_values(db: AsyncSession, values: dict):
+
+    # Пакетний запис прогресу (ProgressWriter): values — task_id -> (прогрес, ETA),
+    # один UPDATE з CASE на всі задачі (CASE лише з NULL Postgres вважає text — звідси CAST). Завершені задачі не чіпаємо —
+    # запізнілий прогрес не має перезаписати фінальний стан
+    task_ids = list(values)
+    progress = {task_id: value for task_id, (value, _) in values.items()}
+    etas = {task_id: eta for task_id, (_, eta) in values.items()}
+    await db.execute(
+        update(models.TaskProgress)
+        .where(models.TaskProgress.task_id.in_(task_ids))
+        .where(models.TaskProgress.status.in_(("queued", "processing")))
+        .values(
+            progress=case(progress, value=models.TaskProgress.task_id),
+            eta=cast(case(etas, value=models.TaskProgress.task_id), Float),
+            updated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    payloads = [
+        json.dumps({"task_id": task_id, "progress": value, "eta": eta})
+        for task_id, (value, eta) in values.items()
+    ]
+    await db.execute(
+        text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+        {"channel": PROGRESS_CHANNEL, "payloads": payloads}
+    )
+    await db.commit()
+
+async def notify_queue_positions(db: AsyncSession, positions: dict):
+
+    # Позиції задач у черзі SolveScheduler — лише сповіщення, у БД вони не зберігаються
+    payloads = [json.dumps({"task_id": task_id, "queue_position": position}) for task_id, position in positions.items()]
+    await db.execute(
+        text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+        {"channel": PROGRESS_CHANNEL, "payloads": payloads}
+    )
     await db.commit()
 
 async def update_task_progress_status(
@@ -105,8 +206,124 @@ async def update_task_progress_status(
         .where(models.TaskProgress.task_id == task_id)
         .values(**values)
     )
+    await notify_task_progress(db, task_id, status=status, progress=progress)
     await db.commit()
 
+async def has_matrix_blob(db: AsyncSession, input_hash: str) -> bool:
+    result = await db.execute(
+        select(models.MatrixBlob.hash).where(models.MatrixBlob.hash == input_hash)
+    )
+    return result.scalar_one_or_none() is not None
+
+async def get_matrix_blob(db: AsyncSession, input_hash: str):
+    result = await db.execute(
+        select(models.MatrixBlob)
+        .options(undefer(models.MatrixBlob.data))
+        .where(models.MatrixBlob.hash == input_hash)
+    )
+    return result.scalar_one_or_none()
+
+async def find_solution_by_hash(db: AsyncSession, input_hash: str, exclude_methods: tuple = ()):
+
+    # Останній збережений розв'язок тієї самої системи (див. SolutionCache); розв'язки
+    # методів з exclude_methods (result.solver.method, ітераційні — точні лише до свого tol) пропускаються
+    method = models.TaskHistory.result["solver"]["method"].as_string()
+    result = await db.execute(
+        select(models.TaskHistory.solution)
+        .where(models.TaskHistory.input_hash == input_hash)
+        .where(models.TaskHistory.solution.is_not(None))
+        .where(or_(method.is_(None), method.not_in(exclude_methods)))
+        .order_by(models.TaskHistory.id.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+async def get_task_history(db: AsyncSession, task_id: str):
+    result = await db.execute(
+        select(models.TaskHistory)
+        .where(models.TaskHistory.task_id == task_id)
+        .options(undefer(models.TaskHistory.input_data))
+    )
+    return result.scalar_one_or_none()
+
+async def complete_task(
+    db: AsyncSession,
+    task_id: str,
+    result: dict,
+    history: TaskCreate,
+    input_blob: dict = None
+):
+
+    if input_blob is not None:
+        # Та сама система могла бути збережена паралельно іншою задачею
+        await db.execute(
+            pg_insert(models.MatrixBlob)
+            .values(**input_blob)
+            .on_conflict_do_nothing(index_elements=["hash"])
+        )
+
+    now = datetime.utcnow()
+    started_at = (await db.execute(
+        update(models.TaskProgress)
+        .where(models.TaskProgress.task_id == task_id)
+        .values(
+            status="completed",
+            progress=100.0,
+            result=result,
+            updated_at=now
+        )
+        .returning(models.TaskProgress.started_at)
+    )).scalar_one_or_none()
+
+    # Від початку обчислення (не постановки в чергу), як elapsed у статусі задачі
+    duration = history.duration
+    if duration is None and started_at is not None:
+        duration = max(0.0, (now - started_at).total_seconds())
+
+    db.add(models.TaskHistory(
+        user_id=history.user_id,
+        input_data=history.input_data,
+        result=history.result,
+        task_id=history.task_id,
+        solution=history.solution,
+        input_hash=history.input_hash,
+        n=history.n,
+        status=history.status,
+        duration=duration,
+        residual=history.residual,
+        created_at=now,
+    ))
+    await notify_task_progress(db, task_id, status="completed", progress=100.0)
+    await db.commit()
+
+async def get_solution_slice(
+    db: AsyncSession,
+    task_id: str,
+    offset: int = 0,
+    limit: int = None,
+    item_size: int = 8
+):
+
+    # Зріз вирізається в самій БД: з таблиці читаються лише потрібні байти
+    column = models.TaskHistory.solution
+    start = offset * item_size + 1
+    if limit is None:
+        piece = func.substring(column, start, type_=LargeBinary)
+    else:
+        piece = func.substring(column, start, limit * item_size, type_=LargeBinary)
+
+    result = await db.execute(
+        select(func.octet_length(column), piece)
+        .where(models.TaskHistory.task_id == task_id)
+        .where(column.is_not(None))
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    size, data = row
+    return size // item_size, data
+
 async def cancel_task_progress(db: AsyncSession, task_id: str):
 
     await db.execute(
@@ -119,6 +336,11 @@ async def cancel_task_progress(db: AsyncSession, task_id: str):
             updated_at=datetime.utcnow()
         )
     )
+    # Сповіщення доставляється слухачам усіх реплік у момент commit
+    await db.execute(
+        select(func.pg_notify(CANCEL_CHANNEL, task_id))
+    )
+    await notify_task_progress(db, task_id, status="cancelled", progress=0.0)
     await db.commit()
 
 async def is_task_cancelled(db: AsyncSession, task_id: str) -> bool:
@@ -130,13 +352,374 @@ async def is_task_cancelled(db: AsyncSession, task_id: str) -> bool:
     cancelled = result.scalar_one_or_none()
     return cancelled if cancelled is not None else False
 
-async def delete_old_task_progress(db: AsyncSession, days: int = 7):
+async def _try_maintenance_lock(db: AsyncSession) -> bool:
+    # До кінця транзакції; обслуговування в кожен момент робить лише одна репліка
+    result = await db.execute(select(func.pg_try_advisory_xact_lock(MAINTENANCE_LOCK)))
+    return bool(result.scalar())
+
+async def get_task_progress_partitions(db: AsyncSession) -> list:
+    result = await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'task_progress'::regclass ORDER BY c.relname"
+    ))
+    return list(result.scalars().all())
+
+async def ensure_task_progress_partitions(db: AsyncSession, first_day: date, days: int) -> list:
+
+    # Секції task_progress_pYYYYMMDD на days днів уперед; повертає імена створених
+    if not await _try_maintenance_lock(db):
+        return []
+
+    await db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF task_progress DEFAULT"
+    ))
+    existing = set(await get_task_progress_partitions(db))
+
+    created = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        name = f"{PARTITION_PREFIX}{day:%Y%m%d}"
+        if name in existing:
+            continue
+        start = TaskIds.bound(datetime.combine(day, datetime.min.time()))
+        end = TaskIds.bound(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+        # Якщо секція не встигла з'явитись, задачі цього дня вже лежать у DEFAULT, і
+        # CREATE ... PARTITION OF завершився б помилкою: переносимо їх у нову таблицю, потім ATTACH.
+        # Межі — hex-рядки з TaskIds.bound, тож їх можна підставити в DDL напряму
+        await db.execute(text(f"CREATE TABLE {name} (LIKE task_progress INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        await db.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE task_id >= :start AND task_id < :end RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ),
+            {"start": start, "end": end}
+        )
+        await db.execute(text(
+            f"ALTER TABLE task_progress ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        created.append(name)
+
+    await db.commit()
+    return created
+
+async def drop_task_progress_partitions(db: AsyncSession, before: date) -> list:
+
+    # Відкидає секції днів до before — без DELETE і роздування таблиці; з секції DEFAULT
+    # (старі uuid4) видаляються рядки, старші за before. Повертає імена відкинутих секцій
+    if not await _try_maintenance_lock(db):
+        return []
+
+    dropped = []
+    for name in await get_task_progress_partitions(db):
+        suffix = name[len(PARTITION_PREFIX):]
+        if not suffix.isdigit() or datetime.strptime(suffix, "%Y%m%d").date() >= before:
+            continue
+        await db.execute(text(f"ALTER TABLE task_progress DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
 
-    from datetime import timedelta
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
-    
     await db.execute(
-        delete(models.TaskProgress)
-        .where(models.TaskProgress.created_at < cutoff_date)
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+        {"cutoff": datetime.combine(before, datetime.min.time())}
     )
-    await db.commit()
\ No newline at end of file
+    await db.commit()
+    return dropped
+
+async def reap_stale_tasks(
+    db: AsyncSession,
+    processing_before: datetime,
+    queued_before: datetime,
+    error_message: str
+) -> list:
+
+    # Задачі, що «зависли» після падіння воркера чи репліки: обчислення почалося раніше
+    # processing_before або задача стоїть у черзі з queued_before. Повертає їхні task_id.
+    # Задача не повинна ожити після позначення: її рядок solve_jobs у черзі видаляється тією
+    # ж транзакцією, а задачі з орендою (running) лишаються recover_expired_solve_jobs.
+    # Записи SolveScheduler живуть лише в пам'яті репліки, тож позначка is_cancelled і
+    # NOTIFY на CANCEL_CHANNEL прибирають їх (SolverPool.cancel_waiting) і зупиняють розв'язувач
+    stale = or_(
+        and_(
+            models.TaskProgress.status == "processing",
+            func.coalesce(models.TaskProgress.started_at, models.TaskProgress.updated_at) < processing_before
+        ),
+        and_(
+            models.TaskProgress.status == "queued",
+            models.TaskProgress.updated_at < queued_before
+        )
+    )
+
+    await db.execute(
+        delete(models.SolveJob)
+        .where(
+            models.SolveJob.status == "queued",
+            models.SolveJob.task_id.in_(select(models.TaskProgress.task_id).where(stale))
+        )
+    )
+    result = await db.execute(
+        update(models.TaskProgress)
+        .where(stale)
+        .where(~select(models.SolveJob.task_id).where(models.SolveJob.task_id == models.TaskProgress.task_id).exists())
+        .values(
+            status="error",
+            is_cancelled=True,
+            progress=0.0,
+            eta=None,
+            error_message=error_message,
+            updated_at=datetime.utcnow()
+        )
+        .returning(models.TaskProgress.task_id)
+        .execution_options(synchronize_session=False)
+    )
+    task_ids = list(result.scalars().all())
+
+    if task_ids:
+        payloads = [json.dumps({"task_id": task_id, "status": "error", "progress": 0.0}) for task_id in task_ids]
+        await db.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": PROGRESS_CHANNEL, "payloads": payloads}
+        )
+        await db.execute(
+            text("SELECT pg_notify(:channel, task_id) FROM unnest(CAST(:task_ids AS text[])) AS task_id"),
+            {"channel": CANCEL_CHANNEL, "task_ids": task_ids}
+        )
+    await db.commit()
+    return task_ids
+
+async def enqueue_solve_job(
+    db: AsyncSession,
+    task_id: str,
+    user_id: int,
+    input_hash: str,
+    payload: dict,
+    input_blob: dict = None,
+    user_limit: int = None,
+    capacity: int = None
+):
+
+    # Повертає None або причину відмови: "user" — забагато активних задач користувача,
+    # "full" — черга заповнена. Система й задача пишуться однією транзакцією.
+    # Перевірка й вставка — під advisory lock до кінця транзакції: ключ користувача для його
+    # ліміту і спільний (0) для місткості, завжди в цьому порядку, тож паралельні запити
+    # (з будь-якої репліки) не проходять перевірку одночасно і не перевищують ліміти
+    if user_limit is not None:
+        await db.execute(select(func.pg_advisory_xact_lock(JOB_QUEUE_LOCK, user_id)))
+    if capacity is not None:
+        await db.execute(select(func.pg_advisory_xact_lock(JOB_QUEUE_LOCK, 0)))
+
+    if user_limit is not None:
+        active = await db.execute(
+            select(func.count()).select_from(models.SolveJob).where(models.SolveJob.user_id == user_id)
+        )
+        if active.scalar() >= user_limit:
+            return "user"
+    if capacity is not None:
+        queued = await db.execute(
+            select(func.count()).select_from(models.SolveJob).where(models.SolveJob.status == "queued")
+        )
+        if queued.scalar() >= capacity:
+            return "full"
+
+    if input_blob is not None:
+        await db.execute(
+            pg_insert(models.MatrixBlob)
+            .values(**input_blob)
+            .on_conflict_do_nothing(index_elements=["hash"])
+        )
+    db.add(models.SolveJob(task_id=task_id, user_id=user_id, input_hash=input_hash, payload=payload))
+    # Будить воркерів, що чекають на LISTEN, у момент commit
+    await db.execute(select(func.pg_notify(JOB_CHANNEL, task_id)))
+    await db.commit()
+    return None
+
+async def claim_solve_job(db: AsyncSession, worker_id: str, lease_seconds: float):
+
+    # Найстаріша доступна задача користувача з найменшою кількістю задач, що вже
+    # рахуються; SKIP LOCKED — воркери не чекають один на одного і не беруть ту саму
+    running = aliased(models.SolveJob)
+    busy = (
+        select(func.count())
+        .select_from(running)
+        .where(running.user_id == models.SolveJob.user_id, running.status == "running")
+        .correlate(models.SolveJob)
+        .scalar_subquery()
+    )
+    candidate = (
+        select(models.SolveJob.task_id)
+        .where(models.SolveJob.status == "queued", models.SolveJob.available_at <= func.now())
+        .order_by(busy, models.SolveJob.available_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(models.SolveJob)
+        .where(models.SolveJob.task_id == candidate)
+        .values(
+            status="running",
+            attempts=models.SolveJob.attempts + 1,
+            lease_owner=worker_id,
+            lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+            heartbeat_at=func.now()
+        )
+        .returning(
+            models.SolveJob.task_id,
+            models.SolveJob.user_id,
+            models.SolveJob.input_hash,
+            models.SolveJob.payload,
+            models.SolveJob.attempts
+        )
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    await db.commit()
+    return dict(row._mapping) if row is not None else None
+
+async def heartbeat_solve_job(db: AsyncSession, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+
+    # False — оренду вже втрачено (прострочена й забрана іншим воркером)
+    result = await db.execute(
+        update(models.SolveJob)
+        .where(
+            models.SolveJob.task_id == task_id,
+            models.SolveJob.lease_owner == worker_id,
+            models.SolveJob.status == "running"
+        )
+        .values(lease_expires_at=func.now() + timedelta(seconds=lease_seconds), heartbeat_at=func.now())
+        .returning(models.SolveJob.task_id)
+        .execution_options(synchronize_session=False)
+    )
+    owned = result.scalar_one_or_none() is not None
+    await db.commit()
+    return owned
+
+async def finish_solve_job(db: AsyncSession, task_id: str, worker_id: str):
+    await db.execute(
+        delete(models.SolveJob)
+        .where(models.SolveJob.task_id == task_id, models.SolveJob.lease_owner == worker_id)
+    )
+    await db.commit()
+
+async def retry_solve_job(
+    db: AsyncSession,
+    task_id: str,
+    worker_id: str,
+    error: str,
+    delay: float,
+    max_attempts: int,
+    error_message: str
+) -> bool:
+
+    # Збій поза розв'язувачем (БД, декодування, падіння процесу): повтор через delay
+    # секунд, поки не вичерпано max_attempts, далі задача — помилка. True — буде повтор
+    result = await db.execute(
+        update(models.SolveJob)
+        .where(
+            models.SolveJob.task_id == task_id,
+            models.SolveJob.lease_owner == worker_id,
+            models.SolveJob.attempts < max_attempts
+        )
+        .values(
+            status="queued",
+            lease_owner=None,
+            lease_expires_at=None,
+            available_at=func.now() + timedelta(seconds=delay),
+            last_error=error
+        )
+        .returning(models.SolveJob.task_id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.scalar_one_or_none() is not None:
+        await db.commit()
+        return True
+
+    deleted = await db.execute(
+        delete(models.SolveJob)
+        .where(models.SolveJob.task_id == task_id, models.SolveJob.lease_owner == worker_id)
+        .returning(models.SolveJob.task_id)
+    )
+    if deleted.scalar_one_or_none() is not None:
+        await update_task_progress_status(db, task_id, status="error", progress=0.0, error_message=f"{error_message}: {error}")
+    else:
+        await db.commit()
+    return False
+
+async def recover_expired_solve_jobs(db: AsyncSession, max_attempts: int, error_message: str) -> tuple:
+
+    # Оренда прострочена — воркер упав або завис без heartbeat: задача знову в черзі,
+    # або, якщо спроби вичерпано, — помилка. Повертає (повторені, невдалі) task_id
+    requeued = await db.execute(
+        update(models.SolveJob)
+        .where(
+            models.SolveJob.status == "running",
+            models.SolveJob.lease_expires_at < func.now(),
+            models.SolveJob.attempts < max_attempts
+        )
+        .values(
+            status="queued",
+            lease_owner=None,
+            lease_expires_at=None,
+            available_at=func.now(),
+            last_error="lease expired"
+        )
+        .returning(models.SolveJob.task_id)
+        .execution_options(synchronize_session=False)
+    )
+    requeued = list(requeued.scalars().all())
+
+    failed = await db.execute(
+        delete(models.SolveJob)
+        .where(
+            models.SolveJob.status == "running",
+            models.SolveJob.lease_expires_at < func.now(),
+            models.SolveJob.attempts >= max_attempts
+        )
+        .returning(models.SolveJob.task_id)
+    )
+    failed = list(failed.scalars().all())
+
+    if failed:
+        await db.execute(
+            update(models.TaskProgress)
+            .where(models.TaskProgress.task_id.in_(failed))
+            .where(models.TaskProgress.status.in_(("queued", "processing")))
+            .values(status="error", progress=0.0, eta=None, error_message=error_message, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        payloads = [json.dumps({"task_id": task_id, "status": "error", "progress": 0.0}) for task_id in failed]
+        await db.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": PROGRESS_CHANNEL, "payloads": payloads}
+        )
+    if requeued:
+        await db.execute(select(func.pg_notify(JOB_CHANNEL, requeued[0])))
+    await db.commit()
+    return requeued, failed
+
+async def cancel_queued_solve_job(db: AsyncSession, task_id: str) -> bool:
+    result = await db.execute(
+        delete(models.SolveJob)
+        .where(models.SolveJob.task_id == task_id, models.SolveJob.status == "queued")
+        .returning(models.SolveJob.task_id)
+    )
+    cancelled = result.scalar_one_or_none() is not None
+    await db.commit()
+    return cancelled
+
+async def release_solve_job(db: AsyncSession, task_id: str, worker_id: str):
+
+    # Планова зупинка воркера: задача одразу повертається в чергу, спроба не зараховується
+    await db.execute(
+        update(models.SolveJob)
+        .where(models.SolveJob.task_id == task_id, models.SolveJob.lease_owner == worker_id)
+        .values(
+            status="queued",
+            attempts=models.SolveJob.attempts - 1,
+            lease_owner=None,
+            lease_expires_at=None,
+            available_at=func.now()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(select(func.pg_notify(JOB_CHANNEL, task_id)))
+    await db.commit()
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Literal, Optional, Union
 
 class UserBase(BaseModel):
     name: str
@@ -21,11 +21,56 @@ class TaskBase(BaseModel):
     result: Dict[str, Any]
 
 class TaskCreate(TaskBase):
-    pass
+    task_id: Optional[str] = None
+    solution: Optional[bytes] = None
+    input_hash: Optional[str] = None
+    n: Optional[int] = None
+    status: Optional[str] = None
+    duration: Optional[float] = None
+    residual: Optional[float] = None
 
-class TaskOut(TaskBase):
+class TaskSummary(BaseModel):
     id: int
+    task_id: Optional[str] = None
+    n: Optional[int] = None
+    status: Optional[str] = None
+    duration: Optional[float] = None
+    residual: Optional[float] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+class TaskPage(BaseModel):
+    items: List[TaskSummary]
+    # Передається як cursor для наступної сторінки; None — це остання
+    next_cursor: Optional[str] = None
+
+class TaskOut(TaskBase, TaskSummary):
+    pass
+
+
+class GaussInput(BaseModel):
+    matrix: List[List[float]]
+    rhs: List[float]
+    engine: str | None = None
+
+class UploadCreate(BaseModel):
+    n: int
+
+class FactorizeInput(BaseModel):
+    matrix: List[List[float]]
+
+class RhsInput(BaseModel):
+    rhs: Union[List[float], List[List[float]]]
+
+class SparseInput(BaseModel):
+    # CSR: indptr (n+1), indices, data; COO: rows, cols, data
+    format: Literal["csr", "coo"] = "csr"
+    n: int
+    data: List[float]
+    indptr: Optional[List[int]] = None
+    indices: Optional[List[int]] = None
+    rows: Optional[List[int]] = None
+    cols: Optional[List[int]] = None
+    rhs: List[float]
@@ -3,6 +3,7 @@ const API_BASE = "http://localhost/api";
 let accessToken = localStorage.getItem("access_token") || null;
 let currentTaskId = null;
 let pollingInterval = null;
+let progressStream = null;
 
 const MAX_MATRIX_SIZE = 5000;
 
@@ -39,20 +40,26 @@ function updateUserInfo() {
     }
 }
 
-async function apiRequest(method, path, body = null, auth = false) {
-    const headers = { "Content-Type": "application/json" };
+async function apiRequest(method, path, body = null, auth = false, extraHeaders = {}) {
+    // Бінарні тіла (ArrayBuffer / типізовані масиви) надсилаються як є
+    const isBinary = body instanceof ArrayBuffer || ArrayBuffer.isView(body);
+    const headers = {
+        "Content-Type": isBinary ? "application/octet-stream" : "application/json",
+        ...extraHeaders
+    };
     if (auth && accessToken) {
         headers["Authorization"] = "Bearer " + accessToken;
     }
 
     let res;
     try {
-        console.log(`[API Request] ${method} ${path}`, body ? `Body size: ${JSON.stringify(body).length} bytes` : '');
+        const payload = body ? (isBinary ? body : JSON.stringify(body)) : null;
+        console.log(`[API Request] ${method} ${path}`, payload ? `Body size: ${payload.byteLength ?? payload.length} bytes` : '');
         
         res = await fetch(API_BASE + path, {
             method,
             headers,
-            body: body ? JSON.stringify(body) : null
+            body: payload
         });
     } catch (networkErr) {
         console.error('[API Request] Network error:', networkErr);
@@ -249,18 +256,37 @@ function collectMatrixAndVector() {
     return { matrix, rhs };
 }
 
+function packSystem(matrix, rhs) {
+    const n = matrix.length;
+    const buffer = new Float64Array(n * n + n);
+    for (let i = 0; i < n; i++) {
+        buffer.set(matrix[i], i * n);
+    }
+    buffer.set(rhs, n * n);
+    return buffer;
+}
+
 function resetProgress() {
     document.getElementById("progress-fill").style.width = "0%";
     document.getElementById("progress-text").textContent = "0%";
 }
 
-function updateProgress(progress) {
+function formatSeconds(seconds) {
+    if (seconds < 60) return `${Math.ceil(seconds)} с`;
+    const minutes = Math.floor(seconds / 60);
+    return `${minutes} хв ${Math.ceil(seconds - minutes * 60)} с`;
+}
+
+function updateProgress(progress, eta = null) {
     const fillEl = document.getElementById("progress-fill");
     const textEl = document.getElementById("progress-text");
     
     const percent = Math.min(100, Math.max(0, progress));
     fillEl.style.width = percent + "%";
     textEl.textContent = Math.floor(percent) + "%";
+    if (eta !== null && eta !== undefined && percent < 100) {
+        textEl.textContent += ` (залишилось ~${formatSeconds(eta)})`;
+    }
 }
 
 function stopPolling() {
@@ -268,85 +294,153 @@ function stopPolling() {
         clearInterval(pollingInterval);
         pollingInterval = null;
     }
+    if (progressStream) {
+        progressStream.close();
+        progressStream = null;
+    }
 }
 
-async function startPolling(taskId) {
-    stopPolling();
-    
+// Обробляє черговий статус задачі; повертає true, коли задача завершилась
+async function handleTaskStatus(taskId, status) {
+    const resultEl = document.getElementById("solve-result");
+    const cancelBtn = document.getElementById("cancel-btn");
+
+    if (status.status === "processing" || status.status === "queued") {
+        
+        updateProgress(status.progress || 0, status.eta);
+        if (status.status === "queued" && status.queue_position) {
+            resultEl.textContent = `Завдання в черзі: позиція ${status.queue_position}`;
+        } else if (status.status === "processing") {
+            resultEl.textContent = "Завдання прийнято та перебуває в обробці...";
+        }
+        return false;
+        
+    } else if (status.status === "completed") {
+        
+        stopPolling();
+        updateProgress(100);
+        
+        // Показуємо лише початок розв'язку — решту сервер не серіалізує
+        const result = await apiRequest("GET", `/tasks/result/${taskId}?limit=20`, null, false);
+        
+        if (result.solution) {
+            const n = result.n ?? result.solution.length;
+            let text = `Розв'язок (${n} змінних)${result.cached ? ", з кешу" : ""}:\n`;
+            if (result.solver) {
+                const info = [`ітерацій: ${result.solver.iterations}`];
+                if (result.solver.residual !== undefined) {
+                    info.push(`відносний залишок: ${result.solver.residual.toExponential(2)}`);
+                }
+                if (result.solver.backward_error !== undefined) {
+                    info.push(`точність: ${result.solver.precision}, зворотна похибка: ${result.solver.backward_error.toExponential(2)}`);
+                }
+                text += info.join(", ") + "\n";
+            }
+
+            const showCount = Math.min(20, result.solution.length);
+            for (let i = 0; i < showCount; i++) {
+                text += `x${i + 1} = ${result.solution[i]}\n`;
+            }
+            if (n > 20) {
+                text += `\n... та ще ${n - 20} значень\n`;
+                text += `\nПовний розв'язок збережено в історії завдань.`;
+            }
+            resultEl.textContent = text;
+        } else {
+            resultEl.textContent = "Результат отримано, але розв'язок відсутній";
+        }
+        
+        cancelBtn.classList.add("hidden");
+        currentTaskId = null;
+        
+    } else if (status.status === "cancelled") {
+
+        stopPolling();
+        resetProgress();
+        resultEl.textContent = "Завдання скасовано";
+        cancelBtn.classList.add("hidden");
+        currentTaskId = null;
+        
+    } else if (status.status === "error") {
+
+        stopPolling();
+        resetProgress();
+        
+        const result = await apiRequest("GET", `/tasks/result/${taskId}`, null, false);
+        resultEl.textContent = "Помилка: " + (result?.error || "невідома помилка");
+        
+        cancelBtn.classList.add("hidden");
+        currentTaskId = null;
+        
+    } else if (status.status === "not_found") {
+
+        stopPolling();
+        resetProgress();
+        resultEl.textContent = "Задача не знайдена";
+        cancelBtn.classList.add("hidden");
+        currentTaskId = null;
+
+    } else {
+
+        return false;
+    }
+
+    return true;
+}
+
+function handleStatusError(err) {
     const resultEl = document.getElementById("solve-result");
     const cancelBtn = document.getElementById("cancel-btn");
+
+    console.error("Status error:", err);
+    stopPolling();
+    resultEl.textContent = "Помилка перевірки статусу: " + (err?.detail || "невідома");
+    cancelBtn.classList.add("hidden");
+}
+
+async function startPolling(taskId) {
+    stopPolling();
     
     pollingInterval = setInterval(async () => {
         try {
-            
             const status = await apiRequest("GET", `/tasks/status/${taskId}`, null, false);
-            
-            if (status.status === "processing") {
-                
-                updateProgress(status.progress || 0);
-                
-            } else if (status.status === "completed") {
-                
-                stopPolling();
-                updateProgress(100);
-                
-                const result = await apiRequest("GET", `/tasks/result/${taskId}`, null, false);
-                
-                if (result.solution) {
-                    const n = result.solution.length;
-                    let text = `Розв'язок (${n} змінних):\n`;
+            await handleTaskStatus(taskId, status);
+        } catch (err) {
+            handleStatusError(err);
+        }
+    }, 500); 
+}
 
-                    const showCount = Math.min(20, n);
-                    for (let i = 0; i < showCount; i++) {
-                        text += `x${i + 1} = ${result.solution[i]}\n`;
-                    }
-                    if (n > 20) {
-                        text += `\n... та ще ${n - 20} значень\n`;
-                        text += `\nПовний розв'язок збережено в історії завдань.`;
-                    }
-                    resultEl.textContent = text;
-                } else {
-                    resultEl.textContent = "Результат отримано, але розв'язок відсутній";
-                }
-                
-                cancelBtn.classList.add("hidden");
-                currentTaskId = null;
-                
-            } else if (status.status === "cancelled") {
+// Сервер сам надсилає прогрес через SSE; якщо стрім недоступний — повертаємось до опитування
+function startProgressStream(taskId) {
+    stopPolling();
 
-                stopPolling();
-                resetProgress();
-                resultEl.textContent = "Завдання скасовано";
-                cancelBtn.classList.add("hidden");
-                currentTaskId = null;
-                
-            } else if (status.status === "error") {
+    if (!window.EventSource) {
+        startPolling(taskId);
+        return;
+    }
 
-                stopPolling();
-                resetProgress();
-                
-                const result = await apiRequest("GET", `/tasks/result/${taskId}`, null, false);
-                resultEl.textContent = "Помилка: " + (result?.error || "невідома помилка");
-                
-                cancelBtn.classList.add("hidden");
-                currentTaskId = null;
-                
-            } else if (status.status === "not_found") {
+    const stream = new EventSource(API_BASE + `/tasks/stream/${taskId}`);
+    let received = false;
+    progressStream = stream;
 
-                stopPolling();
-                resetProgress();
-                resultEl.textContent = "Задача не знайдена";
-                cancelBtn.classList.add("hidden");
-                currentTaskId = null;
-            }
-            
+    stream.onmessage = async (event) => {
+        received = true;
+        try {
+            const finished = await handleTaskStatus(taskId, JSON.parse(event.data));
+            if (finished) stream.close();
         } catch (err) {
-            console.error("Polling error:", err);
-            stopPolling();
-            resultEl.textContent = "Помилка перевірки статусу: " + (err?.detail || "невідома");
-            cancelBtn.classList.add("hidden");
+            handleStatusError(err);
         }
-    }, 500); 
+    };
+
+    stream.onerror = () => {
+        if (progressStream !== stream) return;
+        stream.close();
+        progressStream = null;
+        console.warn(`[Stream] Connection lost (received: ${received}), falling back to polling`);
+        startPolling(taskId);
+    };
 }
 
 async function cancelCurrentTask() {
@@ -361,30 +455,46 @@ async function cancelCurrentTask() {
     }
 }
 
-async function loadHistory() {
+// Історія вантажиться сторінками: сервер повертає лише зведення й курсор наступної сторінки
+const HISTORY_PAGE_SIZE = 50;
+let historyCursor = null;
+let historyCount = 0;
+
+async function loadHistory(append = false) {
     const table = document.getElementById("history-table");
     const body = document.getElementById("history-body");
     const empty = document.getElementById("history-empty");
+    const more = document.getElementById("history-more-btn");
 
-    body.innerHTML = "";
+    if (!append) {
+        body.innerHTML = "";
+        historyCursor = null;
+        historyCount = 0;
+    }
     empty.classList.add("hidden");
     table.classList.remove("hidden");
+    more.classList.add("hidden");
 
     try {
-        let data = await apiRequest("GET", "/tasks/user/me", null, true);
-        data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
+        let path = `/tasks/user/me?limit=${HISTORY_PAGE_SIZE}`;
+        if (append && historyCursor) {
+            path += `&cursor=${encodeURIComponent(historyCursor)}`;
+        }
+        const page = await apiRequest("GET", path, null, true);
+        const data = page?.items ?? [];
 
-        if (!Array.isArray(data) || data.length === 0) {
+        if (!append && data.length === 0) {
             table.classList.add("hidden");
             empty.classList.remove("hidden");
             return;
         }
 
-        data.forEach((task, index) => {
+        data.forEach((task) => {
             const tr = document.createElement("tr");
 
+            historyCount += 1;
             const idTd = document.createElement("td");
-            idTd.textContent = index + 1;
+            idTd.textContent = historyCount;
 
             const createdTd = document.createElement("td");
             if (task.created_at) {
@@ -394,12 +504,17 @@ async function loadHistory() {
             }
 
             const sizeTd = document.createElement("td");
-            let sizeText = "-";
-            if (task.input_data && task.input_data.matrix && Array.isArray(task.input_data.matrix)) {
-                const n = task.input_data.matrix.length;
-                sizeText = `${n}×${n}`;
+            sizeTd.textContent = task.n ? `${task.n}×${task.n}` : "-";
+
+            const durationTd = document.createElement("td");
+            if (task.status === "cached") {
+                durationTd.textContent = "кеш";
+            } else {
+                durationTd.textContent = task.duration != null ? `${task.duration.toFixed(2)} с` : "-";
             }
-            sizeTd.textContent = sizeText;
+
+            const residualTd = document.createElement("td");
+            residualTd.textContent = task.residual != null ? task.residual.toExponential(2) : "-";
 
             const actionsTd = document.createElement("td");
             const btn = document.createElement("button");
@@ -411,11 +526,18 @@ async function loadHistory() {
             tr.appendChild(idTd);
             tr.appendChild(createdTd);
             tr.appendChild(sizeTd);
+            tr.appendChild(durationTd);
+            tr.appendChild(residualTd);
             tr.appendChild(actionsTd);
 
             body.appendChild(tr);
         });
 
+        historyCursor = page?.next_cursor ?? null;
+        if (historyCursor) {
+            more.classList.remove("hidden");
+        }
+
     } catch (err) {
         table.classList.add("hidden");
         empty.classList.remove("hidden");
@@ -424,22 +546,49 @@ async function loadHistory() {
     }
 }
 
-function showTaskDetails(task) {
+async function showTaskDetails(summary) {
     const overlay = document.getElementById("modal-overlay");
     const content = document.getElementById("modal-content");
 
-    const matrix = task.input_data?.matrix ?? [];
-    const rhs = task.input_data?.rhs ?? task.input_data?.vector ?? [];
-    const solution = task.result?.solution ?? task.result ?? null;
+    // Список містить лише зведення; вхідні дані й результат — окремим запитом
+    let task = summary;
+    try {
+        task = await apiRequest("GET", `/tasks/history/${summary.id}`, null, true);
+    } catch (err) {
+        console.error("task details error", err);
+    }
 
-    let html = "";
+    // Нові записи містять лише кут матриці (preview); старі — всю систему
+    const input = task.input_data?.preview ?? task.input_data ?? {};
+    const matrix = input.matrix ?? [];
+    const rhs = input.rhs ?? input.vector ?? [];
+    const n = task.n ?? task.input_data?.n ?? matrix.length;
+    let solution = task.result?.solution ?? task.result ?? null;
+    let solutionSize = Array.isArray(solution) ? solution.length : 0;
 
-    const n = matrix.length;
+    // Розв'язок зберігається окремо в бінарному вигляді — підтягуємо лише перші значення
+    if (task.task_id) {
+        try {
+            const result = await apiRequest("GET", `/tasks/result/${task.task_id}?limit=10`, null, false);
+            if (Array.isArray(result.solution)) {
+                solution = result.solution;
+                solutionSize = result.n ?? solution.length;
+            }
+        } catch (err) {
+            console.error("solution error", err);
+        }
+    }
+
+    let html = "";
 
-    html += `<h4>Матриця A (${n}×${n})</h4>`;
+    if (task.input_data?.format === "csr") {
+        html += `<h4>Розріджена матриця A (${n}×${n}, ненульових: ${task.input_data.nnz})</h4>`;
+    } else {
+        html += `<h4>Матриця A (${n}×${n})</h4>`;
+    }
     if (Array.isArray(matrix) && matrix.length > 0) {
 
-        const showSize = Math.min(10, n);
+        const showSize = Math.min(10, matrix.length);
         html += "<table>";
         for (let i = 0; i < showSize; i++) {
             html += "<tr>";
@@ -460,7 +609,7 @@ function showTaskDetails(task) {
         html += "<p class='muted-text'>Немає даних матриці.</p>";
     }
 
-    html += `<h4>Вектор b (${rhs.length} елементів)</h4>`;
+    html += `<h4>Вектор b (${n} елементів)</h4>`;
     if (Array.isArray(rhs) && rhs.length > 0) {
         const showCount = Math.min(10, rhs.length);
         html += "<table>";
@@ -468,8 +617,8 @@ function showTaskDetails(task) {
             const v = rhs[i];
             html += `<tr><td>${typeof v === "number" ? v.toFixed(2) : v}</td></tr>`;
         }
-        if (rhs.length > 10) {
-            html += `<tr><td>... та ще ${rhs.length - 10} елементів</td></tr>`;
+        if (n > showCount) {
+            html += `<tr><td>... та ще ${n - showCount} елементів</td></tr>`;
         }
         html += "</table>";
     } else {
@@ -484,8 +633,8 @@ function showTaskDetails(task) {
             const v = solution[i];
             html += `<tr><td>x${i+1} = ${typeof v === "number" ? v.toFixed(6) : v}</td></tr>`;
         }
-        if (solution.length > 10) {
-            html += `<tr><td>... та ще ${solution.length - 10} значень</td></tr>`;
+        if (solutionSize > showCount) {
+            html += `<tr><td>... та ще ${solutionSize - showCount} значень</td></tr>`;
         }
         html += "</table>";
     } else {
@@ -633,15 +782,31 @@ function init() {
         stopPolling();
 
         const { matrix, rhs } = collectMatrixAndVector();
+        const n = matrix.length;
 
-        console.log(`[Solve] Sending matrix ${matrix.length}×${matrix.length}`);
+        console.log(`[Solve] Sending matrix ${n}×${n}`);
 
         try {
 
-            const data = await apiRequest("POST", "/gauss/solve", {
-                matrix,
-                rhs
-            }, true);
+            const engine = document.getElementById("solver-engine").value;
+
+            let data;
+            if (n > 100) {
+                // Великі системи — сирим float64 замість JSON: [A по рядках | b]
+                data = await apiRequest(
+                    "POST",
+                    `/gauss/solve?engine=${encodeURIComponent(engine)}`,
+                    packSystem(matrix, rhs),
+                    true,
+                    { "X-Matrix-Size": String(n) }
+                );
+            } else {
+                data = await apiRequest("POST", "/gauss/solve", {
+                    matrix,
+                    rhs,
+                    engine
+                }, true);
+            }
 
             if (data.task_id) {
                 currentTaskId = data.task_id;
@@ -649,7 +814,7 @@ function init() {
                 
                 cancelBtn.classList.remove("hidden");
                 
-                await startPolling(data.task_id);
+                startProgressStream(data.task_id);
             } else {
                 resultEl.textContent = "Помилка: не отримано task_id";
             }
@@ -671,6 +836,10 @@ function init() {
         loadHistory();
     });
 
+    document.getElementById("history-more-btn").addEventListener("click", () => {
+        loadHistory(true);
+    });
+
     document.getElementById("modal-close").addEventListener("click", hideModal);
     document.getElementById("modal-overlay").addEventListener("click", (e) => {
         if (e.target.id === "modal-overlay") hideModal();
@@ -0,0 +1,72 @@
+import json
+import os
+import time
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from backend.core import factorizations
+from backend.core.factorizations import FactorizationStore, FACTOR_TTL
+from backend.core.task_ids import TaskIds
+
+
+@pytest.fixture(autouse=True)
+def factor_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(factorizations, "FACTOR_DIR", str(tmp_path))
+    return tmp_path
+
+
+def ready(n=4, user_id=1) -> str:
+    handle = TaskIds.new()
+    FactorizationStore.create(handle, user_id, np.eye(n))
+    FactorizationStore.mark(handle, "ready")
+    return handle
+
+
+def set_last_used(handle: str, last_used: float):
+    with open(FactorizationStore._paths(handle)[1], "r+") as f:
+        meta = json.load(f)
+        meta["last_used"] = last_used
+        f.seek(0)
+        f.truncate()
+        json.dump(meta, f)
+
+
+def test_get_does_not_extend_lifetime():
+    handle = ready()
+    # Давно не використовувалась, але ще в межах TTL
+    set_last_used(handle, time.time() - FACTOR_TTL / 2)
+    before = FactorizationStore.get(handle, 1)["last_used"]
+
+    FactorizationStore.describe(FactorizationStore.get(handle, 1))
+    assert FactorizationStore.get(handle, 1)["last_used"] == before
+
+
+def test_solve_extends_lifetime():
+    handle = ready()
+    set_last_used(handle, time.time() - FACTOR_TTL / 2)
+
+    n, lu, perm = FactorizationStore.open(handle, 1)
+    lu = perm = None
+    assert n == 4
+    assert FactorizationStore.get(handle, 1)["last_used"] > time.time() - 5
+
+
+@pytest.mark.parametrize("access", [
+    lambda handle: FactorizationStore.get(handle, 1),
+    lambda handle: FactorizationStore.open(handle, 1),
+])
+def test_expired_handle_is_404_and_removed(access):
+    handle = ready()
+    set_last_used(handle, time.time() - FACTOR_TTL - 1)
+
+    with pytest.raises(HTTPException) as error:
+        access(handle)
+    assert error.value.status_code == 404
+    assert not any(os.path.exists(path) for path in FactorizationStore._paths(handle))
+
+
+def test_other_user_cannot_see_handle():
+    handle = ready()
+    with pytest.raises(HTTPException) as error:
+        FactorizationStore.get(handle, 2)
+    assert error.value.status_code == 404
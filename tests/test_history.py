@@ -0,0 +1,51 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from backend.core.task_manager import TaskManager
+from backend.db import repository
+
+
+@pytest.fixture
+def history(monkeypatch):
+    # Історія в пам'яті, від новіших до старіших — як у get_tasks_for_user
+    start = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    rows = [SimpleNamespace(id=i, created_at=start - timedelta(seconds=i // 2)) for i in range(1, 8)]
+    rows.sort(key=lambda row: (row.created_at, row.id), reverse=True)
+    calls = []
+
+    async def get_tasks_for_user(db, user_id, limit=50, before=None):
+        calls.append(before)
+        page = [row for row in rows if before is None or (row.created_at, row.id) < before]
+        return page[:limit]
+
+    monkeypatch.setattr(repository, "get_tasks_for_user", get_tasks_for_user)
+    return rows, calls
+
+
+def test_cursor_round_trip_walks_all_pages(history):
+    rows, calls = history
+    seen, cursor = [], None
+    while True:
+        page = asyncio.run(TaskManager.get_history(1, None, limit=3, cursor=cursor))
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == rows
+    # Курсор відновлює (created_at, id) останнього запису з мікросекундами
+    assert calls[1] == (rows[2].created_at, rows[2].id)
+
+
+def test_short_page_has_no_next_cursor(history):
+    page = asyncio.run(TaskManager.get_history(1, None, limit=50))
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm9waXBl", "MjAyNi0wMS0wMXxhYmM="])
+def test_malformed_cursor_is_400(history, cursor):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(TaskManager.get_history(1, None, cursor=cursor))
+    assert error.value.status_code == 400
@@ -0,0 +1,83 @@
+import io
+import numpy as np
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from backend.core.ingest import MatrixDecoder
+
+app = FastAPI()
+
+
+@app.post("/decode")
+async def decode(request: Request):
+    matrix, rhs, engine = await MatrixDecoder.decode(request)
+    return {"shape": list(matrix.shape), "rhs": len(rhs), "engine": engine}
+
+
+client = TestClient(app)
+
+
+def test_json_system_is_decoded():
+    r = client.post("/decode", json={"matrix": [[2.0, 0.0], [0.0, 3.0]], "rhs": [1.0, 1.0]})
+    assert r.status_code == 200
+    assert r.json()["shape"] == [2, 2]
+
+
+@pytest.mark.parametrize("body", [
+    {"matrix": [[1.0, 2.0], [3.0]], "rhs": [1.0, 1.0]},
+    {"matrix": [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], "rhs": [1.0, 1.0]},
+    {"matrix": [[1.0, 0.0], [0.0, 1.0]], "rhs": [1.0, 1.0, 1.0]},
+    {"matrix": [], "rhs": []},
+])
+def test_json_bad_shapes_are_rejected(body):
+    r = client.post("/decode", json=body)
+    assert r.status_code == 400
+
+
+def test_raw_body_size_must_match_header():
+    body = np.zeros(2 * 2 + 1).tobytes()
+    r = client.post(
+        "/decode",
+        content=body,
+        headers={"content-type": "application/octet-stream", "x-matrix-size": "2"}
+    )
+    assert r.status_code == 400
+
+
+def test_npy_must_be_augmented_matrix():
+    buffer = io.BytesIO()
+    np.save(buffer, np.eye(3))
+    r = client.post("/decode", content=buffer.getvalue(), headers={"content-type": "application/x-npy"})
+    assert r.status_code == 400
+
+
+def test_multipart_rhs_length_must_match():
+    matrix, rhs = io.BytesIO(), io.BytesIO()
+    np.save(matrix, np.eye(3))
+    np.save(rhs, np.ones(2))
+    r = client.post("/decode", files={"matrix": ("a.npy", matrix.getvalue()), "rhs": ("b.npy", rhs.getvalue())})
+    assert r.status_code == 400
+
+
+@app.post("/decode/sparse")
+async def decode_sparse(request: Request):
+    system = await MatrixDecoder.decode_sparse(request)
+    return {"n": len(system["rhs"]), "nnz": len(system["data"])}
+
+
+def test_sparse_coo_duplicates_are_summed():
+    body = {"format": "coo", "n": 2, "rows": [0, 0, 1], "cols": [0, 0, 1], "data": [1.0, 1.0, 3.0], "rhs": [1.0, 1.0]}
+    r = client.post("/decode/sparse", json=body)
+    assert r.status_code == 200
+    assert r.json() == {"n": 2, "nnz": 2}
+
+
+@pytest.mark.parametrize("body", [
+    {"format": "csr", "n": 2, "indptr": [0, 1, 2], "indices": [0, 5], "data": [1.0, 1.0], "rhs": [1.0, 1.0]},
+    {"format": "csr", "n": 2, "indptr": [0, 1, 2], "indices": [0, 1], "data": [1.0, 1.0], "rhs": [1.0]},
+    {"format": "csr", "n": 2, "data": [1.0, 1.0], "rhs": [1.0, 1.0]},
+    {"format": "coo", "n": 0, "rows": [], "cols": [], "data": [], "rhs": []},
+])
+def test_sparse_bad_shapes_are_rejected(body):
+    r = client.post("/decode/sparse", json=body)
+    assert r.status_code == 400
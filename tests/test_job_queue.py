@@ -0,0 +1,135 @@
+import uuid
+import pytest
+from concurrent.futures import wait
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from backend.core.db_bridge import DBBridge
+from backend.core.task_ids import TaskIds
+from backend.db import models, repository
+from backend.db.schemas import UserCreate
+
+# Оренда, повтори й квоти solve_jobs перевіряються на справжньому Postgres (SKIP LOCKED,
+# advisory lock, now() сервера); без доступної БД тести пропускаються
+
+INPUT_HASH = "test-job-queue"
+
+
+async def _count_jobs(db):
+    return (await db.execute(select(func.count()).select_from(models.SolveJob))).scalar()
+
+
+async def _add_blob(db):
+    await db.execute(
+        pg_insert(models.MatrixBlob)
+        .values(hash=INPUT_HASH, n=1, codec="raw", size=0, data=b"")
+        .on_conflict_do_nothing(index_elements=["hash"])
+    )
+    await db.commit()
+
+
+async def _cleanup(db, user_id):
+    # solve_jobs і task_progress видаляються каскадом разом із користувачем
+    await db.execute(delete(models.User).where(models.User.id == user_id))
+    await db.execute(delete(models.MatrixBlob).where(models.MatrixBlob.hash == INPUT_HASH))
+    await db.commit()
+
+
+async def _job(db, task_id):
+    return (await db.execute(select(models.SolveJob).where(models.SolveJob.task_id == task_id))).scalar_one_or_none()
+
+
+@pytest.fixture(scope="module")
+def user_id():
+    try:
+        jobs = DBBridge.run(_count_jobs)
+    except Exception as e:
+        DBBridge.shutdown()
+        pytest.skip(f"Postgres недоступний: {e}")
+    if jobs:
+        pytest.skip("Черга solve_jobs не порожня")
+
+    user = DBBridge.run(
+        repository.create_user,
+        UserCreate(name="queue", email=f"queue-{uuid.uuid4().hex}@example.com", password="x"),
+        "x"
+    )
+    DBBridge.run(_add_blob)
+    yield user.id
+    DBBridge.run(_cleanup, user.id)
+    DBBridge.shutdown()
+
+
+def enqueue(user_id, user_limit=None, capacity=None):
+    task_id = TaskIds.new()
+    DBBridge.run(repository.create_task_progress, task_id, user_id, status="queued")
+    refused = DBBridge.run(
+        repository.enqueue_solve_job, task_id, user_id, INPUT_HASH, {"kind": "dense"}, None, user_limit, capacity
+    )
+    return task_id, refused
+
+
+def test_expired_lease_is_requeued_and_claimed_again(user_id):
+    task_id, _ = enqueue(user_id)
+
+    # Від'ємна оренда — воркер «помер» одразу після claim
+    job = DBBridge.run(repository.claim_solve_job, "w1", -1)
+    assert job["task_id"] == task_id and job["attempts"] == 1
+
+    requeued, failed = DBBridge.run(repository.recover_expired_solve_jobs, 3, "lease")
+    assert requeued == [task_id] and failed == []
+    assert DBBridge.run(repository.heartbeat_solve_job, task_id, "w1", 60) is False
+
+    job = DBBridge.run(repository.claim_solve_job, "w2", 60)
+    assert job["task_id"] == task_id and job["attempts"] == 2
+    assert DBBridge.run(repository.heartbeat_solve_job, task_id, "w2", 60) is True
+
+    DBBridge.run(repository.finish_solve_job, task_id, "w2")
+    assert DBBridge.run(_job, task_id) is None
+
+
+def test_exhausted_attempts_mark_task_as_error(user_id):
+    task_id, _ = enqueue(user_id)
+    DBBridge.run(repository.claim_solve_job, "w1", -1)
+
+    requeued, failed = DBBridge.run(repository.recover_expired_solve_jobs, 1, "lease lost")
+    assert requeued == [] and failed == [task_id]
+    assert DBBridge.run(_job, task_id) is None
+
+    progress = DBBridge.run(repository.get_task_progress, task_id)
+    assert progress.status == "error"
+    assert progress.error_message == "lease lost"
+
+
+def test_retry_until_attempts_run_out(user_id):
+    task_id, _ = enqueue(user_id)
+
+    DBBridge.run(repository.claim_solve_job, "w1", 60)
+    assert DBBridge.run(repository.retry_solve_job, task_id, "w1", "boom", 0, 2, "failed") is True
+    job = DBBridge.run(_job, task_id)
+    assert job.status == "queued" and job.lease_owner is None and job.last_error == "boom"
+
+    DBBridge.run(repository.claim_solve_job, "w1", 60)
+    assert DBBridge.run(repository.retry_solve_job, task_id, "w1", "boom", 0, 2, "failed") is False
+    assert DBBridge.run(_job, task_id) is None
+    assert DBBridge.run(repository.get_task_progress, task_id).error_message == "failed: boom"
+
+
+@pytest.mark.parametrize("user_limit, capacity, reason", [(3, None, "user"), (None, 3, "full")])
+def test_concurrent_enqueue_respects_limits(user_id, user_limit, capacity, reason):
+    task_ids = [TaskIds.new() for _ in range(8)]
+    for task_id in task_ids:
+        DBBridge.run(repository.create_task_progress, task_id, user_id, status="queued")
+
+    futures = [
+        DBBridge.submit(
+            repository.enqueue_solve_job, task_id, user_id, INPUT_HASH, {"kind": "dense"}, None, user_limit, capacity
+        )
+        for task_id in task_ids
+    ]
+    wait(futures)
+    refused = [future.result() for future in futures]
+
+    assert refused.count(None) == 3
+    assert refused.count(reason) == 5
+    for task_id in task_ids:
+        DBBridge.run(repository.cancel_queued_solve_job, task_id)
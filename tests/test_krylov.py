@@ -0,0 +1,92 @@
+import asyncio
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+from backend.core.krylov_solver import KrylovSolver
+from backend.core.progress import ProgressTracker
+from backend.core.cancelation import CancelationManager
+from backend.core.solution_cache import SolutionCache
+from backend.core.task_manager import TaskManager
+from backend.core.db_bridge import DBBridge
+from backend.core.progress_stream import ProgressBroker
+from backend.db import repository
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    # Розв'язувач і збереження без БД: прогрес, скасування та запити — в пам'яті
+    calls = []
+    monkeypatch.setattr(ProgressTracker, "start", staticmethod(lambda task_id, user_id=None: None))
+    monkeypatch.setattr(ProgressTracker, "update", staticmethod(lambda *args, **kwargs: None))
+    monkeypatch.setattr(ProgressTracker, "finish", staticmethod(lambda task_id: None))
+    monkeypatch.setattr(CancelationManager, "is_cancelled", staticmethod(lambda task_id: False))
+    monkeypatch.setattr(ProgressBroker, "publish", staticmethod(lambda *args, **kwargs: None))
+    monkeypatch.setattr(DBBridge, "run", staticmethod(lambda fn, *args, **kwargs: calls.append(fn.__name__)))
+    monkeypatch.setattr(SolutionCache, "_entries", type(SolutionCache._entries)())
+    monkeypatch.setattr(SolutionCache, "_size", 0)
+    return calls
+
+
+def spd_system(n=60, seed=1):
+    rng = np.random.default_rng(seed)
+    B = rng.standard_normal((n, n))
+    A = B @ B.T / n + 2 * np.eye(n)
+    x = np.arange(1.0, n + 1)
+    return A, x, A @ x
+
+
+def test_converged_run_reports_true_residual():
+    A, x, b = spd_system()
+    result = KrylovSolver.solve_system("t1", 1, A, b, method="cg", tol=1e-10)
+    assert result["status"] == "completed"
+    assert result["stats"]["residual"] <= 1e-10
+    assert np.allclose(result["solution"], x)
+
+
+@pytest.mark.parametrize("method", ["cg", "gmres", "bicgstab"])
+def test_non_convergence_is_an_error(method):
+    A, x, b = spd_system()
+    result = KrylovSolver.solve_system("t2", 1, A, b, method=method, tol=1e-12, max_iter=2, preconditioner="none")
+    assert result["status"] == "error"
+    assert result["solution"] is None
+
+
+def test_iterative_solution_is_not_cached(offline):
+    A, x, b = spd_system()
+    result = KrylovSolver.solve_system("t3", 1, A, b, method="cg", tol=0.5)
+    assert result["status"] == "completed"
+
+    TaskManager._persist_result("t3", 1, result, {"matrix": A, "rhs": b}, "hash-iterative")
+    assert "complete_task" in offline
+    assert SolutionCache.get("hash-iterative") is None
+
+
+def test_direct_solution_is_cached():
+    A, x, b = spd_system()
+    result = {"task_id": "t4", "status": "completed", "solution": x}
+    TaskManager._persist_result("t4", 1, result, {"matrix": A, "rhs": b}, "hash-direct")
+    assert np.array_equal(SolutionCache.get("hash-direct"), x)
+
+
+def test_mixed_precision_solution_is_cached():
+    # mixed_lu теж повертає stats, але це прямий метод
+    A, x, b = spd_system()
+    result = {"task_id": "t5", "status": "completed", "solution": x, "stats": {"method": "mixed_lu", "iterations": 2}}
+    TaskManager._persist_result("t5", 1, result, {"matrix": A, "rhs": b}, "hash-mixed")
+    assert np.array_equal(SolutionCache.get("hash-mixed"), x)
+
+
+def test_history_fallback_skips_iterative_results():
+    captured = {}
+
+    class Session:
+        async def execute(self, statement):
+            captured["sql"] = str(statement.compile(dialect=postgresql.dialect()))
+
+            class Result:
+                def scalar_one_or_none(self):
+                    return None
+            return Result()
+
+    asyncio.run(repository.find_solution_by_hash(Session(), "hash", exclude_methods=("cg", "gmres")))
+    assert "->> %(param_1)s::TEXT) AS VARCHAR) NOT IN" in captured["sql"]
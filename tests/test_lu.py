@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from backend.core import lu_solver
+from backend.core.lu_solver import BlockedLUSolver, LU_BLOCK_SIZE
+from backend.core.progress import ProgressTracker
+from backend.core.cancelation import CancelationManager
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    # Прогрес і скасування — без БД
+    monkeypatch.setattr(ProgressTracker, "start", staticmethod(lambda task_id, user_id=None: None))
+    monkeypatch.setattr(ProgressTracker, "update", staticmethod(lambda *args, **kwargs: None))
+    monkeypatch.setattr(ProgressTracker, "finish", staticmethod(lambda task_id: None))
+    monkeypatch.setattr(CancelationManager, "is_cancelled", staticmethod(lambda task_id: False))
+
+
+@pytest.fixture(params=["scipy", "numpy"])
+def triangular(request, monkeypatch):
+    # Блочна підстановка на NumPy — запасний шлях, коли SciPy не встановлено
+    if request.param == "numpy":
+        monkeypatch.setattr(lu_solver, "solve_triangular", None)
+    elif lu_solver.solve_triangular is None:
+        pytest.skip("SciPy не встановлено")
+    return request.param
+
+
+def system(n, seed=2):
+    rng = np.random.default_rng(seed)
+    A = rng.standard_normal((n, n))
+    b = rng.standard_normal(n)
+    return A, b
+
+
+@pytest.mark.parametrize("n", [1, 7, LU_BLOCK_SIZE + 37, 2 * LU_BLOCK_SIZE + 1])
+def test_factorize_reconstructs_permuted_matrix(triangular, n):
+    A, _ = system(n)
+    LU = A.copy()
+    perm = BlockedLUSolver.factorize(LU)
+
+    L = np.tril(LU, -1) + np.eye(n)
+    U = np.triu(LU)
+    assert np.allclose(A[perm], L @ U)
+
+
+@pytest.mark.parametrize("n", [5, LU_BLOCK_SIZE + 37])
+def test_lu_solve_matches_numpy(triangular, n):
+    A, b = system(n)
+    LU = A.copy()
+    perm = BlockedLUSolver.factorize(LU)
+    assert np.allclose(BlockedLUSolver.lu_solve(LU, perm, b), np.linalg.solve(A, b))
+
+
+def test_solve_system_completes():
+    A, b = system(LU_BLOCK_SIZE + 5)
+    result = BlockedLUSolver.solve_system("t1", 1, A, b)
+    assert result["status"] == "completed"
+    assert np.allclose(result["solution"], np.linalg.solve(A, b), atol=1e-8)
+
+
+def test_singular_matrix_is_an_error():
+    A, b = system(6)
+    A[:, 3] = A[:, 1]
+    with pytest.raises(ValueError):
+        BlockedLUSolver.factorize(A.copy())
+
+    result = BlockedLUSolver.solve_system("t2", 1, A, b)
+    assert result["status"] == "error"
+    assert result["solution"] is None
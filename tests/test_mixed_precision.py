@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from backend.core.mixed_precision import MixedPrecisionLUSolver
+from backend.core.progress import ProgressTracker
+from backend.core.cancelation import CancelationManager
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    # Прогрес і скасування — без БД
+    monkeypatch.setattr(ProgressTracker, "start", staticmethod(lambda task_id, user_id=None: None))
+    monkeypatch.setattr(ProgressTracker, "update", staticmethod(lambda *args, **kwargs: None))
+    monkeypatch.setattr(ProgressTracker, "finish", staticmethod(lambda task_id: None))
+    monkeypatch.setattr(CancelationManager, "is_cancelled", staticmethod(lambda task_id: False))
+
+
+def system(n, seed=3):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, n)), rng.standard_normal(n)
+
+
+def test_well_conditioned_stays_float32():
+    A, b = system(131)
+    A += len(A) * np.eye(len(A))
+    result = MixedPrecisionLUSolver.solve_system("t3", 1, A, b)
+    assert result["status"] == "completed"
+    assert result["stats"]["precision"] == "float32"
+    assert np.allclose(result["solution"], np.linalg.solve(A, b), atol=1e-9)
+
+
+def test_falls_back_to_float64_when_ill_conditioned():
+    # Матриця Гільберта: cond ~ 1e10, уточнення з float32-LU застрягає
+    n = 8
+    A = 1.0 / (np.arange(n)[:, None] + np.arange(n)[None, :] + 1)
+    x = np.ones(n)
+    result = MixedPrecisionLUSolver.solve_system("t4", 1, A, A @ x)
+    assert result["status"] == "completed"
+    assert result["stats"]["precision"] == "float64"
+    assert np.allclose(A @ result["solution"], A @ x)
+
+
+def test_singular_matrix_is_an_error():
+    A, b = system(6)
+    A[:, 3] = A[:, 1]
+    result = MixedPrecisionLUSolver.solve_system("t5", 1, A, b)
+    assert result["status"] == "error"
@@ -0,0 +1,104 @@
+import pytest
+from backend.core import scheduler
+from backend.core.scheduler import SolveScheduler, QuotaExceededError, SCHEDULER_USER_JOBS
+
+
+@pytest.fixture(autouse=True)
+def clean_scheduler():
+    SolveScheduler.reset()
+    SolveScheduler.configure(1)
+    yield
+    SolveScheduler.reset()
+
+
+def dense(task_id: str, user_id: int, n: int) -> dict:
+    return {
+        "task_id": task_id,
+        "user_id": user_id,
+        "engine": "gauss",
+        "layout": {"matrix": (0, (n, n), "<f8"), "rhs": (0, (n,), "<f8")}
+    }
+
+
+def drain() -> list:
+    # Видає задачі по одній, звільняючи єдиний слот після кожної
+    order = []
+    while (message := SolveScheduler.next()) is not None:
+        order.append(message["task_id"])
+        SolveScheduler.finish(message["task_id"])
+    return order
+
+
+def test_small_job_overtakes_heavy_backlog():
+    for i in range(3):
+        assert SolveScheduler.enqueue(dense(f"heavy{i}", 1, 400), capacity=100)
+    assert SolveScheduler.enqueue(dense("small", 2, 10), capacity=100)
+
+    assert drain()[0] == "small"
+
+
+def test_users_are_interleaved_by_finish_tag():
+    for i in range(3):
+        SolveScheduler.enqueue(dense(f"a{i}", 1, 100), capacity=100)
+    for i in range(3):
+        SolveScheduler.enqueue(dense(f"b{i}", 2, 100), capacity=100)
+
+    assert drain() == ["a0", "b0", "a1", "b1", "a2", "b2"]
+
+
+def test_positions_follow_dispatch_order():
+    SolveScheduler.enqueue(dense("big", 1, 300), capacity=100)
+    SolveScheduler.enqueue(dense("tiny", 2, 5), capacity=100)
+    assert SolveScheduler.positions() == {"tiny": 1, "big": 2}
+
+
+def test_per_user_concurrency_limit(monkeypatch):
+    monkeypatch.setattr(scheduler, "SCHEDULER_USER_CONCURRENCY", 1)
+    SolveScheduler.configure(4)
+    SolveScheduler.enqueue(dense("a0", 1, 10), capacity=100)
+    SolveScheduler.enqueue(dense("a1", 1, 10), capacity=100)
+    SolveScheduler.enqueue(dense("b0", 2, 10), capacity=100)
+
+    dispatched = [SolveScheduler.next()["task_id"], SolveScheduler.next()["task_id"]]
+    assert sorted(dispatched) == ["a0", "b0"]
+    assert SolveScheduler.next() is None
+
+
+def test_oversized_job_is_rejected_with_413(monkeypatch):
+    monkeypatch.setattr(scheduler, "SCHEDULER_USER_MEMORY", 1024 * 1024)
+    with pytest.raises(QuotaExceededError) as error:
+        SolveScheduler.enqueue(dense("huge", 1, 1000), capacity=100)
+    assert error.value.status_code == 413
+    assert SolveScheduler.stats()["waiting"] == 0
+
+
+def test_too_many_jobs_per_user_is_429():
+    for i in range(SCHEDULER_USER_JOBS):
+        SolveScheduler.enqueue(dense(f"a{i}", 1, 10), capacity=100)
+    with pytest.raises(QuotaExceededError) as error:
+        SolveScheduler.enqueue(dense("extra", 1, 10), capacity=100)
+    assert error.value.status_code == 429
+
+    # Інший користувач квоти першого не ділить
+    assert SolveScheduler.enqueue(dense("other", 2, 10), capacity=100)
+
+
+def test_user_memory_quota_is_429(monkeypatch):
+    # Кожна задача вміщується окремо, але разом перевищують квоту користувача
+    monkeypatch.setattr(scheduler, "SCHEDULER_USER_MEMORY", 3 * 1024 * 1024)
+    SolveScheduler.enqueue(dense("a0", 1, 400), capacity=100)
+    with pytest.raises(QuotaExceededError) as error:
+        SolveScheduler.enqueue(dense("a1", 1, 400), capacity=100)
+    assert error.value.status_code == 429
+
+
+def test_full_queue_returns_false():
+    assert SolveScheduler.enqueue(dense("a0", 1, 10), capacity=1)
+    assert SolveScheduler.enqueue(dense("b0", 2, 10), capacity=1) is False
+
+
+def test_remove_releases_quota():
+    for i in range(SCHEDULER_USER_JOBS):
+        SolveScheduler.enqueue(dense(f"a{i}", 1, 10), capacity=100)
+    assert SolveScheduler.remove("a0")
+    assert SolveScheduler.enqueue(dense("again", 1, 10), capacity=100)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from backend.core import solution_cache
+from backend.core.solution_cache import SolutionCache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    # Місця рівно на три розв'язки по 10 float64
+    monkeypatch.setattr(solution_cache, "SOLUTION_CACHE_BYTES", 3 * 80)
+    monkeypatch.setattr(SolutionCache, "_entries", type(SolutionCache._entries)())
+    monkeypatch.setattr(SolutionCache, "_size", 0)
+    monkeypatch.setattr(SolutionCache, "_stats", {"hits": 0, "db_hits": 0, "misses": 0, "evictions": 0})
+
+
+def solution(value: float) -> np.ndarray:
+    return np.full(10, value)
+
+
+def test_least_recently_used_is_evicted_by_size():
+    for key in ("a", "b", "c"):
+        SolutionCache.put(key, solution(1.0))
+    assert SolutionCache.get("a") is not None
+
+    SolutionCache.put("d", solution(2.0))
+
+    assert SolutionCache.get("b") is None
+    assert SolutionCache.get("a") is not None
+    stats = SolutionCache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 3 and stats["bytes"] == 3 * 80
+
+
+def test_replacing_a_key_does_not_grow_size():
+    SolutionCache.put("a", solution(1.0))
+    SolutionCache.put("a", solution(2.0))
+    assert SolutionCache.stats()["bytes"] == 80
+    assert SolutionCache.get("a")[0] == 2.0
+
+
+def test_oversized_solution_is_not_cached():
+    SolutionCache.put("big", np.zeros(31))
+    assert SolutionCache.get("big") is None
+    assert SolutionCache.stats()["entries"] == 0
+
+
+def test_cached_solution_is_read_only():
+    SolutionCache.put("a", solution(1.0))
+    with pytest.raises(ValueError):
+        SolutionCache.get("a")[0] = 5.0
+
+
+def test_hit_rate_counts_memory_and_db_hits():
+    SolutionCache.put("a", solution(1.0))
+    SolutionCache.get("a")
+    SolutionCache.record(hit_from_db=True)
+    SolutionCache.record(hit_from_db=False)
+    SolutionCache.record(hit_from_db=False)
+
+    stats = SolutionCache.stats()
+    assert (stats["hits"], stats["db_hits"], stats["misses"]) == (1, 1, 2)
+    assert stats["hit_rate"] == 0.5
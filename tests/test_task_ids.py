@@ -0,0 +1,31 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+from backend.core.task_ids import TaskIds
+
+
+def test_new_is_uuid_v7():
+    value = uuid.UUID(TaskIds.new())
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_ids_are_ordered_by_creation_time():
+    ids = []
+    for _ in range(5):
+        ids.append(TaskIds.new())
+        time.sleep(0.002)
+    assert ids == sorted(ids)
+
+
+def test_bound_format():
+    assert TaskIds.bound(datetime(1970, 1, 1)) == "00000000-0000"
+    assert TaskIds.bound(datetime(1970, 1, 1, 0, 0, 1)) == "00000000-03e8"
+
+
+def test_bound_splits_ids_by_moment():
+    # Межа секції: усі задачі, створені після moment, не менші за bound(moment)
+    moment = datetime.utcnow()
+    task_id = TaskIds.new()
+    assert TaskIds.bound(moment - timedelta(seconds=1)) <= task_id
+    assert task_id < TaskIds.bound(moment + timedelta(seconds=1))
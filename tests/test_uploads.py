@@ -0,0 +1,111 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from backend.core import uploads
+from backend.core.uploads import UploadStore, UPLOAD_WRITE_TIMEOUT
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+class Body:
+
+    # Замість Request: write_stream читає лише request.stream()
+    def __init__(self, chunks, during=None):
+        self.chunks = chunks
+        self.during = during
+
+    async def stream(self):
+        for i, chunk in enumerate(self.chunks):
+            if i == 1 and self.during is not None:
+                self.during()
+            yield chunk
+
+
+def system(n=3):
+    A = np.arange(n * n, dtype=np.float64).reshape(n, n) + n * np.eye(n)
+    return A, np.ones(n)
+
+
+def write(upload_id, offset, data, chunk=16, during=None):
+    chunks = [data[i:i + chunk] for i in range(0, len(data), chunk)]
+    return asyncio.run(UploadStore.write_stream(upload_id, 1, offset, Body(chunks, during)))
+
+
+def test_chunked_writes_complete_the_system(monkeypatch):
+    # Маленький пакет — кілька копіювань у потоці за один запит
+    monkeypatch.setattr(uploads, "UPLOAD_WRITE_BATCH", 24)
+    A, b = system()
+    data = A.tobytes() + b.tobytes()
+    upload_id = UploadStore.create(1, 3)["upload_id"]
+
+    state = write(upload_id, 40, data[40:])
+    assert not state["complete"]
+    state = write(upload_id, 0, data[:40])
+    assert state["complete"] and state["ranges"] == [[0, len(data)]]
+
+    meta = UploadStore.claim(upload_id, 1)
+    stored = np.fromfile(meta["path"], dtype=np.float64)
+    assert np.array_equal(stored, np.concatenate([A.ravel(), b]))
+
+
+def test_claim_is_refused_while_a_write_is_in_flight():
+    A, b = system()
+    data = A.tobytes() + b.tobytes()
+    upload_id = UploadStore.create(1, 3)["upload_id"]
+    write(upload_id, 0, data[:40])
+
+    refused = []
+
+    def claim():
+        try:
+            UploadStore.claim(upload_id, 1)
+        except HTTPException as e:
+            refused.append(e.status_code)
+
+    state = write(upload_id, 40, data[40:], during=claim)
+    assert refused == [409]
+    assert state["complete"]
+    assert UploadStore.claim(upload_id, 1)["n"] == 3
+
+
+def test_ranges_are_not_merged_after_a_concurrent_claim():
+    A, b = system()
+    data = A.tobytes() + b.tobytes()
+    upload_id = UploadStore.create(1, 3)["upload_id"]
+
+    def claimed():
+        with UploadStore._locked_meta(upload_id) as meta:
+            meta["claimed"] = True
+
+    with pytest.raises(HTTPException) as error:
+        write(upload_id, 0, data, during=claimed)
+    assert error.value.status_code == 409
+    assert UploadStore.get(upload_id, 1)["ranges"] == []
+
+
+def test_stale_write_does_not_block_claim():
+    A, b = system()
+    data = A.tobytes() + b.tobytes()
+    upload_id = UploadStore.create(1, 3)["upload_id"]
+    write(upload_id, 0, data)
+
+    # Запит, що обірвався разом із реплікою, лишив свій запис у метаданих
+    with UploadStore._locked_meta(upload_id) as meta:
+        meta["writing"] = {"lost": time.time() - UPLOAD_WRITE_TIMEOUT - 1}
+    assert UploadStore.claim(upload_id, 1)["n"] == 3
+
+
+def test_write_past_the_end_is_rejected_and_not_counted():
+    upload_id = UploadStore.create(1, 2)["upload_id"]
+    with pytest.raises(HTTPException) as error:
+        write(upload_id, 0, bytes(8 * 7))
+    assert error.value.status_code == 400
+
+    meta = UploadStore.get(upload_id, 1)
+    assert meta["ranges"] == [] and meta["writing"] == {}
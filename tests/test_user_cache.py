@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from backend.auth import user_cache
+from backend.auth.user_cache import UserCache
+from backend.auth.auth_utils import hash_password_async, verify_password_async
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    # Керований годинник замість time.monotonic; кеш порожній у кожному тесті
+    now = [1000.0]
+    monkeypatch.setattr(user_cache.time, "monotonic", lambda: now[0])
+    UserCache.clear()
+    yield now
+    UserCache.clear()
+
+
+def test_entry_expires_after_ttl(clock, monkeypatch):
+    monkeypatch.setattr(user_cache, "USER_CACHE_TTL", 30.0)
+    UserCache.put(1, "alice")
+
+    clock[0] += 29.0
+    assert UserCache.get(1) == "alice"
+    clock[0] += 1.0
+    assert UserCache.get(1) is None
+
+
+def test_zero_ttl_disables_cache(monkeypatch):
+    monkeypatch.setattr(user_cache, "USER_CACHE_TTL", 0)
+    UserCache.put(1, "alice")
+    assert UserCache.get(1) is None
+
+
+def test_least_recently_used_is_evicted(monkeypatch):
+    monkeypatch.setattr(user_cache, "USER_CACHE_SIZE", 2)
+    UserCache.put(1, "alice")
+    UserCache.put(2, "bob")
+
+    # Звернення до 1 робить найдавнішим 2
+    assert UserCache.get(1) == "alice"
+    UserCache.put(3, "carol")
+
+    assert UserCache.get(2) is None
+    assert UserCache.get(1) == "alice"
+    assert UserCache.get(3) == "carol"
+
+
+def test_invalidate_removes_entry():
+    UserCache.put(1, "alice")
+    UserCache.invalidate(1)
+    assert UserCache.get(1) is None
+
+
+def test_password_hash_round_trip():
+    async def round_trip():
+        hashed = await hash_password_async("secret")
+        return hashed, await verify_password_async("secret", hashed), await verify_password_async("wrong", hashed)
+
+    hashed, ok, wrong = asyncio.run(round_trip())
+    assert hashed != "secret"
+    assert ok is True
+    assert wrong is False
@@ -0,0 +1,82 @@
+import pytest
+from backend.core import work_model
+from backend.core.work_model import WorkModel, CHECKPOINT_INTERVAL, MIN_MEASURE_TIME, THROUGHPUT_SMOOTHING
+from backend.core.progress import ProgressTracker
+from backend.core.cancelation import CancelationManager, TaskCancelledError
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    # Керований годинник; прогрес і скасування — без БД
+    now = [100.0]
+    calls = []
+    monkeypatch.setattr(work_model.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(WorkModel, "_throughput", {})
+    monkeypatch.setattr(ProgressTracker, "update", staticmethod(
+        lambda task_id, progress, matrix_size=None, eta=None: calls.append((progress, eta))
+    ))
+    monkeypatch.setattr(CancelationManager, "is_cancelled", staticmethod(lambda task_id: False))
+    monkeypatch.setattr(work_model.TaskValidator, "validate_timeout", staticmethod(lambda start_time: None))
+    return now, calls
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 100])
+def test_elimination_flops_sums_row_updates(n):
+    steps = sum(2 * (n - i - 1) * (n - i) for i in range(n))
+    assert WorkModel.elimination_flops(n) == pytest.approx(steps)
+
+
+def test_partial_elimination_is_front_loaded():
+    n = 1000
+    done = WorkModel.elimination_flops(n, n // 2)
+    assert done == pytest.approx(sum(2 * (n - i - 1) * (n - i) for i in range(n // 2)))
+    assert done / WorkModel.elimination_flops(n) == pytest.approx(7 / 8, abs=1e-3)
+
+
+def test_solve_flops_adds_two_substitutions():
+    assert WorkModel.solve_flops(10) == WorkModel.elimination_flops(10) + 200
+
+
+def test_record_smooths_throughput(monkeypatch):
+    monkeypatch.setattr(WorkModel, "_throughput", {})
+    WorkModel.record("gauss", 100.0, 1.0)
+    WorkModel.record("gauss", 200.0, 1.0)
+    assert WorkModel.throughput("gauss") == pytest.approx(THROUGHPUT_SMOOTHING * 200 + (1 - THROUGHPUT_SMOOTHING) * 100)
+
+    # Надто короткий замір не рахується
+    WorkModel.record("gauss", 1e9, MIN_MEASURE_TIME / 2)
+    assert WorkModel.throughput("gauss") == pytest.approx(130.0)
+
+
+def test_eta_uses_history_then_measured_rate(updates):
+    now, calls = updates
+    WorkModel.record("gauss", 1000.0, 1.0)
+    report = WorkModel.tracker("t1", "gauss", 10, total=4000.0, start_time=0.0)
+
+    # До першого заміру — швидкість попередніх задач
+    report(0.0, force=True)
+    assert calls[-1] == (5.0, pytest.approx(4.0))
+
+    # Після MIN_MEASURE_TIME — швидкість цієї задачі: 1000 флопів за 1 с
+    now[0] += 1.0
+    report(1000.0)
+    assert calls[-1] == (pytest.approx(5 + 90 * 0.25), pytest.approx(3.0))
+
+
+def test_checkpoints_follow_the_clock(updates):
+    now, calls = updates
+    report = WorkModel.tracker("t1", "gauss", 10, total=100.0, start_time=0.0)
+    report(10.0)
+    report(20.0)
+    assert len(calls) == 1
+
+    now[0] += CHECKPOINT_INTERVAL
+    report(30.0)
+    assert len(calls) == 2
+
+
+def test_cancellation_is_checked_at_checkpoints(updates, monkeypatch):
+    monkeypatch.setattr(CancelationManager, "is_cancelled", staticmethod(lambda task_id: True))
+    report = WorkModel.tracker("t1", "gauss", 10, total=100.0, start_time=0.0)
+    with pytest.raises(TaskCancelledError):
+        report(0.0, force=True)
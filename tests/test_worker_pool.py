@@ -0,0 +1,61 @@
+import multiprocessing as mp
+import numpy as np
+import pytest
+from backend.core.worker_pool import SolverPool, SharedArrays, _worker_main
+from backend.core.progress_stream import ProgressBroker
+
+
+def restarting_worker(tasks_queue, events_queue):
+    # Воркер, чий розв'язувач лишив завислий потік: "done" і одразу вихід через os._exit
+    from backend.core import worker_pool
+    from backend.core.cancelation import CancelationManager
+
+    CancelationManager.start_listener = staticmethod(lambda: None)
+    worker_pool.solve_task = lambda task, arrays: {
+        "task_id": task["task_id"],
+        "status": "cancelled",
+        "solution": None,
+        "restart_worker": True
+    }
+    _worker_main(tasks_queue, events_queue)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    completed = []
+    monkeypatch.setattr(SolverPool, "_complete", staticmethod(lambda task_id, result: completed.append(result)))
+    monkeypatch.setattr(SolverPool, "_spawn_worker", staticmethod(lambda: None))
+    monkeypatch.setattr(SolverPool, "_dispatch", staticmethod(lambda: None))
+    monkeypatch.setattr(ProgressBroker, "publish", staticmethod(lambda *args, **kwargs: None))
+
+    ctx = mp.get_context("spawn")
+    monkeypatch.setattr(SolverPool, "_events_queue", ctx.Queue())
+    monkeypatch.setattr(SolverPool, "_workers", [])
+    monkeypatch.setattr(SolverPool, "_running", {})
+    return ctx, completed
+
+
+def test_worker_restart_after_done_is_not_reported_as_crash(pool):
+    ctx, completed = pool
+    tasks_queue = ctx.Queue()
+    process = ctx.Process(target=restarting_worker, args=(tasks_queue, SolverPool._events_queue))
+    process.start()
+    SolverPool._workers.append(process)
+
+    shm, layout = SharedArrays.pack({"matrix": np.eye(2), "rhs": np.ones(2)})
+    try:
+        tasks_queue.put({"task_id": "t1", "user_id": 1, "engine": "gauss", "shm_name": shm.name, "layout": layout})
+
+        # Колектор уже побачив "started" — задача числиться за цим процесом
+        while "t1" not in SolverPool._running:
+            SolverPool._handle(SolverPool._events_queue.get(timeout=30))
+        process.join(30)
+        assert process.exitcode == 0
+
+        SolverPool._check_workers()
+    finally:
+        SharedArrays.release(shm, unlink=True)
+
+    assert [result["status"] for result in completed] == ["cancelled"]
+    assert SolverPool._running == {}
+    assert SolverPool._workers == []